@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Compare load/save time and file size of the JSON and binary blueprint formats.
+
+Usage::
+
+    python benchmarks/bench_blueprint_io.py --num-elements 10000
+"""
+
+from typing import Dict
+from typing import List
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import Pose
+
+from mujoco_scene_editor.utils import blueprint_io
+
+
+def make_blueprints(num_elements: int, group_size: int = 100) -> List[Blueprint]:
+    blueprints: List[Blueprint] = []
+    for i in range(num_elements):
+        group = f"/group_{i // group_size:04d}"
+        if i % group_size == 0:
+            blueprints.append(BlueprintGroup(group, Pose()))
+        pose = (
+            Pose().with_position([0.01 * i, 0.02 * i, 0.5]).with_euler([0.1, 0.2, 0.3])
+        )
+        blueprints.append(
+            GeomBlueprint(
+                f"{group}/box_{i:06d}",
+                geom_type="box",
+                pose=pose,
+                size=[0.05, 0.05, 0.05],
+                rgba=[0.8, 0.4, 0.9, 1.0],
+            )
+        )
+    return blueprints
+
+
+def bench_format(
+    blueprints: List[Blueprint], path: Path, repeat: int
+) -> Dict[str, float]:
+    save_times = []
+    load_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        blueprint_io.save_blueprints(path, blueprints)
+        save_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        blueprint_io.load_blueprints(path)
+        load_times.append(time.perf_counter() - start)
+    return {
+        "save_s": min(save_times),
+        "load_s": min(load_times),
+        "size_bytes": path.stat().st_size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-elements", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    blueprints = make_blueprints(args.num_elements)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for suffix in (".json", blueprint_io.BINARY_SUFFIX):
+            path = Path(tmp_dir) / f"scene{suffix}"
+            results[suffix] = bench_format(blueprints, path, args.repeat)
+
+    print(f"{len(blueprints)} blueprints")
+    print(f"{'format':<8}{'save [s]':>12}{'load [s]':>12}{'size [KiB]':>14}")
+    for fmt, r in results.items():
+        print(
+            f"{fmt:<8}{r['save_s']:>12.3f}{r['load_s']:>12.3f}{r['size_bytes'] / 1024:>14.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {"num_blueprints": len(blueprints), "results": results}, indent=2
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
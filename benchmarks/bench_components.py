@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the editor's components.
+
+Measures the state operations, rendering against an in-process stand-in for
+the viser server, the IK solve rate, the asset inventory scan and the scene
+export. Results are written as JSON so that runs of different releases can be
+compared with ``--compare``.
+
+Usage::
+
+    python benchmarks/bench_components.py --output results.json
+    python benchmarks/bench_components.py --compare results.json
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version
+from pathlib import Path
+
+import numpy as np
+
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import Pose
+
+from mujoco_scene_editor.state import State
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_blueprint_io import make_blueprints  # noqa: E402
+from fake_viser import FakeLayout  # noqa: E402
+
+DEFAULT_SIZES: Sequence[int] = (100, 1000, 10000)
+
+# Operations that copy the whole scene are timed this many times per size
+# (scaled down for large scenes to keep the run short).
+OPS_BUDGET = 20000
+
+
+def _num_ops(num_elements: int) -> int:
+    return max(3, min(100, OPS_BUDGET // num_elements))
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start_time)
+    times_ms = np.asarray(times) * 1000.0
+    return {
+        "count": repeat,
+        "mean_ms": float(times_ms.mean()),
+        "min_ms": float(times_ms.min()),
+        "p95_ms": float(np.percentile(times_ms, 95)),
+    }
+
+
+def _prefilled_state(num_elements: int) -> State:
+    state = State()
+    state.blueprints = {bp.path: bp for bp in make_blueprints(num_elements)}
+    state.sync_seq_from_blueprints()
+    return state
+
+
+def bench_state(sizes: Sequence[int]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for n in sizes:
+        ops = _num_ops(n)
+        state = _prefilled_state(n)
+        names = [name for name in state.blueprints if "box" in name]
+        new_pose = Pose().with_position([1.0, 2.0, 3.0])
+
+        counter = iter(range(ops))
+        add = measure(
+            lambda: state.add(
+                GeomBlueprint(
+                    f"/bench/box_{next(counter)}",
+                    geom_type="box",
+                    pose=Pose(),
+                    size=[0.1, 0.1, 0.1],
+                )
+            ),
+            ops,
+        )
+        update = measure(lambda: state.update(names[0], pose=new_pose), ops)
+        undo = measure(state.undo, ops)
+        results[str(n)] = {"add": add, "update": update, "undo": undo}
+    return results
+
+
+def bench_journal(num_elements: int, num_ops: int) -> Dict[str, Any]:
+    """
+    Cost of journaling for the editing thread. Each op is an ``update`` since
+    adding would grow the scene.
+    """
+    from mujoco_scene_editor.journal import Journal
+
+    state = _prefilled_state(num_elements)
+    name = next(name for name in state.blueprints if "box" in name)
+    poses = iter(
+        [Pose().with_position([0.01 * i, 0.0, 0.0]) for i in range(2 * num_ops)]
+    )
+
+    baseline = measure(lambda: state.update(name, pose=next(poses)), num_ops)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state.journal = Journal(tmp_dir)
+        state.load(list(state.blueprints.values()))
+        state.journal.flush()
+        journaled = measure(lambda: state.update(name, pose=next(poses)), num_ops)
+        bp = state.blueprints[name]
+        record = measure(lambda: state.journal.record("put", bp=bp), num_ops)
+        start_time = time.perf_counter()
+        state.journal.close()
+        close_ms = (time.perf_counter() - start_time) * 1000.0
+    return {
+        "update": baseline,
+        "update_journaled": journaled,
+        "record": record,
+        "close_ms": close_ms,
+    }
+
+
+def bench_builder(sizes: Sequence[int], repeat: int) -> Dict[str, Any]:
+    """
+    Builds a scene of boxes in groups of 1000 with the headless scene builder.
+    """
+    from mujoco_scene_editor.scene_builder import SceneBuilder
+
+    def build(n: int) -> None:
+        scene = SceneBuilder()
+        for g in range(0, n, 1000):
+            group = scene.group(f"group_{g}")
+            for i in range(min(1000, n - g)):
+                group.box(position=(0.1 * i, 0.1 * g, 0.0))
+        scene.flush()
+
+    return {str(n): measure(lambda: build(n), repeat) for n in sizes}
+
+
+def bench_transforms(num_poses: int, repeat: int) -> Dict[str, Any]:
+    """
+    Per-element cost of converting poses for viser and composing them, once one
+    pose at a time and once batched.
+    """
+    from mujoco_scene_editor.utils import transforms
+
+    rng = np.random.default_rng(0)
+    wxyz = transforms.quat_normalize(rng.normal(size=(num_poses, 4)))
+    positions = rng.normal(size=(num_poses, 3))
+    matrices = transforms.pose_to_matrix(positions, wxyz)
+    parent = matrices[0]
+
+    def single() -> None:
+        for m in matrices:
+            transforms.matrix_to_pose(parent @ m)
+
+    def batched() -> None:
+        transforms.matrix_to_pose(transforms.compose(parent, matrices))
+
+    def single_euler() -> None:
+        for q in wxyz:
+            transforms.quat_to_euler(q, degrees=True)
+
+    def batched_euler() -> None:
+        transforms.quat_to_euler(wxyz, degrees=True)
+
+    results: Dict[str, Any] = {}
+    for name, fn in (
+        ("compose_to_pose", single),
+        ("compose_to_pose_batched", batched),
+        ("quat_to_euler", single_euler),
+        ("quat_to_euler_batched", batched_euler),
+    ):
+        r = measure(fn, repeat)
+        r["per_element_us"] = r["mean_ms"] * 1000.0 / num_poses
+        results[name] = r
+    return results
+
+
+def bench_render(sizes: Sequence[int], repeat: int) -> Dict[str, Any]:
+    from mujoco_scene_editor.scene_renderer import ViserSceneRenderer
+
+    results: Dict[str, Any] = {}
+    for n in sizes:
+        blueprints = make_blueprints(n)
+        layout = FakeLayout()
+        renderer = ViserSceneRenderer(layout)
+        r = measure(lambda: renderer.render_from_state(list(blueprints)), repeat)
+        r["nodes"] = len(renderer.name_to_node)
+        results[str(n)] = r
+    return results
+
+
+def bench_sessions(
+    num_elements: int, client_counts: Sequence[int], repeat: int
+) -> Dict[str, Any]:
+    """
+    Renderer side cost of an edit with several connected clients.
+    """
+    from mujoco_scene_editor.scene_renderer import ViserSceneRenderer
+
+    blueprints = make_blueprints(num_elements)
+    names = [bp.path for bp in blueprints if "box" in bp.path]
+    results: Dict[str, Any] = {}
+    for num_clients in client_counts:
+        layout = FakeLayout(num_clients)
+        renderer = ViserSceneRenderer(layout)
+        renderer.render_from_state(list(blueprints))
+        for i, session in enumerate(layout.sessions.values()):
+            session.select(names[i])
+            renderer.on_select(names[i], session)
+
+        counter = iter(range(repeat))
+        results[str(num_clients)] = {
+            "update_pose": measure(
+                lambda: renderer.update_pose(
+                    names[0], (1.0, 2.0, 3.0), (1.0, 0.0, 0.0, 0.0)
+                ),
+                repeat,
+            ),
+            "add": measure(
+                lambda: renderer.add(
+                    GeomBlueprint(
+                        f"/bench/box_{next(counter)}",
+                        geom_type="box",
+                        pose=Pose(),
+                        size=[0.1, 0.1, 0.1],
+                        rgba=[1.0, 0.0, 0.0, 1.0],
+                    )
+                ),
+                repeat,
+            ),
+        }
+    return results
+
+
+def bench_ik(num_targets: int) -> Dict[str, Any]:
+    from mujoco_scene_editor.utils.blueprint_adapter import BlueprintAdapter
+
+    try:
+        bp, gripper_bp = (
+            BlueprintAdapter("robot_panda_sim").set_seq("0000").to_robot_bp("robot")
+        )
+        from mujoco_scene_editor.utils.simple_ik import SimpleIK
+
+        ik = SimpleIK(bp, gripper_bp)
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+    position, wxyz = ik.get_eef_pose()
+    rng = np.random.default_rng(0)
+    offsets = rng.uniform(-0.05, 0.05, size=(num_targets, 3))
+    targets = iter(offsets)
+    r = measure(lambda: ik.set_target(position + next(targets), wxyz), num_targets)
+    r["solves_per_s"] = 1000.0 / r["mean_ms"]
+    return r
+
+
+def _make_asset_tree(root: Path, num_files: int, files_per_dir: int = 50) -> None:
+    suffixes = (".obj", ".stl", ".txt", ".png")
+    for i in range(num_files):
+        folder = root / f"category_{i // files_per_dir:03d}" / f"item_{i % 7}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"asset_{i:05d}{suffixes[i % len(suffixes)]}").touch()
+
+
+def bench_inventory(num_files: int, repeat: int) -> Dict[str, Any]:
+    from mujoco_scene_editor.inventory.local_assets import Inventory
+
+    inventory = Inventory()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        _make_asset_tree(root, num_files)
+        items: List[Any] = []
+
+        def scan() -> None:
+            items[:] = inventory.list(root, skip_cache=True)
+
+        r = measure(scan, repeat)
+    r["files"] = num_files
+    r["assets"] = len(items)
+    return r
+
+
+def bench_export(sizes: Sequence[int], repeat: int) -> Dict[str, Any]:
+    from mujoco_scene_editor.controller import SceneEditorController
+    from mujoco_scene_editor.scene_renderer import ViserSceneRenderer
+
+    results: Dict[str, Any] = {}
+    for n in sizes:
+        controller = SceneEditorController(ViserSceneRenderer(FakeLayout()))
+        controller.state.blueprints = {bp.path: bp for bp in make_blueprints(n)}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = Path(tmp_dir) / "scene.xml"
+            r = measure(lambda: controller.export_scene(out_path), repeat)
+        r["elements_per_s"] = len(controller.state.blueprints) * 1000.0 / r["mean_ms"]
+        results[str(n)] = r
+    return results
+
+
+def _package_version() -> str:
+    try:
+        return version("mujoco-scene-editor")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    Prints the ratio of each mean time to the baseline. Ratios above one are slower.
+    """
+
+    def walk(current: Any, reference: Any, key: str) -> None:
+        if not isinstance(current, dict) or not isinstance(reference, dict):
+            return
+        if "mean_ms" in current and "mean_ms" in reference:
+            ratio = current["mean_ms"] / max(reference["mean_ms"], 1e-9)
+            print(
+                f"{key:<40}{reference['mean_ms']:>12.3f}{current['mean_ms']:>12.3f}{ratio:>8.2f}"
+            )
+            return
+        for k, v in current.items():
+            walk(v, reference.get(k, None), f"{key}.{k}" if key else k)
+
+    print(f"{'benchmark':<40}{'base [ms]':>12}{'now [ms]':>12}{'ratio':>8}")
+    walk(results["benchmarks"], baseline.get("benchmarks", {}), "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--session-elements", type=int, default=5000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--ik-targets", type=int, default=50)
+    parser.add_argument("--inventory-files", type=int, default=5000)
+    parser.add_argument("--transform-poses", type=int, default=10000)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against")
+    args = parser.parse_args()
+
+    benchmarks: Dict[str, Any] = {}
+    for name, fn in (
+        ("state", lambda: bench_state(args.sizes)),
+        ("journal", lambda: bench_journal(args.session_elements, 100)),
+        ("scene_builder", lambda: bench_builder(args.sizes, args.repeat)),
+        ("render_from_state", lambda: bench_render(args.sizes, args.repeat)),
+        ("transforms", lambda: bench_transforms(args.transform_poses, args.repeat)),
+        (
+            "sessions",
+            lambda: bench_sessions(args.session_elements, args.clients, 20),
+        ),
+        ("ik_set_target", lambda: bench_ik(args.ik_targets)),
+        ("inventory_list", lambda: bench_inventory(args.inventory_files, args.repeat)),
+        ("export_scene", lambda: bench_export(args.sizes, args.repeat)),
+    ):
+        start_time = time.perf_counter()
+        benchmarks[name] = fn()
+        print(
+            f"{name}: done in {time.perf_counter() - start_time:.1f}s", file=sys.stderr
+        )
+
+    results = {
+        "version": _package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "benchmarks": benchmarks,
+    }
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+    else:
+        print(json.dumps(benchmarks, indent=2))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+In-process stand-in for the parts of the viser server used by the renderer.
+
+Calls are accepted and recorded but nothing is sent over a websocket, so the
+benchmarks measure the editor's own overhead.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import contextlib
+
+import numpy as np
+
+
+class FakeHandle:
+    def __init__(self, api: "FakeSceneApi", name: str, **kwargs: Any) -> None:
+        self._api = api
+        self.name = name
+        self.position = np.asarray(kwargs.pop("position", (0.0, 0.0, 0.0)))
+        self.wxyz = np.asarray(kwargs.pop("wxyz", (1.0, 0.0, 0.0, 0.0)))
+        self.visible = kwargs.pop("visible", True)
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+    def on_click(self, fn: Callable) -> Callable:
+        return fn
+
+    def on_update(self, fn: Callable) -> Callable:
+        return fn
+
+    def on_drag_start(self, fn: Callable) -> Callable:
+        return fn
+
+    def on_drag_end(self, fn: Callable) -> Callable:
+        return fn
+
+    def remove(self) -> None:
+        self._api.nodes.pop(self.name, None)
+
+
+class FakeSceneApi:
+    def __init__(self) -> None:
+        self.nodes: Dict[str, FakeHandle] = {}
+        self.num_messages = 0
+
+    def _add(self, name: str, *args: Any, **kwargs: Any) -> FakeHandle:
+        self.num_messages += 1
+        handle = FakeHandle(self, name, **kwargs)
+        self.nodes[name] = handle
+        return handle
+
+    def add_box(self, name: str, dimensions=None, **kwargs: Any) -> FakeHandle:
+        return self._add(name, dimensions=dimensions, **kwargs)
+
+    def add_cylinder(self, name: str, radius: float, height: float, **kwargs: Any):
+        return self._add(name, radius=radius, height=height, **kwargs)
+
+    def add_icosphere(self, name: str, radius: float, **kwargs: Any) -> FakeHandle:
+        return self._add(name, radius=radius, **kwargs)
+
+    def add_frame(self, name: str, **kwargs: Any) -> FakeHandle:
+        return self._add(name, **kwargs)
+
+    def add_mesh_trimesh(self, name: str, mesh: Any, **kwargs: Any) -> FakeHandle:
+        return self._add(name, **kwargs)
+
+    def add_camera_frustum(self, name: str, **kwargs: Any) -> FakeHandle:
+        return self._add(name, **kwargs)
+
+    def add_transform_controls(self, name: str, **kwargs: Any) -> FakeHandle:
+        return self._add(name, **kwargs)
+
+    def reset(self) -> None:
+        self.nodes.clear()
+
+
+class FakeGuiHandle:
+    def __init__(self, value: Any = None, options: Any = ()) -> None:
+        self.value = value
+        self.options = options
+        self.disabled = False
+        self.visible = True
+        self.content = ""
+
+    def on_update(self, fn: Callable) -> Callable:
+        return fn
+
+    def on_click(self, fn: Callable) -> Callable:
+        return fn
+
+
+class FakeGuiApi:
+    """
+    Returns a :class:`FakeGuiHandle` for every ``add_*`` call.
+    """
+
+    def __init__(self) -> None:
+        self.num_messages = 0
+
+    def add_folder(self, *args: Any, **kwargs: Any):
+        return contextlib.nullcontext()
+
+    def __getattr__(self, name: str) -> Callable[..., FakeGuiHandle]:
+        if not name.startswith("add_"):
+            raise AttributeError(name)
+
+        def add(*args: Any, **kwargs: Any) -> FakeGuiHandle:
+            self.num_messages += 1
+            return FakeGuiHandle(kwargs.get("initial_value"), kwargs.get("options", ()))
+
+        return add
+
+
+class FakeClient:
+    def __init__(self, client_id: int) -> None:
+        self.client_id = client_id
+        self.scene = FakeSceneApi()
+        self.gui = FakeGuiApi()
+
+    @contextlib.contextmanager
+    def atomic(self):
+        yield
+
+
+class FakeServer:
+    def __init__(self) -> None:
+        self.scene = FakeSceneApi()
+        self.gui = FakeGuiApi()
+
+    @contextlib.contextmanager
+    def atomic(self):
+        yield
+
+    def get_clients(self) -> Dict[int, Any]:
+        return {}
+
+
+class FakeLayout:
+    """
+    Implements the layout attributes that the renderer touches.
+    """
+
+    def __init__(self, num_clients: int = 0) -> None:
+        from mujoco_scene_editor.gui.client_session import ClientSession
+        from mujoco_scene_editor.gui.outliner import SceneIndex
+
+        self.server = FakeServer()
+        self.allow_mouse_select = FakeGuiHandle(value=True)
+        self.btn_undo = FakeGuiHandle()
+        self.btn_redo = FakeGuiHandle()
+        self.history_info = FakeGuiHandle()
+        self.scene_index = SceneIndex()
+        self.sessions = {
+            i: ClientSession(
+                FakeClient(i),
+                self.server,
+                self.scene_index,
+                element_order=0.0,
+                panel_order=1.0,
+            )
+            for i in range(num_clients)
+        }
+        self.progress: List[Any] = []
+
+    def get_session(self, client_id):
+        return self.sessions.get(client_id, None)
+
+    def refresh_outliners(self) -> None:
+        for session in self.sessions.values():
+            session.refresh_elements()
+
+    def set_progress(self, title, body: str = "") -> None:
+        self.progress.append((title, body))
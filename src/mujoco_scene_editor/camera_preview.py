@@ -0,0 +1,417 @@
+"""
+Offscreen preview of the view of camera blueprints.
+
+The scene is compiled and rendered with MuJoCo in a background process, by
+default with the CPU (OSMesa) backend. Only the blueprints that changed are sent
+to the process. If just their poses changed the compiled model is patched in
+place, otherwise it is recompiled on the next render. Recent frames are cached
+per scene revision so that switching between cameras does not render again.
+"""
+
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from collections import OrderedDict
+from dataclasses import replace
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+
+import numpy as np
+
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import CameraBlueprint
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import MeshBlueprint
+
+from mujoco_scene_editor.constants import CAMERA_PREVIEW_WIDTH
+from mujoco_scene_editor.utils import transforms
+
+logger = logging.getLogger(__name__)
+
+# Number of rendered frames that are kept
+NUM_CACHED_FRAMES = 16
+
+# Seconds to wait for a frame before checking if the process is still alive
+RESULT_POLL_PERIOD = 1.0
+
+# (scene revision, camera, width, height)
+FrameKey = Tuple[int, str, int, int]
+
+# Called with the frame or, if the preview failed, with an error message
+FrameCallback = Callable[[FrameKey, Optional[np.ndarray], Optional[str]], None]
+
+
+class FrameCache:
+    """
+    Least recently used frames.
+    """
+
+    def __init__(self, max_size: int = NUM_CACHED_FRAMES) -> None:
+        self.max_size = max_size
+        self._frames: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        frame = self._frames.get(key, None)
+        if frame is not None:
+            self._frames.move_to_end(key)
+        return frame
+
+    def put(self, key: Hashable, frame: np.ndarray) -> None:
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_size:
+            self._frames.popitem(last=False)
+
+
+def _without_pose(bp: Blueprint) -> bytes:
+    return pickle.dumps(replace(bp, pose=None), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class PreviewScene:
+    """
+    Compiled MuJoCo model of the blueprints. Lives in the preview process.
+    """
+
+    def __init__(self) -> None:
+        self.blueprints: Dict[str, Blueprint] = {}
+        self.model = None
+        self.data = None
+        self.num_compiles = 0
+        self._needs_compile = True
+        self._needs_forward = True
+        self._renderer = None
+        self._renderer_key: Optional[Tuple[int, int, int]] = None
+
+    def update(self, changed: Sequence[Blueprint], removed: Sequence[str]) -> None:
+        for path in removed:
+            if self.blueprints.pop(path, None) is not None:
+                self._needs_compile = True
+        for bp in changed:
+            old = self.blueprints.get(bp.path, None)
+            self.blueprints[bp.path] = bp
+            if not self._needs_compile and not self._patch_pose(old, bp):
+                self._needs_compile = True
+        self._needs_forward = True
+
+    def _patch_pose(self, old: Optional[Blueprint], new: Blueprint) -> bool:
+        """
+        Moves the compiled element if only the pose of the blueprint changed.
+        Returns False if the model has to be recompiled.
+        """
+        import mujoco
+
+        model = self.model
+        if model is None or old is None or type(old) is not type(new):
+            return False
+        if old.pose is None or new.pose is None:
+            return False
+        if isinstance(new, BlueprintGroup):
+            obj_type, pos, quat = (
+                mujoco.mjtObj.mjOBJ_BODY,
+                model.body_pos,
+                model.body_quat,
+            )
+        elif isinstance(new, (GeomBlueprint, MeshBlueprint)):
+            obj_type, pos, quat = (
+                mujoco.mjtObj.mjOBJ_GEOM,
+                model.geom_pos,
+                model.geom_quat,
+            )
+        elif isinstance(new, CameraBlueprint):
+            obj_type, pos, quat = (
+                mujoco.mjtObj.mjOBJ_CAMERA,
+                model.cam_pos,
+                model.cam_quat,
+            )
+        else:
+            return False
+        if _without_pose(old) != _without_pose(new):
+            return False
+        i = mujoco.mj_name2id(model, obj_type, new.basename)
+        if i < 0:
+            return False
+
+        # The compiler can offset an element from its blueprint, e.g., a mesh
+        # is centered at its center of mass. The offset is kept.
+        offset = transforms.compose(
+            transforms.invert(old.pose.matrix),
+            transforms.pose_to_matrix(pos[i], quat[i]),
+        )
+        pos[i], quat[i] = transforms.matrix_to_pose(
+            transforms.compose(new.pose.matrix, offset)
+        )
+        if obj_type == mujoco.mjtObj.mjOBJ_BODY and model.body_jntnum[i] > 0:
+            joint = model.body_jntadr[i]
+            if model.jnt_type[joint] == mujoco.mjtJoint.mjJNT_FREE:
+                # free bodies are placed by their joint
+                adr = model.jnt_qposadr[joint]
+                model.qpos0[adr : adr + 3] = pos[i]
+                model.qpos0[adr + 3 : adr + 7] = quat[i]
+                model.key_qpos[:, adr : adr + 7] = model.qpos0[adr : adr + 7]
+        return True
+
+    def forward(self) -> None:
+        """
+        Compiles the model if needed and computes the poses of all elements.
+        """
+        import mujoco
+        from robits.sim.model_factory import SceneBuilder
+
+        if self._needs_compile:
+            self.model = SceneBuilder(add_floor=False).build_from_blueprints(
+                list(self.blueprints.values())
+            )
+            self.data = mujoco.MjData(self.model)
+            self.num_compiles += 1
+            self._needs_compile = False
+            self._needs_forward = True
+        if not self._needs_forward:
+            return
+        # cameras that track the center of mass store their offset here
+        mujoco.mj_setConst(self.model, self.data)
+        if self.model.nkey > 0:
+            mujoco.mj_resetDataKeyframe(self.model, self.data, 0)
+        else:
+            mujoco.mj_resetData(self.model, self.data)
+        mujoco.mj_forward(self.model, self.data)
+        self._needs_forward = False
+
+    def render(self, camera_path: str, width: int, height: int) -> np.ndarray:
+        import mujoco
+
+        self.forward()
+        camera_id = mujoco.mj_name2id(
+            self.model,
+            mujoco.mjtObj.mjOBJ_CAMERA,
+            camera_path.rsplit("/", maxsplit=1)[-1],
+        )
+        if camera_id < 0:
+            raise KeyError(f"Camera {camera_path} not found")
+        renderer_key = (id(self.model), width, height)
+        if self._renderer_key != renderer_key:
+            self.close()
+            self._renderer = mujoco.Renderer(self.model, height, width)
+            self._renderer_key = renderer_key
+        self._renderer.update_scene(self.data, camera=camera_id)
+        return self._renderer.render()
+
+    def close(self) -> None:
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
+            self._renderer_key = None
+
+
+def _run_worker(
+    requests: multiprocessing.Queue, results: multiprocessing.Queue
+) -> None:
+    """
+    Entry point of the preview process.
+    """
+    os.environ.setdefault("MUJOCO_GL", "osmesa")
+    try:
+        import mujoco  # noqa: F401
+        from robits.sim import model_factory  # noqa: F401
+
+        load_error = None
+    except Exception as e:
+        load_error = f"Unable to load MuJoCo with {os.environ['MUJOCO_GL']}: {e}"
+    scene = PreviewScene()
+    while True:
+        messages = [requests.get()]
+        while True:
+            try:
+                messages.append(requests.get_nowait())
+            except queue.Empty:
+                break
+
+        # Only the latest request per camera is rendered
+        renders: Dict[Tuple[str, int, int], FrameKey] = {}
+        for message in messages:
+            if message is None:
+                scene.close()
+                return
+            if message[0] == "update":
+                scene.update(message[1], message[2])
+                continue
+            key = message[1]
+            _, camera_path, width, height = key
+            if (stale := renders.pop((camera_path, width, height), None)) is not None:
+                results.put((stale, None, None, False))
+            renders[(camera_path, width, height)] = key
+
+        for key in renders.values():
+            _, camera_path, width, height = key
+            if load_error is not None:
+                results.put((key, None, load_error, True))
+                continue
+            try:
+                scene.forward()
+            except Exception as e:
+                results.put((key, None, f"Unable to compile the scene: {e}", False))
+                continue
+            try:
+                frame = scene.render(camera_path, width, height)
+            except KeyError as e:
+                results.put((key, None, str(e), False))
+                continue
+            except Exception as e:
+                # most likely no OpenGL context could be created
+                results.put((key, None, f"Unable to render: {e}", True))
+                continue
+            results.put((key, frame, None, False))
+
+
+class CameraPreview:
+    """
+    Renders the view of camera blueprints in a background process.
+
+    The process is started with the first request.
+    """
+
+    def __init__(
+        self,
+        max_width: int = CAMERA_PREVIEW_WIDTH,
+        cache_size: int = NUM_CACHED_FRAMES,
+    ) -> None:
+        self.max_width = max_width
+        self.cache = FrameCache(cache_size)
+        # Set if the process is unable to render at all
+        self.error: Optional[str] = None
+        self.revision = 0
+
+        self._lock = threading.Lock()
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._requests: Optional[multiprocessing.Queue] = None
+        self._results: Optional[multiprocessing.Queue] = None
+        # Blueprints the process has received
+        self._sent: Dict[str, Blueprint] = {}
+        self._pending: Dict[FrameKey, List[FrameCallback]] = {}
+
+    def preview_size(self, camera: CameraBlueprint) -> Tuple[int, int]:
+        """
+        Returns the reduced width and height of the camera image.
+        """
+        width = min(self.max_width, camera.width)
+        height = max(1, round(camera.height * width / camera.width))
+        return width, height
+
+    def request(
+        self,
+        camera_path: str,
+        blueprints: Dict[str, Blueprint],
+        callback: FrameCallback,
+    ) -> FrameKey:
+        """
+        Renders the view of ``camera_path`` in the scene ``blueprints``.
+        ``callback`` is called from another thread unless the frame is cached.
+        """
+        width, height = self.preview_size(blueprints[camera_path])
+        with self._lock:
+            if self._process is None:
+                self._start()
+            self._sync(blueprints)
+            key = (self.revision, camera_path, width, height)
+            error = self.error
+            frame = self.cache.get(key)
+            if error is None and frame is None:
+                is_pending = key in self._pending
+                self._pending.setdefault(key, []).append(callback)
+                if not is_pending:
+                    self._requests.put(("render", key))
+        if error is not None or frame is not None:
+            callback(key, frame, error)
+        return key
+
+    def _sync(self, blueprints: Dict[str, Blueprint]) -> None:
+        changed = [
+            bp for path, bp in blueprints.items() if self._sent.get(path) is not bp
+        ]
+        removed = [path for path in self._sent if path not in blueprints]
+        if not changed and not removed:
+            return
+        self._requests.put(("update", changed, removed))
+        self._sent = dict(blueprints)
+        self.revision += 1
+
+    def _start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(
+            target=_run_worker,
+            args=(self._requests, self._results),
+            name="camera-preview",
+            daemon=True,
+        )
+        self._process.start()
+        threading.Thread(
+            target=self._receive_frames,
+            args=(self._process, self._results),
+            name="camera-preview-results",
+            daemon=True,
+        ).start()
+        logger.info("Started camera preview process %s", self._process.pid)
+
+    def _receive_frames(
+        self,
+        process: multiprocessing.process.BaseProcess,
+        results: multiprocessing.Queue,
+    ) -> None:
+        while True:
+            try:
+                result = results.get(timeout=RESULT_POLL_PERIOD)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                result = None
+            if result is None:
+                self._fail_pending("The preview process exited")
+                return
+            key, frame, error, is_fatal = result
+            with self._lock:
+                callbacks = self._pending.pop(key, [])
+                if frame is not None:
+                    self.cache.put(key, frame)
+                if is_fatal:
+                    logger.error("Camera preview is not available: %s", error)
+                    self.error = error
+            if frame is None and error is None:
+                # superseded by a newer request
+                continue
+            for cb in callbacks:
+                cb(key, frame, error)
+
+    def _fail_pending(self, error: str) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = error
+            pending, self._pending = self._pending, {}
+        for key, callbacks in pending.items():
+            for cb in callbacks:
+                cb(key, None, error)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is None:
+                return
+            self._requests.put(None)
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._results.put(None)
+            self._process = None
+            self._sent = {}
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
-from mujoco_scene_editor.cli import startup_warning  # noqa: F401
+from mujoco_scene_editor.cli.startup_profiler import StartupProfiler
 
+from typing import TYPE_CHECKING
 from typing import List
 from typing import Optional
 from functools import wraps
@@ -12,45 +13,145 @@ from pathlib import Path
 import webbrowser
 
 import rich_click as click
-from rich.progress import Progress
 from click_prompt import filepath_option
 from click_prompt import filepath_argument
 from click_prompt import input_text_argument
 
-from robits.sim.blueprints import blueprints_from_json
-from robits.sim.blueprints import Blueprint
-from robits.sim.blueprints import GeomBlueprint
-from robits.sim.blueprints import CameraBlueprint
-from robits.sim.blueprints import Pose
+from mujoco_scene_editor.constants import DEFAULT_ASSET_DIR
+from mujoco_scene_editor.constants import DEFAULT_EXPORT_TARGET
+from mujoco_scene_editor.constants import DEFAULT_JOURNAL_DIR
+from mujoco_scene_editor.constants import DEFAULT_PROMPT_MODEL
+from mujoco_scene_editor.constants import PROMPT_CONCURRENCY
+from mujoco_scene_editor.constants import HISTORY_MAX_ENTRIES
+from mujoco_scene_editor.constants import HISTORY_MAX_MB
 
+if TYPE_CHECKING:
+    from robits.sim.blueprints import Blueprint
+    from mujoco_scene_editor.history import History
+    from mujoco_scene_editor.scene_editor import SceneEditor
 
-from robits.utils import camera_intrinsics
+logger = logging.getLogger(__name__)
 
-from robits.cli.cli_utils import setup_cli
+# Heavy subsystems (robits, viser, mujoco, ...) are imported inside the commands
+# so that --help and argument errors stay fast.
 
-from mujoco_scene_editor.layout import SceneEditorLayout
-from mujoco_scene_editor.scene_renderer import ViserSceneRenderer
-from mujoco_scene_editor.controller import SceneEditorController
-from mujoco_scene_editor.scene_editor import SceneEditor
 
-from mujoco_scene_editor.constants import DEFAULT_ASSET_DIR
-from mujoco_scene_editor.constants import DEFAULT_EXPORT_TARGET
+def prepare_command() -> None:
+    from robits.cli.cli_utils import setup_cli
+    from mujoco_scene_editor.cli.startup_warning import print_first_start_info
 
-logger = logging.getLogger(__name__)
+    print_first_start_info()
+    setup_cli(logging.INFO)
 
-setup_cli(logging.INFO)
 
+def get_scene_editor(
+    blueprints: Optional[List["Blueprint"]] = None,
+    progressive: bool = False,
+    journal_dir: Optional[Path] = None,
+    is_saved: bool = True,
+    history: Optional["History"] = None,
+) -> "SceneEditor":
+    """
+    Creates the editor. With ``journal_dir`` all edits are journaled for crash
+    recovery. ``is_saved`` tells whether ``blueprints`` are already stored in a
+    file, e.g., unlike a restored session.
+    """
+    from mujoco_scene_editor.layout import SceneEditorLayout
+    from mujoco_scene_editor.scene_renderer import ViserSceneRenderer
+    from mujoco_scene_editor.controller import SceneEditorController
+    from mujoco_scene_editor.scene_editor import SceneEditor
+    from mujoco_scene_editor.state import State
 
-def get_scene_editor(blueprints: Optional[List[Blueprint]] = None) -> SceneEditor:
     layout = SceneEditorLayout()
     renderer = ViserSceneRenderer(layout)
-    controller = SceneEditorController(renderer)
+    controller = SceneEditorController(renderer, State(history=history))
+    if journal_dir:
+        from mujoco_scene_editor.journal import Journal
+
+        controller.state.journal = Journal(journal_dir)
     if blueprints:
-        controller.load_blueprints(blueprints)
+        controller.load_blueprints(blueprints, progressive=progressive)
+    if is_saved:
+        controller.mark_saved()
 
     return SceneEditor(controller, layout)
 
 
+def recover_session(
+    journal_dir: Path, restore: Optional[bool]
+) -> Optional[List["Blueprint"]]:
+    """
+    Returns the scene of a previous session that was not exported and whose
+    editor is no longer running. Asks the user unless ``restore`` is given.
+    """
+    from mujoco_scene_editor import journal
+
+    try:
+        blueprints = journal.recover(journal_dir)
+    except Exception as e:
+        logger.error("Unable to read the journal in %s: %s", journal_dir, e)
+        return None
+    if not blueprints or restore is False:
+        return None
+    if restore is None and not click.confirm(
+        f"Found a session with {len(blueprints)} elements that was not exported. Restore it?",
+        default=True,
+    ):
+        return None
+    return blueprints
+
+
+profile_startup_option = click.option(
+    "--profile-startup",
+    is_flag=True,
+    default=False,
+    help="Report the import cost per module and the time until the server is ready.",
+)
+
+
+journal_dir_option = click.option(
+    "--journal-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=DEFAULT_JOURNAL_DIR,
+    help="Directory of the edit journals used to restore crashed sessions.",
+)
+
+no_journal_option = click.option(
+    "--no-journal",
+    is_flag=True,
+    default=False,
+    help="Do not journal the edits.",
+)
+
+restore_option = click.option(
+    "--restore/--no-restore",
+    default=None,
+    help="Restore or discard a session that was not exported without asking.",
+)
+
+history_mb_option = click.option(
+    "--history-mb",
+    type=click.IntRange(min=1),
+    default=HISTORY_MAX_MB,
+    show_default=True,
+    help="Memory budget of the undo history in MB.",
+)
+
+history_steps_option = click.option(
+    "--history-steps",
+    type=click.IntRange(min=1),
+    default=HISTORY_MAX_ENTRIES,
+    show_default=True,
+    help="Maximum number of undo and redo steps.",
+)
+
+history_spill_option = click.option(
+    "--history-spill/--no-history-spill",
+    default=True,
+    help="Move undo steps beyond the memory budget to a temporary file instead of dropping them.",
+)
+
+
 @click.group()
 def cli():
     pass
@@ -58,11 +159,36 @@ def cli():
 
 @cli.command()
 @click.option("--open-browser/--skip-open-browser", is_flag=True, default=True)
-def new(open_browser: bool):
+@profile_startup_option
+@journal_dir_option
+@no_journal_option
+@restore_option
+@history_mb_option
+@history_steps_option
+@history_spill_option
+def new(
+    open_browser: bool,
+    profile_startup: bool,
+    journal_dir: Path,
+    no_journal: bool,
+    restore: Optional[bool],
+    history_mb: int,
+    history_steps: int,
+    history_spill: bool,
+):
     """
     Start a new, empty scene.
     """
-    default_blueprints: List[Blueprint] = [
+    profiler = StartupProfiler(profile_startup)
+    profiler.import_heavy_modules()
+    prepare_command()
+
+    from robits.sim.blueprints import GeomBlueprint
+    from robits.sim.blueprints import CameraBlueprint
+    from robits.sim.blueprints import Pose
+    from robits.utils import camera_intrinsics
+
+    default_blueprints: List["Blueprint"] = [
         GeomBlueprint(
             "/floor",
             geom_type="plane",
@@ -79,7 +205,12 @@ def new(open_browser: bool):
             pose=Pose().with_position([1.0, 0, 1.5]),
         ),
     ]
-    viewer = get_scene_editor(default_blueprints)
+    history = _make_history(history_mb, history_steps, history_spill)
+    viewer = _start_editor(
+        default_blueprints, False, journal_dir, no_journal, restore, history
+    )
+    profiler.mark("server ready")
+    profiler.report()
     viewer.show()
 
     if open_browser:
@@ -91,23 +222,57 @@ def new(open_browser: bool):
 @cli.command()
 @filepath_argument("model-name", default=DEFAULT_EXPORT_TARGET)
 @click.option("--open-browser/--skip-open-browser", is_flag=True, default=True)
-def edit(model_name: Path, open_browser: bool):
+@click.option(
+    "--progressive/--no-progressive",
+    default=False,
+    help="Show primitives first and stream meshes and robots in the background.",
+)
+@profile_startup_option
+@journal_dir_option
+@no_journal_option
+@restore_option
+@history_mb_option
+@history_steps_option
+@history_spill_option
+def edit(
+    model_name: Path,
+    open_browser: bool,
+    progressive: bool,
+    profile_startup: bool,
+    journal_dir: Path,
+    no_journal: bool,
+    restore: Optional[bool],
+    history_mb: int,
+    history_steps: int,
+    history_spill: bool,
+):
     """
-    Load a scene from JSON or try to convert it from a MJCF XML.
+    Load a scene from JSON, a binary blueprint file (.npz) or try to convert it from a MJCF XML.
     """
     path = Path(model_name).expanduser()
     if not path.exists() or not path.is_file():
         raise FileNotFoundError(f"Model file not found: {path}")
 
+    profiler = StartupProfiler(profile_startup)
+    profiler.import_heavy_modules()
+    prepare_command()
+
+    from mujoco_scene_editor.utils import blueprint_io
+
     if path.suffix.lower() == ".xml":
         from robits.sim.converters.mujoco_importer import load_mjcf_as_blueprints
 
         blueprints = load_mjcf_as_blueprints(path)
     else:
-        json_data = path.read_text(encoding="utf-8")
-        blueprints = blueprints_from_json(json_data)
-
-    viewer = get_scene_editor(blueprints)
+        blueprints = blueprint_io.load_blueprints(path)
+    profiler.mark("blueprints loaded")
+
+    history = _make_history(history_mb, history_steps, history_spill)
+    viewer = _start_editor(
+        blueprints, progressive, journal_dir, no_journal, restore, history
+    )
+    profiler.mark("server ready")
+    profiler.report()
     viewer.show()
 
     if open_browser:
@@ -126,6 +291,7 @@ def list_assets(root: str):
     """
     List all available assets found under a directory.
     """
+    prepare_command()
 
     from mujoco_scene_editor.inventory.local_assets import Inventory
 
@@ -148,6 +314,87 @@ def list_assets(root: str):
         click.echo(f"- {m.name}: {m.path}")
 
 
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--steps",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Steps of the timing rollout. 0 skips the rollout.",
+)
+def analyze(path: Path, steps: Optional[int]):
+    """
+    Report the simulation cost of an MJCF or blueprint file and suggest fixes.
+    """
+    prepare_command()
+
+    from rich.console import Console
+    from rich.markdown import Markdown
+
+    from mujoco_scene_editor.scene_analysis import ROLLOUT_STEPS
+    from mujoco_scene_editor.scene_analysis import analyze_file
+
+    report = analyze_file(path, ROLLOUT_STEPS if steps is None else steps)
+    Console().print(Markdown(report.to_markdown()))
+
+
+@cli.group()
+def cache():
+    """
+    Inspect and clean the cache of asset listings and annotations.
+    """
+
+
+@cache.command("stats")
+def cache_stats():
+    """
+    Show entries, size and hit rate per namespace.
+    """
+    from mujoco_scene_editor.utils.disk_cache import get_cache
+
+    disk_cache = get_cache()
+    stats = disk_cache.stats()
+    if not stats:
+        click.echo(f"The cache in {disk_cache.cache_dir} is empty.")
+        return
+    click.echo(f"Cache in {disk_cache.cache_dir}:")
+    for s in stats:
+        click.echo(
+            f"- {s.namespace}: {s.entries} entries, {s.size_bytes / 1024:.1f} KiB, "
+            f"{s.hits} hits, {s.misses} misses ({s.hit_rate:.0%}), "
+            f"{s.load_s:.2f}s loading, {s.compute_s:.2f}s computing"
+        )
+
+
+@cache.command("prune")
+@click.option(
+    "--max-mb",
+    type=click.FloatRange(min=0.0),
+    default=None,
+    help="Size budget in MB. Defaults to the budget of the cache.",
+)
+def cache_prune(max_mb: Optional[float]):
+    """
+    Remove outdated entries and the least recently used ones beyond the budget.
+    """
+    from mujoco_scene_editor.utils.disk_cache import get_cache
+
+    num_entries = get_cache().prune(max_mb)
+    click.echo(f"Removed {num_entries} entries.")
+
+
+@cache.command("clear")
+@click.option("--namespace", default=None, help="Only clear this namespace.")
+def cache_clear(namespace: Optional[str]):
+    """
+    Remove all cached entries and statistics.
+    """
+    from mujoco_scene_editor.utils.disk_cache import get_cache
+
+    num_entries = get_cache().clear(namespace)
+    click.echo(f"Removed {num_entries} entries.")
+
+
 def validate_has_openai_key(func):
     @wraps(func)
     def _wrapper(*args, **kwargs):
@@ -174,24 +421,18 @@ def prompt(output_model_name: str, prompt: str) -> None:
     """
     Ask ChatGPT to generate a scene. Requires an OpenAI API key
     """
+    prepare_command()
+
+    from rich.progress import Progress
     from robits.vlm.openai_vlm import PromptBuilder
     from robits.vlm.openai_vlm import ChatGPT
-    import re
-
-    prefix = """
-Generate a MuJoCo 3.3.7 XML. Here are some guidelines:
-- Don't use global tags for colors or other elements
-- Don't use textures/materials. Use a color instead assigned to each element
-- If the scene should contain a robot try match it first to an existing description in the robot_description package (https://github.com/robot-descriptions/robot_descriptions.py). If found copy the content.
-- For moving objects add a freejoint
-- There is no geom cone element
-- Avoid accelerometer and sensor tags
-Output the complete XML file. The scene is as follows:
-"""
+    from mujoco_scene_editor.scene_prompt import SCENE_PROMPT
+    from mujoco_scene_editor.scene_prompt import extract_mjcf
+
     chatgpt = ChatGPT()
 
     builder = PromptBuilder()
-    builder.add_instruction(prefix)
+    builder.add_instruction(SCENE_PROMPT)
     builder.add_instruction(prompt)
 
     with Progress() as progress:
@@ -202,16 +443,13 @@ Output the complete XML file. The scene is as follows:
 
     content = response.choices[0].message.content
 
-    pattern = r"<mujoco\b[^>]*>.*?</mujoco>"
-    match = re.search(pattern, content, flags=re.DOTALL)
+    xml = extract_mjcf(content)
 
-    if match is None:
+    if xml is None:
         click.echo(response)
         logger.error("Unable to parse response")
         return
 
-    xml = match.group(0)
-
     output_path = Path(output_model_name).expanduser()
 
     with open(output_path, "w", encoding="utf-8") as f:
@@ -220,6 +458,132 @@ Output the complete XML file. The scene is as follows:
     click.echo(f"Edit the model with mjedit {output_path}")
 
 
+@cli.command("prompt-batch")
+@click.argument("prompts", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=str(Path(DEFAULT_EXPORT_TARGET).with_name("prompt")),
+    show_default=True,
+    help="Directory of the generated scenes and the report.",
+)
+@click.option("--model", default=DEFAULT_PROMPT_MODEL, show_default=True)
+@click.option(
+    "--base-url",
+    default=None,
+    envvar="OPENAI_BASE_URL",
+    help="URL of an OpenAI-compatible API, e.g., a local server.",
+)
+@click.option(
+    "--api-key",
+    default=None,
+    envvar="OPENAI_API_KEY",
+    help="API key. Defaults to OPENAI_API_KEY.",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=PROMPT_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of requests in flight.",
+)
+@click.option(
+    "--no-cache", is_flag=True, default=False, help="Query all prompts again."
+)
+def prompt_batch(
+    prompts: Path,
+    output_dir: Path,
+    model: str,
+    base_url: Optional[str],
+    api_key: Optional[str],
+    concurrency: int,
+    no_cache: bool,
+) -> None:
+    """
+    Generate scenes for many prompts, one per .txt file in a directory or one
+    per line of a file, and check that they compile.
+    """
+    prepare_command()
+
+    import asyncio
+    import json
+    import statistics
+    from dataclasses import asdict
+    from mujoco_scene_editor.scene_prompt import PromptResult
+    from mujoco_scene_editor.scene_prompt import generate_scenes
+    from mujoco_scene_editor.scene_prompt import load_prompts
+
+    prompt_texts = load_prompts(prompts)
+    if not prompt_texts:
+        click.echo(f"No prompts found in {prompts}.")
+        return
+    click.echo(f"Generating {len(prompt_texts)} scenes with {model}.")
+
+    def report(result: PromptResult) -> None:
+        status = "ok" if result.is_valid else f"failed: {result.error}"
+        cached = ", cached" if result.is_cached else ""
+        click.echo(f"- {result.name} ({result.latency_s:.1f}s{cached}): {status}")
+
+    output_dir = Path(output_dir).expanduser()
+    results = asyncio.run(
+        generate_scenes(
+            prompt_texts,
+            output_dir,
+            model=model,
+            base_url=base_url,
+            api_key=api_key,
+            concurrency=concurrency,
+            use_cache=not no_cache,
+            on_result=report,
+        )
+    )
+
+    report_path = output_dir / "report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(
+            [{**asdict(r), "output_path": str(r.output_path or "")} for r in results],
+            f,
+            indent=2,
+        )
+    num_valid = sum(r.is_valid for r in results)
+    latency = statistics.median(r.latency_s for r in results)
+    click.echo(
+        f"{num_valid} of {len(results)} scenes compiled, median latency "
+        f"{latency:.1f}s. Report written to {report_path}"
+    )
+
+
+def _start_editor(
+    blueprints: List["Blueprint"],
+    progressive: bool,
+    journal_dir: Path,
+    no_journal: bool,
+    restore: Optional[bool],
+    history: Optional["History"] = None,
+) -> "SceneEditor":
+    if no_journal:
+        return get_scene_editor(blueprints, progressive=progressive, history=history)
+
+    journal_dir = Path(journal_dir).expanduser()
+    if restored_blueprints := recover_session(journal_dir, restore):
+        return get_scene_editor(
+            restored_blueprints,
+            progressive,
+            journal_dir,
+            is_saved=False,
+            history=history,
+        )
+    return get_scene_editor(blueprints, progressive, journal_dir, history=history)
+
+
+def _make_history(
+    history_mb: int, history_steps: int, history_spill: bool
+) -> "History":
+    from mujoco_scene_editor.history import History
+
+    return History(history_mb * 1024 * 1024, history_steps, history_spill)
+
+
 def wait_until_keypress(viewer) -> None:
     try:
         while viewer.is_running:
@@ -0,0 +1,83 @@
+"""
+Measures where the time goes between starting the CLI and a ready server.
+
+The CLI imports heavy subsystems lazily. With ``--profile-startup`` they are
+imported up front in a fixed order instead, so the incremental cost of each
+module can be reported.
+"""
+
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+import importlib
+import time
+
+CLI_START = time.perf_counter()
+
+# Imported in this order. Each entry is charged only for what earlier entries
+# did not already import.
+HEAVY_MODULES: Sequence[str] = (
+    "numpy",
+    "scipy.spatial.transform",
+    "robits.sim.blueprints",
+    "trimesh",
+    "mujoco",
+    "dm_control.mjcf",
+    "mink",
+    "viser",
+    "objaverse",
+    "mujoco_scene_editor.layout",
+    "mujoco_scene_editor.scene_renderer",
+    "mujoco_scene_editor.controller",
+    "mujoco_scene_editor.scene_editor",
+)
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.import_times: List[Tuple[str, float]] = []
+        self.marks: List[Tuple[str, float]] = []
+
+    def import_heavy_modules(self) -> None:
+        if not self.enabled:
+            return
+        for name in HEAVY_MODULES:
+            start_time = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                continue
+            self.import_times.append((name, time.perf_counter() - start_time))
+        self.mark("imports done")
+
+    def mark(self, label: str) -> None:
+        """
+        Records the time since the CLI started.
+        """
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - CLI_START))
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        from rich.console import Console
+        from rich.table import Table
+
+        imports = Table(title="Import cost")
+        imports.add_column("Module")
+        imports.add_column("Time [ms]", justify="right")
+        for name, duration in sorted(self.import_times, key=lambda x: -x[1]):
+            imports.add_row(name, f"{duration * 1000.0:.1f}")
+        imports.add_row("total", f"{sum(d for _, d in self.import_times) * 1000.0:.1f}")
+
+        timeline = Table(title="Startup timeline")
+        timeline.add_column("Event")
+        timeline.add_column("Since CLI start [ms]", justify="right")
+        for label, elapsed in self.marks:
+            timeline.add_row(label, f"{elapsed * 1000.0:.1f}")
+
+        console = Console()
+        console.print(imports)
+        console.print(timeline)
@@ -1,8 +1,13 @@
-from cachier import cachier
+from typing import Optional
+
+import hashlib
 import sys
+from pathlib import Path
 
 from rich import print
 
+from mujoco_scene_editor.utils import disk_cache
+
 
 first_startup_message = """
 
@@ -11,10 +16,19 @@ first_startup_message = """
 """
 
 
-@cachier()
-def print_first_start_info(exec_name: str = sys.executable):
-    print(first_startup_message)
-    return ""
+def _marker_path(exec_name: str, cache_dir: Optional[Path] = None) -> Path:
+    # A marker file next to the cache database, so that clearing or pruning the
+    # cache does not show the message again
+    digest = hashlib.sha256(exec_name.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir or disk_cache.cache_dir()) / "first_start" / digest
 
 
-print_first_start_info()
+def print_first_start_info(
+    exec_name: str = sys.executable, cache_dir: Optional[Path] = None
+) -> None:
+    marker = _marker_path(exec_name, cache_dir)
+    if marker.exists():
+        return
+    print(first_startup_message)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
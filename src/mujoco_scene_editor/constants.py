@@ -1,5 +1,56 @@
 NO_SELECTION = "— none —"
 
+LOADING = "— loading… —"
+
 DEFAULT_ASSET_DIR = "~/temp/ArmarXObjects"
 
 DEFAULT_EXPORT_TARGET = "~/temp/export/scene.json"
+
+# Density in kg/m³ used to estimate masses on export, roughly that of water
+DEFAULT_DENSITY = 1000.0
+
+DEFAULT_METRICS_TARGET = "~/temp/export/metrics.json"
+
+# Thumbnails of the asset inventories are cached here by content hash
+DEFAULT_THUMBNAIL_DIR = "~/.cache/mujoco_scene_editor/thumbnails"
+THUMBNAIL_SIZE = 128
+
+# Mesh statistics and scale overrides of assets
+DEFAULT_MESH_INDEX = "~/.cache/mujoco_scene_editor/mesh_index.sqlite"
+
+# Searchable catalog of Objaverse objects and the number shown per page
+DEFAULT_OBJAVERSE_CATALOG = "~/.cache/mujoco_scene_editor/objaverse_catalog.sqlite"
+OBJAVERSE_PAGE_SIZE = 50
+
+# Cached inventory listings and annotations, and their size budget
+DEFAULT_CACHE_DIR = "~/.cache/mujoco_scene_editor/cache"
+CACHE_MAX_MB = 512
+
+# Model and number of concurrent requests when generating scenes from prompts
+DEFAULT_PROMPT_MODEL = "gpt-5.2"
+PROMPT_CONCURRENCY = 4
+
+# Edits are journaled here so that a crashed session can be restored
+DEFAULT_JOURNAL_DIR = "~/.cache/mujoco_scene_editor/journal"
+
+# Budget of the undo history. Older steps are moved to a temporary file.
+HISTORY_MAX_MB = 256
+HISTORY_MAX_ENTRIES = 200
+
+# Maximum rate at which dragged gizmos update the scene for all clients
+POSE_UPDATE_RATE_HZ = 30.0
+
+# Maximum rate at which the progress of streaming a scene is sent to the clients
+STREAM_PROGRESS_RATE_HZ = 4.0
+
+# Number of rows shown per page in the scene outliner
+OUTLINER_ROWS = 12
+
+# Element types that the outliner can filter by
+ELEMENT_KINDS = ("group", "geom", "mesh", "robot", "gripper", "camera")
+
+ALL_KINDS = "— all —"
+
+# Maximum width of camera previews and how often they follow scene changes
+CAMERA_PREVIEW_WIDTH = 320
+CAMERA_PREVIEW_RATE_HZ = 5.0
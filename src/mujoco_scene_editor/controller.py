@@ -1,9 +1,19 @@
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Iterator
 from typing import Sequence
 from typing import Tuple
 from typing import List
+from typing import Optional
 
 import logging
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
+
+import numpy as np
+from dataclasses import fields
 from dataclasses import replace
 
 from robits.core.config_manager import config_manager
@@ -17,7 +27,11 @@ from robits.sim.blueprints import BlueprintGroup
 from robits.sim.blueprints import Pose
 
 from mujoco_scene_editor.state import State
+from mujoco_scene_editor.state import top_level_paths
+from mujoco_scene_editor import metrics
+from mujoco_scene_editor.utils import transforms
 from mujoco_scene_editor.utils import viser_utils
+from mujoco_scene_editor.utils import blueprint_io
 from mujoco_scene_editor.utils.blueprint_adapter import BlueprintAdapter
 
 logger = logging.getLogger(__name__)
@@ -27,36 +41,108 @@ def _is_descendant_path(path: str, root: str) -> bool:
     return path.startswith(f"{root}/")
 
 
+def _is_path_or_descendant(path: str, root: str) -> bool:
+    return path == root or _is_descendant_path(path, root)
+
+
+def ends_interaction(fn: Callable) -> Callable:
+    """
+    Records the current interaction as its own undo step before ``fn`` edits
+    the scene.
+    """
+
+    @wraps(fn)
+    def wrapper(self: "SceneEditorController", *args, **kwargs):
+        self.end_interaction()
+        return fn(self, *args, **kwargs)
+
+    return wrapper
+
+
 class SceneEditorController:
-    def __init__(self, renderer) -> None:
+    def __init__(self, renderer, state: Optional[State] = None) -> None:
         self.renderer = renderer
-        self.state = State()
+        self.state = state or State()
         self.is_running = True
+        self._interaction: Optional[Hashable] = None
+
+    def begin_interaction(self, key: Hashable) -> None:
+        """
+        Groups the following edits with the same ``key``, e.g., the gizmo
+        drags of an element, into one undo step. The step is recorded once
+        another interaction begins or any other edit is made.
+        """
+        if key == self._interaction:
+            return
+        self.end_interaction()
+        self.state.begin()
+        self._interaction = key
+
+    def end_interaction(self) -> None:
+        if self._interaction is None:
+            return
+        self._interaction = None
+        self.state.commit()
+        self.update_history_btn_visibility()
 
-    def load_blueprints(self, blueprints: List[Blueprint]):
-        self.state.blueprints = {bp.path: bp for bp in blueprints}
-        self.state.sync_seq_from_blueprints()
-        self.state.history_past.clear()
-        self.state.history_future.clear()
-        self.renderer.render_from_state(blueprints)
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Records the enclosed edits as one undo step. If an exception is raised
+        the scene is restored.
+        """
+        try:
+            with self.state.transaction():
+                yield
+        except Exception:
+            self.renderer.render_from_state(list(self.state.blueprints.values()))
+            raise
+        finally:
+            self.update_history_btn_visibility()
+
+    @metrics.timed()
+    @ends_interaction
+    def load_blueprints(self, blueprints: List[Blueprint], progressive: bool = False):
+        self.state.load(blueprints)
+        if progressive:
+            self.renderer.render_progressive(
+                blueprints, is_current=lambda bp: bp.path in self.state.blueprints
+            )
+        else:
+            self.renderer.render_from_state(blueprints)
+        self.update_history_btn_visibility()
 
     def shutdown(self) -> None:
         self.is_running = False
-
-    def create_group(self, parent_name: str, name: str) -> None:
+        if self.state.journal:
+            self.state.journal.close()
+
+    def mark_saved(self) -> None:
+        """
+        Marks the scene as saved. A saved scene is not offered for restore.
+        """
+        if self.state.journal:
+            self.state.journal.mark_saved()
+
+    @metrics.timed()
+    @ends_interaction
+    def create_group(self, parent_name: str, name: str) -> str:
         bp_name = self.get_full_name(parent_name, f"{name}_{self.state.element_seq}")
         bp = BlueprintGroup(bp_name, Pose())
         self.state.add(bp)
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
+        return bp.path
 
     def get_full_name(self, parent_name: str, name: str) -> str:
         return f"{parent_name}/{name}"
 
+    @metrics.timed()
+    @ends_interaction
     def create_box(
         self, parent_name: str, dims: Sequence[float], rgba: Sequence[float]
-    ) -> None:
+    ) -> str:
         bp_name = self.get_full_name(parent_name, f"box_{self.state.element_seq}")
         half_size = [dims[0] / 2.0, dims[1] / 2.0, dims[2] / 2.0]
         bp = GeomBlueprint(
@@ -71,10 +157,13 @@ class SceneEditorController:
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
+        return bp.path
 
+    @metrics.timed()
+    @ends_interaction
     def create_cylinder(
         self, parent_name: str, radius: float, half_height: float, rgba: Sequence[float]
-    ) -> None:
+    ) -> str:
         bp_name = self.get_full_name(parent_name, f"cylinder_{self.state.element_seq}")
         bp = GeomBlueprint(
             path=bp_name,
@@ -88,10 +177,13 @@ class SceneEditorController:
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
+        return bp.path
 
+    @metrics.timed()
+    @ends_interaction
     def create_sphere(
         self, parent_name: str, radius: float, rgba: Sequence[float]
-    ) -> None:
+    ) -> str:
         bp_name = self.get_full_name(parent_name, f"sphere_{self.state.element_seq}")
         bp = GeomBlueprint(
             path=bp_name,
@@ -105,10 +197,11 @@ class SceneEditorController:
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
+        return bp.path
 
-    def create_mesh(
-        self, parent_name: str, mesh_path: Path, scale: float = 1.0
-    ) -> None:
+    @metrics.timed()
+    @ends_interaction
+    def create_mesh(self, parent_name: str, mesh_path: Path, scale: float = 1.0) -> str:
         bp_name = self.get_full_name(
             parent_name, f"asset_{mesh_path.name}_{self.state.element_seq}"
         )
@@ -123,11 +216,22 @@ class SceneEditorController:
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
+        return bp.path
 
     def update_history_btn_visibility(self):
-        self.renderer.layout.btn_undo.disabled = not bool(self.state.history_past)
+        if self.renderer.layout is None:
+            # headless
+            return
+        self.renderer.layout.btn_undo.disabled = not (
+            self.state.history_past or self.state.in_transaction
+        )
         self.renderer.layout.btn_redo.disabled = not bool(self.state.history_future)
+        self.renderer.layout.history_info.content = (
+            f"History: {self.state.history.summary()}"
+        )
 
+    @metrics.timed()
+    @ends_interaction
     def undo(self) -> None:
         has_changed = self.state.undo()
         if not has_changed:
@@ -135,6 +239,8 @@ class SceneEditorController:
         self.renderer.render_from_state(list(self.state.blueprints.values()))
         self.update_history_btn_visibility()
 
+    @metrics.timed()
+    @ends_interaction
     def redo(self) -> None:
         has_changed = self.state.redo()
         if not has_changed:
@@ -142,13 +248,16 @@ class SceneEditorController:
         self.renderer.render_from_state(list(self.state.blueprints.values()))
         self.update_history_btn_visibility()
 
+    @metrics.timed()
+    @ends_interaction
     def reset(self) -> None:
         self.state.reset()
         self.renderer.reset()
         self.update_history_btn_visibility()
 
-    def select(self, name: str) -> None:
-        self.renderer.on_select(name)
+    @metrics.timed()
+    def select(self, name: str, session) -> None:
+        self.renderer.on_select(name, session)
 
         if name not in self.state.blueprints:
             return
@@ -156,28 +265,106 @@ class SceneEditorController:
         bp = self.state.blueprints[name]
 
         if isinstance(bp, GeomBlueprint):
-            self.renderer.layout.prop_element_mass.disabled = False
-            self.renderer.layout.prop_element_mass.value = bp.mass
+            session.prop_element_mass.disabled = False
+            session.prop_element_mass.value = bp.mass
 
 
+    @metrics.timed()
+    @ends_interaction
     def remove(self, name: str) -> None:
         self.state.remove(name)
         self.renderer.remove(name)
         self.update_history_btn_visibility()
 
-    def export_scene(self, out_path: Path) -> None:
+    @metrics.timed()
+    @ends_interaction
+    def add_many(self, blueprints: Sequence[Blueprint]) -> None:
+        """
+        Adds the blueprints as a single history step and render batch.
+        """
+        self.state.add_many(blueprints)
+        self.renderer.add_many(list(blueprints))
+        self.update_history_btn_visibility()
+
+    @metrics.timed()
+    @ends_interaction
+    def remove_many(self, names: Sequence[str]) -> None:
+        self.state.remove_many(names)
+        self.renderer.remove_many(names)
+        self.update_history_btn_visibility()
+
+    @metrics.timed()
+    @ends_interaction
+    def move_many(self, names: Sequence[str], offset: Sequence[float]) -> None:
+        """
+        Translates the elements by ``offset`` in the frame of their parents.
+        """
+        updates = {}
+        for name in top_level_paths(names):
+            bp = self.state.blueprints.get(name, None)
+            if bp is None or not hasattr(bp, "pose"):
+                continue
+            pose = bp.pose or Pose()
+            updates[name] = {
+                "pose": pose.with_position(pose.position + np.asarray(offset))
+            }
+        self.state.update_many(updates)
+        if not updates:
+            return
+        names = list(updates.keys())
+        positions, wxyzs = transforms.matrix_to_pose(
+            np.stack([self.state.blueprints[name].pose.matrix for name in names])
+        )
+        self.renderer.update_poses(
+            {
+                name: (tuple(position), tuple(wxyz))
+                for name, position, wxyz in zip(names, positions, wxyzs)
+            }
+        )
+        self.update_history_btn_visibility()
+
+    @metrics.timed()
+    @ends_interaction
+    def reparent(self, names: Sequence[str], parent_name: str) -> Dict[str, str]:
+        """
+        Moves the elements below ``parent_name``. Returns the new names.
+        """
+        moves = self.state.reparent(names, parent_name)
+        moved_bps = [
+            bp
+            for bp in self.state.blueprints.values()
+            if any(_is_path_or_descendant(bp.path, n) for n in moves.values())
+        ]
+        self.renderer.replace_subtrees(list(moves.keys()), moved_bps)
+        self.update_history_btn_visibility()
+        return moves
+
+    @metrics.timed()
+    def export_scene(
+        self, out_path: Path, density: Optional[float] = None, mesh_index=None
+    ) -> None:
+        """
+        Writes the MuJoCo XML and the blueprints. If ``density`` is given, the
+        mass and inertia of movable objects are estimated from their geometry.
+        Mesh results are cached in ``mesh_index`` if one is given.
+        """
         # Sync robot joints from renderer without mutating history/state.
         all_joint_positions = self.renderer.get_joint_positions()
 
         bps_to_export: List[Blueprint] = []
         for name, bp in self.state.blueprints.items():
-            if isinstance(bp, (RobotBlueprint, GripperBlueprint)):
-                joint_positions = list(all_joint_positions.get(name, []))  # TODO M
+            if isinstance(bp, (RobotBlueprint, GripperBlueprint)) and (
+                name in all_joint_positions
+            ):
+                joint_positions = list(all_joint_positions[name])  # TODO M
                 bp = replace(bp, default_joint_positions=joint_positions)
             bps_to_export.append(bp)
 
+        if blueprint_io.is_binary_path(out_path):
+            blueprint_path = out_path
+        else:
+            blueprint_path = out_path.with_suffix(".json")
         out_path = out_path.with_suffix(".xml")
-        blueprint_path = out_path.with_suffix(".json")
         out_path.parent.mkdir(parents=True, exist_ok=True)
 
         logger.info(
@@ -187,34 +374,71 @@ class SceneEditorController:
             out_path.parent,
         )
 
-        # extract
-        import json
-        from robits.core.utils import MiscJSONEncoder
+        blueprint_io.save_blueprints(blueprint_path, bps_to_export)
 
-        blueprint_data = json.dumps(
-            {"blueprints": [b for b in bps_to_export]},
-            cls=MiscJSONEncoder,
-            indent=3,
-        )
-        with open(blueprint_path, "w", encoding="utf-8") as f:
-            f.write(blueprint_data)
+        if density is None:
+            from robits.sim.converters.mujoco_exporter import MujocoXMLExporter
 
-        from robits.sim.converters.mujoco_exporter import MujocoXMLExporter
+            MujocoXMLExporter().export_scene(out_path, bps_to_export)
+        else:
+            self._export_with_mass_properties(
+                out_path, bps_to_export, density, mesh_index
+            )
+        self.mark_saved()
 
-        MujocoXMLExporter().export_scene(out_path, bps_to_export)
+    def _export_with_mass_properties(
+        self,
+        out_path: Path,
+        blueprints: Sequence[Blueprint],
+        density: float,
+        mesh_index=None,
+    ) -> None:
+        from robits.sim.model_factory import SceneBuilder
+        from mujoco_scene_editor.utils import mass_properties
+
+        builder = SceneBuilder(add_floor=False)
+        builder.build_from_blueprints(blueprints)
+
+        meshes = mass_properties.mesh_keys(blueprints)
+        if mesh_index is not None:
+            mesh_properties = mesh_index.mass_properties(meshes)
+        else:
+            mesh_properties = {}
+            for key in dict.fromkeys(meshes):
+                try:
+                    mesh_properties[key] = mass_properties.mesh_mass_properties(*key)
+                except Exception as e:
+                    logger.warning("Unable to compute the inertia of %s: %s", key[0], e)
+        num_bodies = mass_properties.apply_mass_properties(
+            builder, blueprints, density, mesh_properties
+        )
+        logger.info("Estimated the inertia of %d bodies", num_bodies)
+        builder.export_with_assets(out_path)
 
+    @metrics.timed()
     def update_pose(
         self,
         name: str,
         position: Tuple[float, float, float],
         wxyz: Tuple[float, float, float, float],
+        interaction: Optional[Hashable] = None,
     ) -> None:
-        new_pose = Pose().with_position(position).with_quat_wxyz(wxyz)
+        """
+        Sets the pose of an element. Updates with the same ``interaction`` are
+        recorded as one undo step.
+        """
+        if interaction is None:
+            self.end_interaction()
+        else:
+            self.begin_interaction(interaction)
+        new_pose = Pose(transforms.pose_to_matrix(position, wxyz))
         self.state.update(name, pose=new_pose)
         self.renderer.update_pose(name, position, wxyz)
         self.update_history_btn_visibility()
 
-    def create_camera(self, camera_name: str) -> None:
+    @metrics.timed()
+    @ends_interaction
+    def create_camera(self, camera_name: str) -> str:
         adapter = BlueprintAdapter(camera_name)
         adapter.set_seq(self.state.element_seq)
         bp = adapter.to_camera_blueprint()
@@ -223,36 +447,78 @@ class SceneEditorController:
         self.renderer.add(bp)
 
         self.update_history_btn_visibility()
-
-    def create_robot(self, robot_config_name: str) -> None:
+        return bp.path
+
+    @metrics.timed()
+    @ends_interaction
+    def create_robot(self, robot_config_name: str) -> Optional[str]:
+        """
+        Adds the robot or, for bimanual configurations, both robots. Returns the
+        name of the robot that was added last.
+        """
         config_dict = config_manager.load_dict(robot_config_name)
         robot_name = config_dict.get("robot_name", "robot")
 
-        if left_config_name := config_dict.get("left_robot", None):
-            self._add_robot_from_config(left_config_name, robot_name)
+        bp_name = None
+        # bimanual robots are added as one undo step
+        with self.transaction():
+            if left_config_name := config_dict.get("left_robot", None):
+                bp_name = self._add_robot_from_config(left_config_name, robot_name)
 
-        if right_config_name := config_dict.get("right_robot", None):
-            self._add_robot_from_config(right_config_name, robot_name)
+            if right_config_name := config_dict.get("right_robot", None):
+                bp_name = self._add_robot_from_config(right_config_name, robot_name)
 
-        if "description_name" in config_dict:
-            self._add_robot_from_config(robot_config_name, robot_name)
+            if "description_name" in config_dict:
+                bp_name = self._add_robot_from_config(robot_config_name, robot_name)
 
-        self.update_history_btn_visibility()
+        return bp_name
 
-    def _add_robot_from_config(self, config_name, robot_name: str) -> None:
+    def _add_robot_from_config(self, config_name, robot_name: str) -> str:
         adapter = BlueprintAdapter(config_name)
         adapter.set_seq(self.state.element_seq)
 
         bp, gripper_bp = adapter.to_robot_bp(robot_name)
 
-        if gripper_bp:
-            self.state.add(gripper_bp)
-            self.renderer.add(gripper_bp)
-
-        self.state.add(bp)
-        self.renderer.add_robot(bp, gripper_bp)
+        with self.state.transaction():
+            if gripper_bp:
+                self.state.add(gripper_bp)
+                self.renderer.add(gripper_bp)
+
+            self.state.add(bp)
+            self.renderer.add_robot(bp, gripper_bp)
+        return bp.path
+
+    @metrics.timed()
+    @ends_interaction
+    def update_elements(self, names: Sequence[str], color, opacity, **kwargs) -> None:
+        """
+        Applies the properties to all elements that have them.
+        """
+        rgba = viser_utils.color_to_blueprint_rgba(color, opacity)
+        field_names = {"rgba", *kwargs.keys()}
+        names = [
+            name
+            for name in names
+            if (bp := self.state.blueprints.get(name, None)) is not None
+            and field_names <= {f.name for f in fields(bp)}
+        ]
+        self.state.update_many({name: dict(rgba=rgba, **kwargs) for name in names})
+        self.renderer.update_elements(names, color, opacity, **kwargs)
+        self.update_history_btn_visibility()
 
-    def update_element(self, name: str, color, opacity, **kwargs) -> None:
+    @metrics.timed()
+    def update_element(
+        self,
+        name: str,
+        color,
+        opacity,
+        interaction: Optional[Hashable] = None,
+        **kwargs,
+    ) -> None:
+        if interaction is None:
+            self.end_interaction()
+        else:
+            self.begin_interaction(interaction)
         rgba = viser_utils.color_to_blueprint_rgba(color, opacity)
         self.state.update(name, rgba=rgba, **kwargs)
         self.renderer.update_element(name, color, opacity, **kwargs)
@@ -0,0 +1,257 @@
+from typing import Callable
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import logging
+
+import numpy as np
+import viser
+
+from mujoco_scene_editor.gui.outliner import OutlinerPanel
+from mujoco_scene_editor.gui.outliner import SceneIndex
+from mujoco_scene_editor.gui.transform_panel import TransformPanel
+from mujoco_scene_editor.utils import viser_utils
+from mujoco_scene_editor.utils.rate_limiter import RateLimiter
+
+from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.constants import POSE_UPDATE_RATE_HZ
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSession:
+    """
+    GUI state of a single connected client.
+
+    Each client has its own selection, outliner, gizmo, transform and
+    properties panel. Scene nodes and the scene index are shared by all clients.
+    """
+
+    def __init__(
+        self,
+        client: viser.ClientHandle,
+        server: viser.ViserServer,
+        scene_index: SceneIndex,
+        element_order: float,
+        panel_order: float,
+        gizmo_visible: bool = True,
+        pose_rate_hz: float = POSE_UPDATE_RATE_HZ,
+    ) -> None:
+        self.client = client
+        self._server = server
+        self.gizmo: Optional[viser.TransformControlsHandle] = None
+        self.gizmo_visible = gizmo_visible
+        self.pose_rate_hz = pose_rate_hz
+        self._pose_streamer: Optional[RateLimiter] = None
+        # Node whose joint sliders are shown, if any
+        self._slider_node = None
+        self._slider_order = panel_order - 0.01
+        self.scene_index = scene_index
+        self._selection = NO_SELECTION
+        self._selection_callbacks: List[Callable[[], None]] = []
+        # Element and pose of the gizmo while it is dragged
+        self.drag_pose: Optional[Tuple[str, np.ndarray, np.ndarray]] = None
+        self._preview_key: Optional[Hashable] = None
+
+        gui = client.gui
+        with gui.add_folder("Elements", order=element_order):
+            self.outliner = OutlinerPanel(gui, scene_index, self.select)
+
+        with gui.add_folder("Transform", order=panel_order):
+            self.transform = TransformPanel(client)
+
+        with gui.add_folder("Properties", order=panel_order + 0.01):
+            self.prop_color = gui.add_rgb(
+                "Color",
+                initial_value=(200, 200, 200),
+            )
+            self.prop_opacity = gui.add_slider("Opacity", 0.0, 1.0, 0.01, 1.0)
+            self.prop_box_dims = gui.add_vector3(
+                "Box dimensions",
+                initial_value=(0.1, 0.1, 0.1),
+                min=(0.01, 0.01, 0.01),
+                step=0.01,
+            )
+            self.prop_sphere_radius = gui.add_slider(
+                "Sphere radius", 0.01, 2.0, 0.01, 0.05
+            )
+            self.prop_cyl_radius = gui.add_slider(
+                "Cylinder radius", 0.01, 2.0, 0.01, 0.05
+            )
+            self.prop_cyl_height = gui.add_slider(
+                "Cylinder height", 0.02, 4.0, 0.02, 0.2
+            )
+            self.prop_element_mass = gui.add_slider(
+                "Element mass", 0.02, 4.0, 0.02, 0.2
+            )
+            self.btn_update_element = gui.add_button("Update element")
+
+        with gui.add_folder(
+            "Multi-selection", order=panel_order + 0.02, expand_by_default=False
+        ):
+            self.bulk_offset = gui.add_vector3(
+                "Offset", initial_value=(0.0, 0.0, 0.0), step=0.01
+            )
+            self.btn_bulk_move = gui.add_button("Move selected")
+            self.bulk_color = gui.add_rgb("Color", initial_value=(200, 200, 200))
+            self.bulk_opacity = gui.add_slider("Opacity", 0.0, 1.0, 0.01, 1.0)
+            self.btn_bulk_color = gui.add_button("Recolor selected")
+            self.bulk_parent = gui.add_text("New parent", initial_value="")
+            self.btn_bulk_reparent = gui.add_button(
+                "Reparent selected", hint="Leave the parent empty to move to the root."
+            )
+
+        with gui.add_folder(
+            "Camera preview", order=panel_order + 0.03, expand_by_default=False
+        ):
+            self.preview_enabled = gui.add_checkbox(
+                "Show preview",
+                initial_value=False,
+                hint="Renders the view of the selected camera with MuJoCo.",
+            )
+            self.preview_image = gui.add_image(
+                np.zeros((1, 1, 3), dtype=np.uint8), format="jpeg", visible=False
+            )
+            self.preview_info = gui.add_markdown("Select a camera.")
+
+    @property
+    def client_id(self) -> int:
+        return self.client.client_id
+
+    @property
+    def selection(self) -> str:
+        return self._selection
+
+    def selected_names(self) -> List[str]:
+        """
+        Returns the multi-selection or, if there is none, the selected element.
+        """
+        if self.outliner.marked:
+            return sorted(self.outliner.marked)
+        if self._selection == NO_SELECTION:
+            return []
+        return [self._selection]
+
+    def on_selection_change(self, cb: Callable[[], None]) -> None:
+        self._selection_callbacks.append(cb)
+
+    def select(self, name: str) -> None:
+        self._selection = name
+        self.outliner.set_selection(name)
+        for cb in self._selection_callbacks:
+            cb()
+
+    def refresh_elements(self) -> None:
+        """
+        Updates the outliner after the scene changed. Deselects the current
+        element if it was removed.
+        """
+        if self._selection != NO_SELECTION and self._selection not in self.scene_index:
+            self.select(NO_SELECTION)
+        else:
+            self.outliner.refresh()
+
+    def show_preview(
+        self, key: Hashable, frame: Optional[np.ndarray], error: Optional[str]
+    ) -> None:
+        """
+        Shows a rendered camera view. Frames with the same ``key`` are only sent
+        once.
+        """
+        if error is not None:
+            self.clear_preview(f"Preview unavailable: {error}")
+        elif key != self._preview_key:
+            self._preview_key = key
+            with self.client.atomic():
+                self.preview_image.image = frame
+                self.preview_image.visible = True
+                self.preview_info.content = ""
+
+    def clear_preview(self, text: str = "Select a camera.") -> None:
+        if self._preview_key is None and self.preview_info.content == text:
+            return
+        self._preview_key = None
+        self.preview_image.visible = False
+        self.preview_info.content = text
+
+    def disable_all_properties_gui_elements(self) -> None:
+        self.prop_color.disabled = True
+        self.prop_opacity.disabled = True
+        self.prop_box_dims.disabled = True
+        self.prop_sphere_radius.disabled = True
+        self.prop_cyl_radius.disabled = True
+        self.prop_cyl_height.disabled = True
+        self.prop_element_mass.disabled = True
+
+    def clear_selection(self) -> None:
+        """
+        Removes the gizmo and the joint sliders of the selected element.
+        """
+        self.remove_gizmo()
+        if self._slider_node is not None:
+            self._slider_node.hide_joint_sliders(self.client_id)
+            self._slider_node = None
+
+    def remove_gizmo(self) -> None:
+        self.drag_pose = None
+        if self._pose_streamer:
+            self._pose_streamer.cancel()
+            self._pose_streamer = None
+        if self.gizmo:
+            self.gizmo.remove()
+            self.gizmo = None
+
+    def set_pose_rate(self, rate_hz: float) -> None:
+        self.pose_rate_hz = rate_hz
+        if self._pose_streamer:
+            self._pose_streamer.rate_hz = rate_hz
+
+    def set_gizmo_visible(self, visible: bool) -> None:
+        self.gizmo_visible = visible
+        if self.gizmo:
+            self.gizmo.visible = visible
+
+    def on_select(self, node) -> None:
+        """
+        Shows a gizmo and, for robots, joint sliders for the selected node. Both
+        only exist on this client.
+        """
+        self.transform.on_select(node)
+        if self._pose_streamer:
+            self._pose_streamer.flush()
+        self.clear_selection()
+
+        if hasattr(node, "show_joint_sliders"):
+            node.show_joint_sliders(self.client, order=self._slider_order)
+            self._slider_node = node
+
+        parent_node_name = viser_utils.parent_name(node.name)
+        base_node_name = viser_utils.base_name(node.name)
+
+        gizmo = self.client.scene.add_transform_controls(
+            f"{parent_node_name}/{base_node_name}_transform",
+            visible=self.gizmo_visible,
+            position=node.position,
+            wxyz=node.wxyz,
+        )
+
+        def move_node(position, wxyz) -> None:
+            with self._server.atomic():
+                node.position = position
+                node.wxyz = wxyz
+
+        streamer = RateLimiter(move_node, self.pose_rate_hz, "gizmo_pose")
+
+        @gizmo.on_update
+        def _(_evt: viser.GuiEvent) -> None:
+            self.drag_pose = (self._selection, gizmo.position, gizmo.wxyz)
+            streamer.submit(gizmo.position, gizmo.wxyz)
+
+        @gizmo.on_drag_end
+        def _(_evt: viser.GuiEvent) -> None:
+            streamer.flush()
+
+        self.gizmo = gizmo
+        self._pose_streamer = streamer
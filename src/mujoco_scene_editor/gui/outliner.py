@@ -0,0 +1,390 @@
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import bisect
+import logging
+import threading
+from dataclasses import dataclass
+
+import viser
+
+from mujoco_scene_editor.constants import ALL_KINDS
+from mujoco_scene_editor.constants import ELEMENT_KINDS
+from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.constants import OUTLINER_ROWS
+from mujoco_scene_editor.utils import viser_utils
+
+logger = logging.getLogger(__name__)
+
+
+# Non-breaking spaces so that the indentation survives in the button labels
+INDENT = "\u00a0\u00a0\u00a0"
+
+
+class SceneIndex:
+    """
+    Hierarchical index of the scene element paths. Shared by all clients.
+
+    An element is listed below its closest indexed ancestor. Children are kept
+    sorted so that expanding a group does not sort the whole scene.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._kinds: Dict[str, str] = {}
+        self._parents: Dict[str, str] = {}
+        self._children: Dict[str, List[str]] = {"": []}
+        # Incremented on every change so that views know when to recompute
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._kinds
+
+    def _closest_ancestor(self, path: str) -> str:
+        parent = viser_utils.parent_name(path)
+        while parent and parent not in self._kinds:
+            parent = viser_utils.parent_name(parent)
+        return parent
+
+    def add(self, path: str, kind: str = "") -> None:
+        with self._lock:
+            self.version += 1
+            if path in self._kinds:
+                self._kinds[path] = kind
+                return
+
+            parent = self._closest_ancestor(path)
+            siblings = self._children[parent]
+
+            # adopt elements that were added before this one
+            prefix = f"{path}/"
+            start = bisect.bisect_left(siblings, prefix)
+            end = start
+            while end < len(siblings) and siblings[end].startswith(prefix):
+                end += 1
+            adopted = siblings[start:end]
+            del siblings[start:end]
+            for child in adopted:
+                self._parents[child] = path
+
+            bisect.insort(siblings, path)
+            self._kinds[path] = kind
+            self._parents[path] = parent
+            self._children[path] = adopted
+
+    def remove(self, path: str) -> None:
+        """
+        Removes ``path`` and all its descendants.
+        """
+        with self._lock:
+            if path not in self._kinds:
+                return
+            self.version += 1
+            siblings = self._children[self._parents[path]]
+            del siblings[bisect.bisect_left(siblings, path)]
+
+            stack = [path]
+            while stack:
+                p = stack.pop()
+                stack.extend(self._children.pop(p))
+                self._kinds.pop(p)
+                self._parents.pop(p)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._kinds.clear()
+            self._parents.clear()
+            self._children = {"": []}
+
+    def kind(self, path: str) -> str:
+        return self._kinds.get(path, "")
+
+    def parent(self, path: str) -> str:
+        return self._parents.get(path, "")
+
+    def children(self, path: str = "") -> Tuple[str, ...]:
+        with self._lock:
+            return tuple(self._children.get(path, ()))
+
+    def has_children(self, path: str) -> bool:
+        return bool(self._children.get(path, None))
+
+    def search(self, query: str = "", kind: str = "") -> List[str]:
+        """
+        Returns the sorted paths whose name contains ``query`` and whose kind
+        is ``kind``. Both are optional.
+        """
+        query = query.lower()
+        with self._lock:
+            items = list(self._kinds.items())
+        return sorted(
+            path
+            for path, k in items
+            if (not kind or k == kind)
+            and (not query or query in viser_utils.base_name(path).lower())
+        )
+
+
+@dataclass(frozen=True)
+class OutlinerRow:
+    path: str
+    kind: str
+    depth: int
+    has_children: bool
+    expanded: bool
+
+
+class OutlinerView:
+    """
+    Expanded groups, filter and page of the outliner of a single client.
+
+    Without a filter the expanded part of the tree is listed. With a filter the
+    matching elements are listed flat.
+    """
+
+    def __init__(self, index: SceneIndex, page_size: int = OUTLINER_ROWS) -> None:
+        self.index = index
+        self.page_size = page_size
+        self.expanded: Set[str] = set()
+        self.query = ""
+        self.kind = ""
+        self.page = 0
+
+        self._cache_key: Optional[Tuple] = None
+        self._visible: List[Tuple[str, int]] = []
+
+    @property
+    def is_filtered(self) -> bool:
+        return bool(self.query or self.kind)
+
+    def set_filter(self, query: str = "", kind: str = "") -> None:
+        self.query = query.strip()
+        self.kind = kind
+        self.page = 0
+
+    def toggle(self, path: str) -> None:
+        if path in self.expanded:
+            self.expanded.discard(path)
+        elif self.index.has_children(path):
+            self.expanded.add(path)
+
+    def visible_paths(self) -> List[Tuple[str, int]]:
+        """
+        Returns all listed paths with their depth in the tree.
+        """
+        key = (self.index.version, frozenset(self.expanded), self.query, self.kind)
+        if key == self._cache_key:
+            return self._visible
+
+        if self.is_filtered:
+            visible = [(p, 0) for p in self.index.search(self.query, self.kind)]
+        else:
+            visible = []
+            stack = [(p, 0) for p in reversed(self.index.children())]
+            while stack:
+                path, depth = stack.pop()
+                visible.append((path, depth))
+                if path in self.expanded:
+                    children = self.index.children(path)
+                    stack.extend((p, depth + 1) for p in reversed(children))
+
+        self._cache_key = key
+        self._visible = visible
+        return visible
+
+    @property
+    def num_pages(self) -> int:
+        return max(1, -(-len(self.visible_paths()) // self.page_size))
+
+    def set_page(self, page: int) -> None:
+        self.page = min(max(page, 0), self.num_pages - 1)
+
+    def reveal(self, path: str) -> None:
+        """
+        Expands the ancestors of ``path`` and shows the page that lists it.
+        """
+        if path not in self.index:
+            return
+        parent = self.index.parent(path)
+        while parent:
+            self.expanded.add(parent)
+            parent = self.index.parent(parent)
+        for i, (p, _depth) in enumerate(self.visible_paths()):
+            if p == path:
+                self.page = i // self.page_size
+                return
+
+    def rows(self) -> List[OutlinerRow]:
+        self.set_page(self.page)
+        start = self.page * self.page_size
+        return [
+            OutlinerRow(
+                path,
+                self.index.kind(path),
+                depth,
+                self.index.has_children(path),
+                path in self.expanded,
+            )
+            for path, depth in self.visible_paths()[start : start + self.page_size]
+        ]
+
+
+def row_label(row: OutlinerRow, is_filtered: bool) -> str:
+    if is_filtered:
+        return f"{row.path} ({row.kind})"
+    if row.has_children:
+        marker = "▾" if row.expanded else "▸"
+    else:
+        marker = "·"
+    return f"{INDENT * row.depth}{marker} {viser_utils.base_name(row.path)}"
+
+
+class OutlinerPanel:
+    """
+    Paged outliner of the scene elements.
+
+    Uses a fixed pool of row buttons. Only rows whose content changed are
+    sent to the client.
+
+    With multi-select enabled, clicking a row marks or unmarks it instead of
+    selecting it.
+    """
+
+    def __init__(
+        self,
+        gui: viser.GuiApi,
+        index: SceneIndex,
+        on_click: Callable[[str], None],
+        num_rows: int = OUTLINER_ROWS,
+    ) -> None:
+        self.view = OutlinerView(index, num_rows)
+        self.selection = NO_SELECTION
+        # Elements of the multi-selection
+        self.marked: Set[str] = set()
+        self._on_click = on_click
+        self._lock = threading.RLock()
+
+        self.txt_search = gui.add_text("Search", initial_value="")
+        self.kind_list = gui.add_dropdown(
+            "Type", options=(ALL_KINDS,) + ELEMENT_KINDS, initial_value=ALL_KINDS
+        )
+        self.btn_deselect = gui.add_button("Deselect")
+        self.multi_select = gui.add_checkbox("Multi-select", initial_value=False)
+        self.btn_mark_children = gui.add_button(
+            "Select children", hint="Adds the children of the selected group."
+        )
+        self.btn_clear_marks = gui.add_button("Clear multi-selection")
+
+        self._row_buttons: List[viser.GuiButtonHandle] = []
+        self._row_paths: List[Optional[str]] = []
+        # (label, color) of each row as last sent to the client
+        self._row_states: List[Tuple[str, Optional[str]]] = []
+        for i in range(num_rows):
+            button = gui.add_button("", visible=False)
+            button.on_click(lambda _evt, i=i: self._on_row_click(i))
+            self._row_buttons.append(button)
+            self._row_paths.append(None)
+            self._row_states.append(("", None))
+
+        self.page_buttons = gui.add_button_group("Page", ("◀", "▶"))
+        self.page_info = gui.add_markdown("")
+
+        self.txt_search.on_update(self._on_filter_change)
+        self.kind_list.on_update(self._on_filter_change)
+        self.btn_deselect.on_click(lambda _evt: self._on_click(NO_SELECTION))
+        self.btn_mark_children.on_click(lambda _evt: self.mark_children(self.selection))
+        self.btn_clear_marks.on_click(lambda _evt: self.set_marked(()))
+        self.page_buttons.on_click(self._on_page_click)
+
+        self.refresh()
+
+    def _on_filter_change(self, _evt: viser.GuiEvent) -> None:
+        kind = self.kind_list.value
+        self.view.set_filter(self.txt_search.value, "" if kind == ALL_KINDS else kind)
+        self.refresh()
+
+    def _on_page_click(self, _evt: viser.GuiEvent) -> None:
+        step = -1 if self.page_buttons.value == "◀" else 1
+        self.view.set_page(self.view.page + step)
+        self.refresh()
+
+    def _on_row_click(self, i: int) -> None:
+        path = self._row_paths[i]
+        if path is None:
+            return
+        if self.multi_select.value:
+            self.marked.symmetric_difference_update((path,))
+            self.refresh()
+            return
+        if not self.view.is_filtered and (
+            path == self.selection or path not in self.view.expanded
+        ):
+            self.view.toggle(path)
+        self._on_click(path)
+        self.refresh()
+
+    def set_selection(self, path: str) -> None:
+        self.selection = path
+        if not self.view.is_filtered:
+            self.view.reveal(path)
+        self.refresh()
+
+    def set_marked(self, paths: Iterable[str]) -> None:
+        self.marked = set(paths)
+        self.refresh()
+
+    def mark_children(self, path: str) -> None:
+        children = self.view.index.children(path) if path != NO_SELECTION else ()
+        self.marked.update(children)
+        if children:
+            self.view.expanded.add(path)
+        self.refresh()
+
+    def refresh(self) -> None:
+        with self._lock:
+            # drop removed elements
+            self.marked = {p for p in self.marked if p in self.view.index}
+            self._refresh()
+
+    def _refresh(self) -> None:
+        rows = self.view.rows()
+        is_filtered = self.view.is_filtered
+        for i, button in enumerate(self._row_buttons):
+            if i < len(rows):
+                path = rows[i].path
+                if path == self.selection:
+                    color = "blue"
+                elif path in self.marked:
+                    color = "green"
+                else:
+                    color = None
+                state = (row_label(rows[i], is_filtered), color)
+            else:
+                path = None
+                state = ("", None)
+
+            self._row_paths[i] = path
+            if state == self._row_states[i]:
+                continue
+            label, color = state
+            if label:
+                button.label = label
+            button.color = color
+            button.visible = bool(label)
+            self._row_states[i] = state
+
+        num_visible = len(self.view.visible_paths())
+        info = (
+            f"Page {self.view.page + 1} of {self.view.num_pages} ({num_visible} rows)"
+        )
+        if self.page_info.content != info:
+            self.page_info.content = info
@@ -1,4 +1,8 @@
+from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import List
+from typing import Sequence
 from typing import Tuple
 from typing import Optional
 from typing import Union
@@ -6,14 +10,16 @@ from typing import Union
 import numpy as np
 import logging
 
-from robot_descriptions.loaders.yourdfpy import load_robot_description
-
 #  from viser import FrameHandle
+import viser
 from viser import TransformControlsHandle
 from viser.extras import ViserUrdf
 
 from mujoco_scene_editor.utils import viser_utils
 from mujoco_scene_editor.utils import urdf_utils
+from mujoco_scene_editor.utils import urdf_cache
+from mujoco_scene_editor.utils.rate_limiter import RateLimiter
+from mujoco_scene_editor.constants import POSE_UPDATE_RATE_HZ
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +33,19 @@ class RobotNode:
         position: Tuple[float, float, float] = (0.0, 0.0, 0.0),
         wxyz: Tuple[float, float, float, float] = (1.0, 0.0, 0.0, 0.0),
         create_eef_gizmo: bool = False,
+        pose_rate_hz: float = POSE_UPDATE_RATE_HZ,
     ) -> None:
+        self._server = layout.server
+        self.pose_rate_hz = pose_rate_hz
+        # Coalesce the updates caused by dragging the eef gizmo
+        self.rate_limiters: List[RateLimiter] = []
+
         self.robot_base = layout.server.scene.add_frame(
             name, show_axes=False, position=position, wxyz=wxyz
         )
 
         if urdf_desc_name:
-            urdf = load_robot_description(urdf_desc_name)
+            urdf = urdf_cache.load_urdf(urdf_desc_name)
         else:
             logger.warning("Unable to find model. Using fallback model.")
             urdf = urdf_utils.fallback_urdf_model
@@ -41,17 +53,15 @@ class RobotNode:
         self.viser_urdf = ViserUrdf(
             layout.server, urdf_or_path=urdf, root_node_name=self.robot_base.name
         )
-        with layout.server.gui.add_folder(f"Joint position control for {name}"):
-            self.slider_handles, initial_config = (
-                viser_utils.create_robot_control_sliders(layout.server, self.viser_urdf)
-            )
-        self.current_joint_positions = np.array(initial_config)
-
-        for i, handle in enumerate(self.slider_handles):
-
-            @handle.on_update
-            def _(_e, idx=i, h=handle):
-                self.current_joint_positions[idx] = h.value
+        self.joint_names, self.joint_lower, self.joint_upper = viser_utils.joint_limits(
+            self.viser_urdf
+        )
+        self.joint_positions = viser_utils.initial_joint_positions(
+            self.joint_lower, self.joint_upper
+        )
+        # Sliders only exist while a client has the robot selected. Keyed by client id.
+        self._slider_folders: Dict[int, viser.GuiFolderHandle] = {}
+        self._sliders: Dict[int, List[viser.GuiInputHandle[float]]] = {}
 
         self.eef_gizmo: Optional[TransformControlsHandle] = None
 
@@ -86,7 +96,21 @@ class RobotNode:
     def on_click(self, *args, **kwargs):
         return self.robot_base.on_click(*args, **kwargs)
 
+    def rate_limited(self, fn: Callable[..., Any], name: str) -> RateLimiter:
+        limiter = RateLimiter(fn, self.pose_rate_hz, name)
+        self.rate_limiters.append(limiter)
+        return limiter
+
+    def set_pose_rate(self, rate_hz: float) -> None:
+        self.pose_rate_hz = rate_hz
+        for limiter in self.rate_limiters:
+            limiter.rate_hz = rate_hz
+
     def remove(self) -> None:
+        for limiter in self.rate_limiters:
+            limiter.cancel()
+        for client_id in list(self._slider_folders.keys()):
+            self.hide_joint_sliders(client_id)
         self.viser_urdf.remove()
         self.robot_base.remove()
         if self.eef_gizmo:
@@ -107,7 +131,64 @@ class RobotNode:
             self.gripper_node.visible = visible
 
     def get_joint_positions(self) -> List[float]:
-        return self.current_joint_positions.tolist()
+        return self.joint_positions.tolist()
+
+    @property
+    def num_joints(self) -> int:
+        return len(self.joint_names)
+
+    def set_joint_positions(self, joint_positions: Sequence[float]) -> None:
+        """
+        Sets the first ``num_joints`` positions and updates the sliders of all
+        clients that show them.
+        """
+        joint_positions = np.asarray(joint_positions, dtype=float)[: self.num_joints]
+        self.joint_positions[: len(joint_positions)] = joint_positions
+        self.viser_urdf.update_cfg(self.joint_positions)
+        for client_id in list(self._sliders.keys()):
+            self._sync_sliders(client_id)
+
+    def _on_slider_change(self, idx: int, value: float, evt: viser.GuiEvent) -> None:
+        if evt.client is None:
+            # set programmatically by _sync_sliders
+            return
+        self.joint_positions[idx] = value
+        self.viser_urdf.update_cfg(self.joint_positions)
+        for client_id in list(self._sliders.keys()):
+            if client_id != evt.client_id:
+                self._sync_sliders(client_id)
+
+    def _sync_sliders(self, client_id: int) -> None:
+        sliders = self._sliders.get(client_id, ())
+        for slider, q in zip(sliders, self.joint_positions):
+            slider.value = float(q)
+
+    def show_joint_sliders(self, client: viser.ClientHandle, order: float) -> None:
+        """
+        Adds a slider per joint to the GUI of ``client``.
+        """
+        if client.client_id in self._slider_folders or not self.num_joints:
+            return
+        with client.atomic():
+            folder = client.gui.add_folder(
+                f"Joint position control for {self.name}", order=order
+            )
+            with folder:
+                sliders = viser_utils.create_robot_control_sliders(
+                    client.gui,
+                    self.joint_names,
+                    self.joint_lower,
+                    self.joint_upper,
+                    self.joint_positions,
+                    self._on_slider_change,
+                )
+        self._slider_folders[client.client_id] = folder
+        self._sliders[client.client_id] = sliders
+
+    def hide_joint_sliders(self, client_id: int) -> None:
+        self._sliders.pop(client_id, None)
+        if folder := self._slider_folders.pop(client_id, None):
+            folder.remove()
 
     def attach_gripper_node(self, gripper_node: "RobotNode", attachment):
         self.gripper_node = gripper_node
@@ -115,8 +196,15 @@ class RobotNode:
         gripper_node.position = self.eef_gizmo.position
         gripper_node.wxyz = self.eef_gizmo.wxyz
 
+        def move_gripper(position, wxyz) -> None:
+            with self._server.atomic():
+                gripper_node.position = position
+                gripper_node.wxyz = wxyz
+
+        limiter = self.rate_limited(move_gripper, "gripper_pose")
+
         def move_gripper_cb(_e):
-            gripper_node.position = self.eef_gizmo.position
-            gripper_node.wxyz = self.eef_gizmo.wxyz
+            limiter.submit(self.eef_gizmo.position, self.eef_gizmo.wxyz)
 
         self.eef_gizmo.on_update(move_gripper_cb)
+        self.eef_gizmo.on_drag_end(lambda _e: limiter.flush())
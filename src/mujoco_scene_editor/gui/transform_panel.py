@@ -1,8 +1,8 @@
 from typing import Tuple
 
 import numpy as np
-from scipy.spatial.transform import Rotation as R
 
+from mujoco_scene_editor.utils import transforms
 from mujoco_scene_editor.utils import viser_utils
 
 
@@ -46,5 +46,4 @@ class TransformPanel:
         self,
     ) -> Tuple[np.ndarray, np.ndarray]:
         position = self.position.value
-        xyzw = R.from_euler("XYZ", self.angles.value, degrees=True).as_quat()
-        return position, viser_utils.xyzw_to_wxyz(xyzw)
+        return position, transforms.euler_to_quat(self.angles.value, degrees=True)
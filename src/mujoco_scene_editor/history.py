@@ -0,0 +1,209 @@
+"""
+Undo and redo history with a memory budget.
+
+Snapshots of the scene are stored pickled, which is faster than a deep copy
+and gives their exact size. Apart from the most recent ones they are
+compressed. If the history exceeds its memory budget the oldest entries are
+moved to a temporary file and read back on undo, or dropped if spilling is
+disabled. At most ``max_entries`` entries are kept in total.
+"""
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import IO
+
+import logging
+import pickle
+import tempfile
+import zlib
+from dataclasses import dataclass
+
+from robits.sim.blueprints import Blueprint
+
+from mujoco_scene_editor.constants import HISTORY_MAX_ENTRIES
+from mujoco_scene_editor.constants import HISTORY_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+# Entries next to the current scene that are kept uncompressed
+NUM_UNCOMPRESSED = 2
+
+# Fast compression since a snapshot is taken on every edit
+COMPRESSION_LEVEL = 1
+
+Snapshot = Dict[str, Blueprint]
+
+
+@dataclass
+class HistoryEntry:
+    # None once spilled to disk
+    data: Optional[bytes]
+    is_compressed: bool = False
+    offset: int = 0
+    size: int = 0
+
+    @property
+    def is_spilled(self) -> bool:
+        return self.data is None
+
+
+class History:
+    """
+    Stack of past and future snapshots of the scene.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = HISTORY_MAX_MB * 1024 * 1024,
+        max_entries: int = HISTORY_MAX_ENTRIES,
+        spill: bool = True,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.spill = spill
+        self.past: List[HistoryEntry] = []
+        self.future: List[HistoryEntry] = []
+        self._spill_file: Optional[IO[bytes]] = None
+        self._spill_size = 0
+
+    def __len__(self) -> int:
+        return len(self.past) + len(self.future)
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Size of the snapshots held in memory.
+        """
+        return sum(len(e.data) for e in self.past + self.future if e.data is not None)
+
+    @property
+    def disk_bytes(self) -> int:
+        """
+        Size of the snapshots spilled to disk.
+        """
+        return sum(e.size for e in self.past + self.future if e.is_spilled)
+
+    def summary(self) -> str:
+        text = f"{len(self.past)} undo / {len(self.future)} redo steps, "
+        text += f"{self.memory_bytes / 1e6:.1f} MB"
+        if disk_bytes := self.disk_bytes:
+            text += f" + {disk_bytes / 1e6:.1f} MB on disk"
+        return text
+
+    def push(self, snapshot: Snapshot) -> None:
+        """
+        Records the scene before an edit. Clears the redo steps.
+        """
+        self.future.clear()
+        self.past.append(self._encode(snapshot))
+        self._enforce_budget()
+
+    def undo(self, current: Snapshot) -> Optional[Snapshot]:
+        """
+        Returns the previous scene and records ``current`` for redo.
+        """
+        if not self.past:
+            return None
+        previous = self._decode(self.past.pop())
+        self.future.append(self._encode(current))
+        self._enforce_budget()
+        return previous
+
+    def redo(self, current: Snapshot) -> Optional[Snapshot]:
+        """
+        Returns the next scene and records ``current`` for undo.
+        """
+        if not self.future:
+            return None
+        following = self._decode(self.future.pop())
+        self.past.append(self._encode(current))
+        self._enforce_budget()
+        return following
+
+    def clear(self) -> None:
+        self.past.clear()
+        self.future.clear()
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            self._spill_size = 0
+
+    def _encode(self, snapshot: Snapshot) -> HistoryEntry:
+        return HistoryEntry(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _decode(self, entry: HistoryEntry) -> Snapshot:
+        data = entry.data
+        if data is None:
+            self._spill_file.seek(entry.offset)
+            data = self._spill_file.read(entry.size)
+        if entry.is_compressed:
+            data = zlib.decompress(data)
+        return pickle.loads(data)
+
+    def _compress(self, entry: HistoryEntry) -> None:
+        if entry.is_compressed or entry.data is None:
+            return
+        entry.data = zlib.compress(entry.data, COMPRESSION_LEVEL)
+        entry.is_compressed = True
+
+    def _write_to_disk(self, entry: HistoryEntry) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="mjedit-history-")
+        self._compress(entry)
+        self._spill_file.seek(self._spill_size)
+        self._spill_file.write(entry.data)
+        entry.offset = self._spill_size
+        entry.size = len(entry.data)
+        entry.data = None
+        self._spill_size += entry.size
+
+    def _compact(self) -> None:
+        """
+        Moves the spilled entries to the start of the file, which frees the
+        space of entries that were dropped or read back.
+        """
+        spilled = sorted(
+            (e for e in self.past + self.future if e.is_spilled), key=lambda e: e.offset
+        )
+        end = 0
+        for entry in spilled:
+            # entries only move towards the start, so none is overwritten
+            if entry.offset != end:
+                self._spill_file.seek(entry.offset)
+                data = self._spill_file.read(entry.size)
+                self._spill_file.seek(end)
+                self._spill_file.write(data)
+                entry.offset = end
+            end += entry.size
+        self._spill_file.truncate(end)
+        self._spill_size = end
+
+    def _drop_oldest(self) -> None:
+        # the redo stack is only non-empty after an undo, so the past is older
+        (self.past or self.future).pop(0)
+
+    def _enforce_budget(self) -> None:
+        for stack in (self.past, self.future):
+            for entry in stack[: max(0, len(stack) - NUM_UNCOMPRESSED)]:
+                self._compress(entry)
+
+        while len(self) > self.max_entries:
+            self._drop_oldest()
+
+        memory_bytes = self.memory_bytes
+        for entry in self.past + self.future:
+            if memory_bytes <= self.max_bytes:
+                break
+            if entry.is_spilled:
+                continue
+            memory_bytes -= len(entry.data)
+            if self.spill:
+                self._write_to_disk(entry)
+            else:
+                self._drop_oldest()
+
+        # compacting once the unused space exceeds the used one keeps the file
+        # at most twice the size of the spilled entries
+        if self._spill_file is not None and self._spill_size > 2 * self.disk_bytes:
+            self._compact()
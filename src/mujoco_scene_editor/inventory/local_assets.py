@@ -3,11 +3,11 @@ from typing import List
 from typing import Sequence
 from typing import Optional
 
-import datetime
+import os
 from dataclasses import dataclass
 from pathlib import Path
 
-from cachier import cachier
+from mujoco_scene_editor.utils.disk_cache import cached
 
 ASSET_EXTS: Sequence[str] = (
     ".obj",
@@ -34,16 +34,33 @@ def _iter_asset_files(root: Path, exts: Iterable[str]) -> Iterable[Path]:
             yield p
 
 
+def _resolve(root: Path) -> Path:
+    return Path(root).expanduser().resolve()
+
+
+def _scanned_dirs(root: Path) -> List[Path]:
+    # Adding, removing or renaming an asset changes the modification time of
+    # its directory. Listing directories is much cheaper than the scan itself.
+    root = _resolve(root)
+    return [root] + [Path(d) / n for d, dirs, _ in os.walk(root) for n in dirs]
+
+
 class Inventory:
     """
     Lightweight asset inventory backed by a directory scan.
 
-    Use scan_assets_cached for caching, keep interface minimal.
+    Listings are cached per root. They are renewed when a directory below the
+    root changes or after 30 days. Pass ``refresh_cache=True`` to rescan.
     """
 
-    @cachier(stale_after=datetime.timedelta(days=30))
+    @cached(
+        "local_assets",
+        key=lambda self, root: str(_resolve(root)),
+        deps=lambda self, root: _scanned_dirs(root),
+        max_age=30 * 24 * 3600.0,
+    )
     def list(self, root: Path) -> List[ObjectModel]:
-        root = Path(root).expanduser().resolve()
+        root = _resolve(root)
 
         if not root.exists() or not root.is_dir():
             return []
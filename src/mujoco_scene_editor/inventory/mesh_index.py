@@ -0,0 +1,417 @@
+"""
+SQLite index of mesh statistics and asset scales.
+
+The statistics of each mesh are computed once per content hash in a pool of
+worker processes. They are used to guess the unit of a mesh and the scale that
+gives it a plausible size. Objects of a class are assumed to have a similar
+size, so the scales set by the user for objects of the same class are
+preferred over the guess. These overrides are stored in the index as well.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
+import math
+import multiprocessing
+import os
+from pathlib import Path
+import sqlite3
+import statistics
+import threading
+
+from mujoco_scene_editor.constants import DEFAULT_MESH_INDEX
+from mujoco_scene_editor.inventory.thumbnails import file_digest
+from mujoco_scene_editor.utils.mass_properties import MassProperties
+from mujoco_scene_editor.utils.mass_properties import MeshKey
+from mujoco_scene_editor.utils.mass_properties import mesh_mass_properties
+
+logger = logging.getLogger(__name__)
+
+# Scale if nothing is known about a mesh, i.e., centimeters
+FALLBACK_SCALE = 0.01
+
+# Units that meshes are assumed to be in, from meters to millimeters
+UNIT_SCALES = (1.0, 0.1, 0.01, 0.001)
+
+# Size in meters of objects of an unknown class
+DEFAULT_OBJECT_SIZE = 0.25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    digest TEXT PRIMARY KEY,
+    num_vertices INTEGER NOT NULL,
+    num_triangles INTEGER NOT NULL,
+    min_x REAL, min_y REAL, min_z REAL,
+    max_x REAL, max_y REAL, max_z REAL,
+    is_watertight INTEGER NOT NULL,
+    volume REAL,
+    centroid_x REAL, centroid_y REAL, centroid_z REAL
+);
+CREATE TABLE IF NOT EXISTS objects (
+    uid TEXT PRIMARY KEY,
+    label TEXT,
+    path TEXT
+);
+CREATE INDEX IF NOT EXISTS objects_label ON objects (label);
+CREATE TABLE IF NOT EXISTS scale_overrides (
+    uid TEXT PRIMARY KEY,
+    scale REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mass_properties (
+    digest TEXT NOT NULL,
+    scale REAL NOT NULL,
+    volume REAL NOT NULL,
+    com_x REAL, com_y REAL, com_z REAL,
+    ixx REAL, iyy REAL, izz REAL, ixy REAL, ixz REAL, iyz REAL,
+    is_convex_hull INTEGER NOT NULL,
+    PRIMARY KEY (digest, scale)
+);
+"""
+
+
+@dataclass(frozen=True)
+class MeshStats:
+    digest: str
+    num_vertices: int
+    num_triangles: int
+    aabb_min: Tuple[float, float, float]
+    aabb_max: Tuple[float, float, float]
+    is_watertight: bool
+    # Only set for watertight meshes
+    volume: Optional[float]
+    centroid: Tuple[float, float, float]
+
+    @property
+    def extent(self) -> float:
+        """
+        Largest side of the bounding box.
+        """
+        return max(hi - lo for lo, hi in zip(self.aabb_min, self.aabb_max))
+
+
+def compute_mesh_stats(mesh_path: Path, digest: Optional[str] = None) -> MeshStats:
+    import trimesh
+
+    mesh = trimesh.load(mesh_path, force="mesh")
+    if len(mesh.vertices) == 0:
+        raise ValueError(f"Mesh {mesh_path} has no vertices")
+    aabb_min, aabb_max = mesh.bounds
+    is_watertight = bool(mesh.is_watertight)
+    return MeshStats(
+        digest=digest or file_digest(Path(mesh_path)),
+        num_vertices=len(mesh.vertices),
+        num_triangles=len(mesh.faces),
+        aabb_min=tuple(float(v) for v in aabb_min),
+        aabb_max=tuple(float(v) for v in aabb_max),
+        is_watertight=is_watertight,
+        volume=float(mesh.volume) if is_watertight else None,
+        centroid=tuple(float(v) for v in mesh.centroid),
+    )
+
+
+def infer_unit_scale(extent: float, target_size: float = DEFAULT_OBJECT_SIZE) -> float:
+    """
+    Returns the unit scale that brings the extent closest to the target size.
+    """
+    if extent <= 0.0:
+        return FALLBACK_SCALE
+    return min(UNIT_SCALES, key=lambda s: abs(math.log(extent * s / target_size)))
+
+
+def _digest_or_none(mesh_path: str) -> Optional[str]:
+    try:
+        return file_digest(Path(mesh_path))
+    except OSError:
+        return None
+
+
+def _stats_or_error(mesh_path: str, digest: str) -> Tuple[Optional[MeshStats], str]:
+    try:
+        return compute_mesh_stats(Path(mesh_path), digest), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _mass_properties_or_error(
+    mesh_path: str, scale: float
+) -> Tuple[Optional[MassProperties], str]:
+    try:
+        return mesh_mass_properties(Path(mesh_path), scale), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+class MeshIndex:
+    """
+    Mesh statistics, object classes and scale overrides stored in SQLite.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_MESH_INDEX) -> None:
+        if db_path != ":memory:":
+            db_path = str(Path(db_path).expanduser())
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _digest_for(self, mesh_path: Path) -> Optional[str]:
+        try:
+            stat = mesh_path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (str(mesh_path), stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats_for(self, mesh_path: Path) -> Optional[MeshStats]:
+        """
+        Returns the statistics of the mesh if they are up to date.
+        """
+        digest = self._digest_for(Path(mesh_path))
+        if digest is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM stats WHERE digest = ?", (digest,)
+            ).fetchone()
+        return self._to_stats(row) if row else None
+
+    @staticmethod
+    def _to_stats(row: tuple) -> MeshStats:
+        return MeshStats(
+            digest=row[0],
+            num_vertices=row[1],
+            num_triangles=row[2],
+            aabb_min=tuple(row[3:6]),
+            aabb_max=tuple(row[6:9]),
+            is_watertight=bool(row[9]),
+            volume=row[10],
+            centroid=tuple(row[11:14]),
+        )
+
+    def update(
+        self, mesh_paths: Iterable[Path], max_workers: Optional[int] = None
+    ) -> int:
+        """
+        Computes the statistics of meshes that are new or changed. Files with
+        the same content are only processed once. Returns the number of meshes
+        whose statistics were computed.
+        """
+        mesh_paths = list(dict.fromkeys(Path(p) for p in mesh_paths))
+        todo = [p for p in mesh_paths if p.is_file() and self._digest_for(p) is None]
+        if not todo:
+            return 0
+
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers or _default_workers(), mp_context=ctx
+        ) as ex:
+            paths = [str(p) for p in todo]
+            digests = list(ex.map(_digest_or_none, paths, chunksize=16))
+            with self._lock:
+                known = {row[0] for row in self._db.execute("SELECT digest FROM stats")}
+            missing: Dict[str, str] = {}
+            for path, digest in zip(paths, digests):
+                if digest is not None and digest not in known:
+                    missing.setdefault(digest, path)
+
+            results = ex.map(
+                _stats_or_error, missing.values(), missing.keys(), chunksize=4
+            )
+            num_computed = 0
+            for (digest, path), (stats, error) in zip(missing.items(), results):
+                if stats is None:
+                    logger.warning("Unable to index %s: %s", path, error)
+                    continue
+                self._put_stats(stats)
+                num_computed += 1
+
+        with self._lock, self._db:
+            for path, digest in zip(todo, digests):
+                if digest is None:
+                    continue
+                stat = path.stat()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (str(path), stat.st_size, stat.st_mtime_ns, digest),
+                )
+        logger.info("Indexed %d meshes, %d new", len(todo), num_computed)
+        return num_computed
+
+    def _put_stats(self, stats: MeshStats) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO stats VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    stats.digest,
+                    stats.num_vertices,
+                    stats.num_triangles,
+                    *stats.aabb_min,
+                    *stats.aabb_max,
+                    int(stats.is_watertight),
+                    stats.volume,
+                    *stats.centroid,
+                ),
+            )
+
+    def mass_properties(
+        self, mesh_keys: Iterable[MeshKey], max_workers: Optional[int] = None
+    ) -> Dict[MeshKey, MassProperties]:
+        """
+        Returns the mass properties per unit density of meshes given as
+        ``(path, scale)``. They are cached by content hash and scale. Missing
+        ones are computed in parallel. Meshes that fail are left out.
+        """
+        digests: Dict[MeshKey, str] = {}
+        for mesh_path, scale in dict.fromkeys(mesh_keys):
+            try:
+                digest = self._digest_for(Path(mesh_path)) or file_digest(mesh_path)
+            except OSError as e:
+                logger.warning("Unable to read %s: %s", mesh_path, e)
+                continue
+            digests[(Path(mesh_path), float(scale))] = digest
+
+        results: Dict[MeshKey, MassProperties] = {}
+        missing: Dict[Tuple[str, float], MeshKey] = {}
+        with self._lock:
+            for key, digest in digests.items():
+                row = self._db.execute(
+                    "SELECT * FROM mass_properties WHERE digest = ? AND scale = ?",
+                    (digest, key[1]),
+                ).fetchone()
+                if row:
+                    results[key] = MassProperties(
+                        row[2], tuple(row[3:6]), tuple(row[6:12]), bool(row[12])
+                    )
+                else:
+                    missing.setdefault((digest, key[1]), key)
+        if not missing:
+            return results
+
+        keys = list(missing.values())
+        args = ([str(p) for p, _ in keys], [s for _, s in keys])
+        if len(keys) == 1:
+            computed = list(map(_mass_properties_or_error, *args))
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            workers = max_workers or _default_workers()
+            with ProcessPoolExecutor(workers, mp_context=ctx) as ex:
+                computed = list(ex.map(_mass_properties_or_error, *args))
+
+        computed_by_digest: Dict[Tuple[str, float], MassProperties] = {}
+        with self._lock, self._db:
+            for (digest, scale), (props, error) in zip(missing.keys(), computed):
+                if props is None:
+                    logger.warning(
+                        "Unable to compute the inertia of %s: %s",
+                        missing[(digest, scale)][0],
+                        error,
+                    )
+                    continue
+                computed_by_digest[(digest, scale)] = props
+                self._db.execute(
+                    "INSERT OR REPLACE INTO mass_properties VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        digest,
+                        scale,
+                        props.volume,
+                        *props.center_of_mass,
+                        *props.inertia,
+                        int(props.is_convex_hull),
+                    ),
+                )
+        # meshes with the same content share the result
+        for key, digest in digests.items():
+            if (digest, key[1]) in computed_by_digest:
+                results[key] = computed_by_digest[(digest, key[1])]
+        return results
+
+    def set_objects(
+        self, objects: Iterable[Tuple[str, Optional[str], Optional[Path]]]
+    ) -> None:
+        """
+        Records the class label and mesh path of objects given as
+        ``(uid, label, path)``.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO objects VALUES (?, ?, ?) ON CONFLICT(uid) DO UPDATE SET "
+                "label = COALESCE(excluded.label, label), "
+                "path = COALESCE(excluded.path, path)",
+                [(uid, label, str(p) if p else None) for uid, label, p in objects],
+            )
+
+    def set_scale_override(self, uid: str, scale: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scale_overrides VALUES (?, ?)", (uid, scale)
+            )
+
+    def scale_override(self, uid: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT scale FROM scale_overrides WHERE uid = ?", (uid,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def class_size(self, label: str) -> Optional[float]:
+        """
+        Median size in meters of the objects of a class with a scale override.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT o.scale, s.min_x, s.min_y, s.min_z, s.max_x, s.max_y, s.max_z "
+                "FROM scale_overrides o "
+                "JOIN objects ON objects.uid = o.uid "
+                "JOIN files ON files.path = objects.path "
+                "JOIN stats s ON s.digest = files.digest "
+                "WHERE objects.label = ?",
+                (label,),
+            ).fetchall()
+        sizes: List[float] = [
+            row[0] * max(hi - lo for lo, hi in zip(row[1:4], row[4:7])) for row in rows
+        ]
+        sizes = [s for s in sizes if s > 0.0]
+        return statistics.median(sizes) if sizes else None
+
+    def default_scale(
+        self, uid: str, mesh_path: Optional[Path] = None, label: Optional[str] = None
+    ) -> float:
+        """
+        Returns the scale set by the user or a guess from the mesh size and the
+        sizes of objects of the same class.
+        """
+        if (scale := self.scale_override(uid)) is not None:
+            return scale
+        stats = self.stats_for(Path(mesh_path)) if mesh_path else None
+        if stats is None or stats.extent <= 0.0:
+            return FALLBACK_SCALE
+        if label and (size := self.class_size(label)) is not None:
+            return size / stats.extent
+        return infer_unit_scale(stats.extent)
@@ -0,0 +1,199 @@
+"""
+SQLite catalog of Objaverse objects for browsing and searching.
+
+The catalog is built once from the LVIS annotations and the local Objaverse
+cache. Names and labels are indexed for full-text search, so only the page of
+results that is shown is ever loaded.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from dataclasses import dataclass
+from dataclasses import replace
+import logging
+from pathlib import Path
+import re
+import sqlite3
+import threading
+
+from mujoco_scene_editor.constants import DEFAULT_OBJAVERSE_CATALOG
+from mujoco_scene_editor.constants import OBJAVERSE_PAGE_SIZE
+from mujoco_scene_editor.inventory.objverse import ObjaverseItem
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    uid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    label TEXT,
+    path TEXT
+);
+CREATE INDEX IF NOT EXISTS objects_by_label ON objects (label, name);
+CREATE INDEX IF NOT EXISTS objects_by_name ON objects (name);
+CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5 (
+    name, label, content='objects', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS objects_ai AFTER INSERT ON objects BEGIN
+    INSERT INTO objects_fts (rowid, name, label)
+    VALUES (new.rowid, new.name, new.label);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_ad AFTER DELETE ON objects BEGIN
+    INSERT INTO objects_fts (objects_fts, rowid, name, label)
+    VALUES ('delete', old.rowid, old.name, old.label);
+END;
+CREATE TRIGGER IF NOT EXISTS objects_au AFTER UPDATE OF name, label ON objects BEGIN
+    INSERT INTO objects_fts (objects_fts, rowid, name, label)
+    VALUES ('delete', old.rowid, old.name, old.label);
+    INSERT INTO objects_fts (rowid, name, label)
+    VALUES (new.rowid, new.name, new.label);
+END;
+"""
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    items: List[ObjaverseItem]
+    # Index of the first item and number of all matching items
+    offset: int
+    total: int
+
+
+def match_expression(query: str) -> str:
+    """
+    Turns user input into an FTS5 query that matches all words as prefixes.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class ObjaverseCatalog:
+    def __init__(self, db_path: str = DEFAULT_OBJAVERSE_CATALOG) -> None:
+        if db_path != ":memory:":
+            db_path = str(Path(db_path).expanduser())
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def build(
+        self,
+        annotations: Dict[str, List[str]],
+        local_paths: Optional[Dict[str, Path]] = None,
+    ) -> int:
+        """
+        Adds the objects of the LVIS ``annotations``, i.e., label to uids, and
+        the objects in ``local_paths`` that have no label. Objects already in
+        the catalog are kept. Returns the number of added objects.
+        """
+        local_paths = local_paths or {}
+        rows: List[Tuple[str, str, Optional[str], Optional[str]]] = []
+        for label, uids in annotations.items():
+            for uid in uids:
+                path = local_paths.get(uid, None)
+                name = path.stem if path else label
+                rows.append((uid, name, label, str(path) if path else None))
+        labeled = {row[0] for row in rows}
+        for uid, path in local_paths.items():
+            if uid not in labeled:
+                rows.append((uid, path.stem, None, str(path)))
+
+        with self._lock, self._db:
+            added = self._db.executemany(
+                "INSERT OR IGNORE INTO objects VALUES (?, ?, ?, ?)", rows
+            ).rowcount
+        logger.info("Added %d objects to the catalog", added)
+        return added
+
+    def set_paths(self, local_paths: Dict[str, Path]) -> None:
+        """
+        Records where objects are cached locally, e.g., after a download.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE objects SET path = ? WHERE uid = ?",
+                [(str(path), uid) for uid, path in local_paths.items()],
+            )
+
+    def labels(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT label FROM objects WHERE label IS NOT NULL "
+                "ORDER BY label"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def local_items(self) -> List[ObjaverseItem]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT uid, name, path, label FROM objects WHERE path IS NOT NULL"
+            ).fetchall()
+        return [_to_item(row) for row in rows]
+
+    def search(
+        self,
+        query: str = "",
+        label: Optional[str] = None,
+        offset: int = 0,
+        limit: int = OBJAVERSE_PAGE_SIZE,
+    ) -> CatalogPage:
+        """
+        Returns a page of the objects whose name or label starts with the
+        words of ``query``, optionally of a single ``label``. Objects are
+        sorted by name.
+        """
+        conditions: List[str] = []
+        params: List[object] = []
+        if expression := match_expression(query):
+            conditions.append(
+                "rowid IN (SELECT rowid FROM objects_fts WHERE objects_fts MATCH ?)"
+            )
+            params.append(expression)
+        if label is not None:
+            conditions.append("label = ?")
+            params.append(label)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._db.execute(
+                f"SELECT COUNT(*) FROM objects {where}", params
+            ).fetchone()[0]
+            offset = min(max(offset, 0), max(total - 1, 0) // limit * limit)
+            rows = self._db.execute(
+                f"SELECT uid, name, path, label FROM objects {where} "
+                "ORDER BY name, uid LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return CatalogPage(_unique_names(_to_item(row) for row in rows), offset, total)
+
+
+def _to_item(row: Tuple[str, str, Optional[str], Optional[str]]) -> ObjaverseItem:
+    uid, name, path, label = row
+    return ObjaverseItem(
+        uid=uid, name=name, path=Path(path) if path else None, label=label
+    )
+
+
+def _unique_names(items: Iterable[ObjaverseItem]) -> List[ObjaverseItem]:
+    # The dropdown needs distinct names, many objects are named after their label
+    results: List[ObjaverseItem] = []
+    names = set()
+    for item in items:
+        if item.name in names:
+            item = replace(item, name=f"{item.name}_{item.uid[:6]}")
+        names.add(item.name)
+        results.append(item)
+    return results
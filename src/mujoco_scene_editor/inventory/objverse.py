@@ -9,10 +9,11 @@ from typing import Sequence
 from dataclasses import dataclass
 from functools import lru_cache
 
-from cachier import cachier
-
 import objaverse
 
+from mujoco_scene_editor.inventory.mesh_index import MeshIndex
+from mujoco_scene_editor.utils.disk_cache import cached
+
 ASSET_EXTS: Sequence[str] = (".glb", ".gltf", ".obj", ".ply")
 
 
@@ -21,12 +22,21 @@ class ObjaverseItem:
     uid: str
     name: str
     path: Optional[Path] = None  # Local mesh path if downloaded/available
+    label: Optional[str] = None  # LVIS category
 
 
 def _default_cache_root() -> Path:
     return Path.home() / ".objaverse"
 
 
+def _local_cache_dirs() -> List[Path]:
+    # Downloads add folders to the subdirectories of the cache root
+    root = _default_cache_root()
+    if not root.exists():
+        return [root]
+    return [root] + sorted(sub for sub in root.iterdir() if sub.is_dir())
+
+
 @lru_cache()
 def _find_local_asset(uid: str, exts: Sequence[str] = ASSET_EXTS) -> Optional[Path]:
     root = _default_cache_root()
@@ -59,7 +69,7 @@ def _find_local_asset(uid: str, exts: Sequence[str] = ASSET_EXTS) -> Optional[Pa
 class ObjaverseInventory:
     """Inventory for Objaverse assets.
 
-    - Lists UIDs by LVIS label.
+    - Lists UIDs by LVIS label. Use ``ObjaverseCatalog`` to browse all of them.
     - Resolves local cached mesh paths if available.
     - Optionally downloads objects via objaverse when requested.
     """
@@ -67,7 +77,7 @@ class ObjaverseInventory:
     def list_by_label(
         self, label: str, limit: Optional[int] = None
     ) -> List[ObjaverseItem]:
-        annotations = self._all_annotations()
+        annotations = self.annotations()
         uids = annotations.get(label, []) or []
         if limit is not None:
             uids = uids[:limit]
@@ -75,49 +85,23 @@ class ObjaverseInventory:
         for uid in uids:
             local = _find_local_asset(uid)
             name = local.stem if local else uid
-            items.append(ObjaverseItem(uid=uid, name=name, path=local))
+            items.append(ObjaverseItem(uid=uid, name=name, path=local, label=label))
         return items
 
-    @cachier(stale_after=None)
-    def _all_annotations(self) -> Dict[str, List[str]]:
+    @cached("objaverse_annotations", key=lambda self: "lvis")
+    def annotations(self) -> Dict[str, List[str]]:
+        """LVIS label to uids."""
         return objaverse.load_lvis_annotations()
 
     def list_labels(self) -> List[str]:
-        anns = self._all_annotations()
+        anns = self.annotations()
         return sorted(anns.keys())
 
-    @cachier(stale_after=None)
-    def list_by_labels(
-        self,
-        labels: Optional[Sequence[str]] = None,
-        limit_per_label: Optional[int] = None,
-    ) -> List[ObjaverseItem]:
-        anns = self._all_annotations()
-        labels = labels or list(anns.keys())
-        results: List[ObjaverseItem] = []
-        for label in labels:
-            uids = list(anns.get(label, []))
-            if limit_per_label is not None:
-                uids = uids[:limit_per_label]
-            for uid in uids:
-                local = _find_local_asset(uid)
-                name = local.stem if local else f"{label}"
-                if any(it.name == name for it in results):
-                    name = f"{name}_{uid[:6]}"
-                results.append(ObjaverseItem(uid=uid, name=name, path=local))
-        return sorted(results, key=lambda x: x.name)
-
-    @cachier(stale_after=None)
-    def list_all(self, limit: Optional[int] = None) -> List[ObjaverseItem]:
-        """ """
-        items: List[ObjaverseItem] = []
-        for it in self.list_by_labels(labels=None, limit_per_label=None):
-            items.append(it)
-            if limit is not None and len(items) >= limit:
-                break
-        return items
-
-    @cachier(stale_after=None)
+    @cached(
+        "objaverse_local",
+        key=lambda self: str(_default_cache_root()),
+        deps=lambda self: _local_cache_dirs(),
+    )
     def list_local(self) -> List[ObjaverseItem]:
         root = _default_cache_root()
         if not root.exists():
@@ -143,9 +127,5 @@ class ObjaverseInventory:
         return {uid: Path(p) for uid, p in loaded.items()}
 
 
-SCALE_OVERRIDES: Dict[str, float] = {}
-
-
-@cachier(stale_after=None)
-def lookup_default_scale(_item: ObjaverseItem) -> float:
-    return SCALE_OVERRIDES.get(_item.uid, 0.01)
+def lookup_default_scale(item: ObjaverseItem, mesh_index: MeshIndex) -> float:
+    return mesh_index.default_scale(item.uid, item.path, item.label)
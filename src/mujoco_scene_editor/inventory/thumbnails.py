@@ -0,0 +1,397 @@
+"""
+Thumbnails of inventory meshes.
+
+Meshes are rasterized on the CPU in a pool of worker processes, so no OpenGL
+context is needed. Thumbnails are stored as PNG files named by the hash of the
+mesh file. An index maps each mesh path to its hash so that unchanged files are
+not read again after a restart. Generation runs in the background. Thumbnails
+that are requested in the GUI are generated first.
+"""
+
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import threading
+
+import numpy as np
+
+from mujoco_scene_editor.constants import DEFAULT_THUMBNAIL_DIR
+from mujoco_scene_editor.constants import THUMBNAIL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Larger meshes are drawn with their largest faces only
+MAX_FACES = 20000
+
+# Thumbnails are drawn at a higher resolution and downsampled for antialiasing
+SUPERSAMPLING = 2
+
+BACKGROUND_COLOR = (235, 235, 235)
+MESH_COLOR = (170, 180, 200)
+
+# Direction from the mesh to the viewer. Meshes are shown with z up.
+VIEW_DIRECTION = (1.0, -1.0, 0.8)
+LIGHT_DIRECTION = (0.4, -0.8, 1.0)
+
+# Meshes submitted to each worker at once
+JOBS_PER_WORKER = 2
+
+# The index is written after this many thumbnails and once the queue is empty
+INDEX_SAVE_PERIOD = 50
+
+INDEX_FILE = "index.json"
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _face_colors(mesh, num_faces: int) -> np.ndarray:
+    try:
+        colors = np.asarray(mesh.visual.to_color().face_colors)[:, :3]
+    except Exception:
+        colors = None
+    if colors is None or len(colors) != num_faces:
+        return np.tile(np.array(MESH_COLOR, dtype=float), (num_faces, 1))
+    return colors.astype(float)
+
+
+def render_thumbnail(mesh_path: Path, size: int = THUMBNAIL_SIZE) -> np.ndarray:
+    """
+    Draws the mesh with an orthographic projection and flat shading. Returns
+    an RGB image of shape ``(size, size, 3)``.
+    """
+    import trimesh
+    from PIL import Image
+    from PIL import ImageDraw
+
+    mesh = trimesh.load(mesh_path, force="mesh")
+    vertices = np.asarray(mesh.vertices, dtype=float)
+    faces = np.asarray(mesh.faces)
+    if len(faces) == 0:
+        raise ValueError(f"Mesh {mesh_path} has no faces")
+    colors = _face_colors(mesh, len(faces))
+    if len(faces) > MAX_FACES:
+        largest = np.argsort(mesh.area_faces)[-MAX_FACES:]
+        faces, colors = faces[largest], colors[largest]
+
+    view = np.asarray(VIEW_DIRECTION) / np.linalg.norm(VIEW_DIRECTION)
+    right = np.cross(-view, (0.0, 0.0, 1.0))
+    right /= np.linalg.norm(right)
+    up = np.cross(right, -view)
+
+    center = (vertices.min(axis=0) + vertices.max(axis=0)) / 2.0
+    vertices = vertices - center
+    radius = max(float(np.linalg.norm(vertices, axis=1).max()), 1e-9)
+    pixels = size * SUPERSAMPLING
+    scale = 0.45 * pixels / radius
+    image_points = np.stack(
+        (
+            pixels / 2.0 + scale * (vertices @ right),
+            pixels / 2.0 - scale * (vertices @ up),
+        ),
+        axis=-1,
+    )
+
+    triangles = vertices[faces]
+    normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+    light = np.asarray(LIGHT_DIRECTION) / np.linalg.norm(LIGHT_DIRECTION)
+    # the winding of scanned meshes is not reliable
+    shading = 0.3 + 0.7 * np.abs(normals @ light)
+    colors = np.clip(colors * shading[:, None], 0, 255).astype(np.uint8)
+
+    # far faces are drawn first
+    order = np.argsort((triangles @ view).mean(axis=1))
+    image = Image.new("RGB", (pixels, pixels), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    for i in order:
+        draw.polygon(
+            [tuple(p) for p in image_points[faces[i]].tolist()],
+            fill=tuple(colors[i].tolist()),
+        )
+    image = image.resize((size, size), Image.LANCZOS)
+    return np.asarray(image)
+
+
+def load_thumbnail(png_path: Path) -> np.ndarray:
+    from PIL import Image
+
+    with Image.open(png_path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def _generate(
+    mesh_path: str, digest: Optional[str], out_dir: str, size: int
+) -> Tuple[str, Optional[str]]:
+    """
+    Entry point of the worker processes. Returns the hash of the mesh file and
+    an error message if the mesh could not be drawn.
+    """
+    digest = digest or file_digest(Path(mesh_path))
+    out_path = Path(out_dir) / f"{digest}.png"
+    if out_path.is_file():
+        return digest, None
+    try:
+        image = render_thumbnail(Path(mesh_path), size)
+    except Exception as e:
+        return digest, f"{type(e).__name__}: {e}"
+
+    from PIL import Image
+
+    # written under another name first so that stopping never leaves a partial file
+    tmp_path = out_path.with_name(f"{digest}.{os.getpid()}.tmp")
+    Image.fromarray(image).save(tmp_path, format="PNG")
+    os.replace(tmp_path, out_path)
+    return digest, None
+
+
+def _default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+class ThumbnailCache:
+    """
+    Generates thumbnails in the background and looks them up by mesh path.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_THUMBNAIL_DIR,
+        size: int = THUMBNAIL_SIZE,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir).expanduser() / str(size)
+        self.size = size
+        self.max_workers = max_workers or _default_workers()
+        self.completed = 0
+        self.failed = 0
+
+        # mesh path -> (size, mtime, digest, is_ok)
+        self._index: Dict[str, Tuple[int, int, str, bool]] = self._load_index()
+        self._queue: Deque[Path] = deque()
+        self._queued: Set[Path] = set()
+        self._in_flight = 0
+        self._unsaved = 0
+        self._callbacks: List[Callable[[Path, Optional[Path]], None]] = []
+        self._cond = threading.Condition()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._is_closed = False
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def on_ready(self, cb: Callable[[Path, Optional[Path]], None]) -> None:
+        """
+        Registers a callback for generated thumbnails. It is called from a
+        background thread with the mesh path and the PNG path, or None if the
+        mesh could not be drawn.
+        """
+        self._callbacks.append(cb)
+
+    def path_for(self, mesh_path: Path) -> Optional[Path]:
+        """
+        Returns the thumbnail of the mesh if it exists and is up to date.
+        """
+        entry = self._valid_entry(Path(mesh_path))
+        if entry is None or not entry[3]:
+            return None
+        png_path = self.cache_dir / f"{entry[2]}.png"
+        return png_path if png_path.is_file() else None
+
+    def submit(self, mesh_paths: Iterable[Path]) -> None:
+        """
+        Queues thumbnails for generation. Meshes that already have one are
+        skipped once they are reached.
+        """
+        with self._cond:
+            for p in mesh_paths:
+                p = Path(p)
+                if p not in self._queued:
+                    self._queue.append(p)
+                    self._queued.add(p)
+            self._start()
+            self._cond.notify_all()
+
+    def prioritize(self, mesh_path: Path) -> None:
+        """
+        Generates the thumbnail of the mesh next.
+        """
+        mesh_path = Path(mesh_path)
+        with self._cond:
+            if mesh_path in self._queued:
+                self._queue.remove(mesh_path)
+            self._queue.appendleft(mesh_path)
+            self._queued.add(mesh_path)
+            self._start()
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the queue is empty. Returns False on a timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout
+            )
+
+    def close(self) -> None:
+        with self._cond:
+            self._is_closed = True
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._save_index()
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._feed, name="thumbnail-feeder", daemon=True
+        )
+        self._thread.start()
+
+    def _valid_entry(self, mesh_path: Path) -> Optional[Tuple[int, int, str, bool]]:
+        entry = self._index.get(str(mesh_path), None)
+        if entry is None:
+            return None
+        try:
+            stat = mesh_path.stat()
+        except OSError:
+            return None
+        if (entry[0], entry[1]) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return entry
+
+    def _feed(self) -> None:
+        limit = self.max_workers * JOBS_PER_WORKER
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._is_closed or (self._queue and self._in_flight < limit)
+                )
+                if self._is_closed:
+                    return
+                mesh_path = self._queue.popleft()
+                self._queued.discard(mesh_path)
+                self._in_flight += 1
+
+            entry = self._valid_entry(mesh_path)
+            if entry is not None and (
+                not entry[3] or (self.cache_dir / f"{entry[2]}.png").is_file()
+            ):
+                self._finish()
+                continue
+            try:
+                stat = mesh_path.stat()
+            except OSError as e:
+                logger.warning("Unable to create a thumbnail for %s: %s", mesh_path, e)
+                self._finish()
+                continue
+
+            with self._cond:
+                if self._is_closed:
+                    return
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    logger.info(
+                        "Generating thumbnails with %d processes in %s",
+                        self.max_workers,
+                        self.cache_dir,
+                    )
+                digest = entry[2] if entry is not None else None
+                future = self._executor.submit(
+                    _generate, str(mesh_path), digest, str(self.cache_dir), self.size
+                )
+            future.add_done_callback(
+                partial(self._on_done, mesh_path, stat.st_size, stat.st_mtime_ns)
+            )
+
+    def _on_done(
+        self, mesh_path: Path, file_size: int, mtime: int, future: Future
+    ) -> None:
+        png_path = None
+        try:
+            digest, error = future.result()
+        except Exception as e:
+            # cancelled on close or the worker died
+            digest, error = None, str(e)
+        with self._cond:
+            if digest is not None:
+                self._index[str(mesh_path)] = (file_size, mtime, digest, error is None)
+                self._unsaved += 1
+            if error is None:
+                self.completed += 1
+                png_path = self.cache_dir / f"{digest}.png"
+            else:
+                self.failed += 1
+        if error is not None:
+            logger.warning("Unable to create a thumbnail for %s: %s", mesh_path, error)
+        for cb in self._callbacks:
+            cb(mesh_path, png_path)
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            is_idle = not self._queue and not self._in_flight
+            save = self._unsaved >= INDEX_SAVE_PERIOD or (is_idle and self._unsaved)
+        if save:
+            self._save_index()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _load_index(self) -> Dict[str, Tuple[int, int, str, bool]]:
+        try:
+            with open(self.cache_dir / INDEX_FILE) as f:
+                return {k: tuple(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring invalid thumbnail index: %s", e)
+            return {}
+
+    def _save_index(self) -> None:
+        with self._cond:
+            index = dict(self._index)
+            self._unsaved = 0
+        if not index:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.cache_dir / INDEX_FILE
+        tmp_path = index_path.with_name(f"{INDEX_FILE}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
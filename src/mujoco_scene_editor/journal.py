@@ -0,0 +1,361 @@
+"""
+Append-only journal of the scene edits for crash recovery.
+
+Every change of the :class:`~mujoco_scene_editor.state.State` is handed to a
+background thread that appends it as one JSON line to ``journal.jsonl``. The
+thread applies the same operations to its own copy of the scene and, once the
+edits pause, writes a compacted checkpoint and truncates the log. A session is
+restored from the latest checkpoint plus the operations logged after it.
+
+Each editor writes to its own session directory below the journal root. The
+session holds a lock on ``lock`` while it runs, so only sessions of editors that
+crashed or were stopped are offered for restore.
+
+Recording an edit only enqueues it, so the editor does not wait for the disk.
+"""
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import fcntl
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from robits.core.utils import MiscJSONEncoder
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import convert_json_to_bp
+
+from mujoco_scene_editor.utils import blueprint_io
+from mujoco_scene_editor import metrics
+
+logger = logging.getLogger(__name__)
+
+LOG_NAME = "journal.jsonl"
+
+# Locked by the editor that writes the session
+LOCK_NAME = "lock"
+
+# Exists while the journaled scene equals the last export
+SAVED_MARKER_NAME = "saved"
+
+# Seconds without edits before a checkpoint is written
+CHECKPOINT_DELAY = 2.0
+
+# Write a checkpoint at the latest after this many logged operations
+MAX_OPS_PER_CHECKPOINT = 500
+
+
+def _is_path_or_descendant(path: str, root: str) -> bool:
+    return path == root or path.startswith(f"{root}/")
+
+
+def _checkpoint_path(directory: Path, seq: int) -> Path:
+    return directory / f"checkpoint-{seq:010d}.npz"
+
+
+def _find_checkpoint(directory: Path) -> Tuple[Optional[Path], int]:
+    checkpoints = sorted(directory.glob("checkpoint-*.npz"))
+    if not checkpoints:
+        return None, 0
+    path = checkpoints[-1]
+    return path, int(path.stem.split("-")[1])
+
+
+def _try_lock(path: Path) -> Optional[int]:
+    """
+    Returns a file descriptor holding an exclusive lock on ``path`` or ``None``
+    if another session holds it.
+    """
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _unlock(fd: int) -> None:
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def _find_sessions(root: Path) -> List[Path]:
+    """
+    Returns the session directories below ``root``, the latest first.
+    """
+    if not root.is_dir():
+        return []
+    sessions = []
+    for path in root.iterdir():
+        start_time, _, pid = path.name.partition("-")
+        if path.is_dir() and start_time.isdigit() and pid.isdigit():
+            sessions.append((int(start_time), path))
+    return [path for _, path in sorted(sessions, reverse=True)]
+
+
+def apply_op(blueprints: Dict[str, Blueprint], record: Dict[str, Any]) -> None:
+    """
+    Applies a journaled operation to ``blueprints`` in place. Added and updated
+    blueprints are both journaled as ``put``.
+    """
+    op = record["op"]
+    if op == "put":
+        bp = record["bp"]
+        blueprints[bp.path] = bp
+    elif op == "remove":
+        for name in list(blueprints.keys()):
+            if _is_path_or_descendant(name, record["name"]):
+                blueprints.pop(name)
+    elif op == "scene":
+        blueprints.clear()
+        blueprints.update({bp.path: bp for bp in record["blueprints"]})
+    else:
+        raise ValueError(f"Unknown journal operation {op}")
+
+
+def recover(root: Union[str, Path]) -> Optional[List[Blueprint]]:
+    """
+    Returns the scene of the latest session below ``root`` that is no longer
+    running or ``None`` if there is nothing to restore, i.e., no such session
+    exists or its scene was exported after the last edit.
+    """
+    for directory in _find_sessions(Path(root).expanduser()):
+        fd = _try_lock(directory / LOCK_NAME)
+        if fd is None:
+            continue
+        try:
+            blueprints = load_session(directory)
+        finally:
+            _unlock(fd)
+        if blueprints is not None:
+            return blueprints
+    return None
+
+
+def load_session(directory: Union[str, Path]) -> Optional[List[Blueprint]]:
+    """
+    Returns the scene journaled in the session ``directory`` or ``None`` if it
+    is empty or was exported after the last edit.
+    """
+    directory = Path(directory).expanduser()
+    log_path = directory / LOG_NAME
+    if (directory / SAVED_MARKER_NAME).exists():
+        return None
+
+    checkpoint_path, checkpoint_seq = _find_checkpoint(directory)
+    if checkpoint_path is None and not log_path.exists():
+        return None
+
+    blueprints: Dict[str, Blueprint] = {}
+    if checkpoint_path is not None:
+        for bp in blueprint_io.load_blueprints(checkpoint_path):
+            blueprints[bp.path] = bp
+
+    num_ops = 0
+    if log_path.exists():
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = convert_json_to_bp(json.loads(line))
+                except ValueError:
+                    # the last line is incomplete if the editor crashed while writing
+                    logger.warning(
+                        "Ignoring journal after invalid line %d in %s",
+                        line_number,
+                        log_path,
+                    )
+                    break
+                if record["seq"] <= checkpoint_seq:
+                    continue
+                try:
+                    apply_op(blueprints, record)
+                except Exception:
+                    logger.exception("Unable to replay journal line %d", line_number)
+                    break
+                num_ops += 1
+
+    logger.info(
+        "Recovered %d elements from %s with %d operations after the checkpoint",
+        len(blueprints),
+        directory,
+        num_ops,
+    )
+    return list(blueprints.values())
+
+
+class Journal:
+    """
+    Writes the scene edits to a new session directory below ``root``. Sessions
+    that are no longer running are removed, so call :func:`recover` first.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        checkpoint_delay: float = CHECKPOINT_DELAY,
+        max_ops_per_checkpoint: int = MAX_OPS_PER_CHECKPOINT,
+    ) -> None:
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_delay = checkpoint_delay
+        self.max_ops_per_checkpoint = max_ops_per_checkpoint
+
+        # the session is locked before it gets its final name, so other editors
+        # never see it unlocked
+        name = f"{time.time_ns()}-{os.getpid()}"
+        tmp_directory = self.root / f".{name}"
+        tmp_directory.mkdir()
+        self._lock_fd = os.open(tmp_directory / LOCK_NAME, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self.directory = self.root / name
+        os.rename(tmp_directory, self.directory)
+        self._remove_stale_sessions()
+
+        self._log = open(self.directory / LOG_NAME, "w", encoding="utf-8")
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[int, Dict[str, Any]]]]" = queue.Queue()
+        self._is_saved = False
+        self._thread = threading.Thread(
+            target=self._run, name="journal-writer", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, op: str, **kwargs: Any) -> None:
+        """
+        Enqueues an operation. The arguments must not be modified afterwards.
+        """
+        with self._lock:
+            self._seq += 1
+            self._queue.put((self._seq, {"op": op, **kwargs}))
+
+    def mark_saved(self) -> None:
+        """
+        Marks the current scene as exported. It is not offered for restore.
+        """
+        self.record("saved")
+
+    def flush(self) -> None:
+        """
+        Blocks until all recorded operations are written.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Writes the pending operations and a final checkpoint.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._log.close()
+        if self._is_saved:
+            # nothing to restore
+            shutil.rmtree(self.directory, ignore_errors=True)
+        _unlock(self._lock_fd)
+
+    def _remove_stale_sessions(self) -> None:
+        for directory in _find_sessions(self.root):
+            if directory == self.directory:
+                continue
+            fd = _try_lock(directory / LOCK_NAME)
+            if fd is None:
+                continue
+            try:
+                shutil.rmtree(directory, ignore_errors=True)
+                logger.debug("Removed journal session %s", directory.name)
+            finally:
+                _unlock(fd)
+
+    def _run(self) -> None:
+        blueprints: Dict[str, Blueprint] = {}
+        last_seq = 0
+        num_ops = 0
+        while True:
+            try:
+                item = self._queue.get(
+                    timeout=self.checkpoint_delay if num_ops else None
+                )
+            except queue.Empty:
+                # edits paused
+                try:
+                    self._write_checkpoint(blueprints, last_seq)
+                except Exception:
+                    logger.exception("Unable to write journal checkpoint")
+                num_ops = 0
+                continue
+
+            try:
+                if item is None:
+                    if num_ops:
+                        self._write_checkpoint(blueprints, last_seq)
+                    return
+
+                last_seq, record = item
+                if record["op"] == "saved":
+                    self._set_saved(True)
+                    continue
+                self._set_saved(False)
+
+                apply_op(blueprints, record)
+                if record["op"] == "scene":
+                    # replaces everything that was logged before
+                    self._write_checkpoint(blueprints, last_seq)
+                    num_ops = 0
+                    continue
+
+                self._append(last_seq, record)
+                num_ops += 1
+                if num_ops >= self.max_ops_per_checkpoint:
+                    self._write_checkpoint(blueprints, last_seq)
+                    num_ops = 0
+            except Exception:
+                logger.exception("Unable to write journal")
+            finally:
+                self._queue.task_done()
+
+    def _set_saved(self, is_saved: bool) -> None:
+        if is_saved == self._is_saved:
+            return
+        marker = self.directory / SAVED_MARKER_NAME
+        if is_saved:
+            marker.touch()
+        else:
+            marker.unlink(missing_ok=True)
+        self._is_saved = is_saved
+
+    def _append(self, seq: int, record: Dict[str, Any]) -> None:
+        line = json.dumps(
+            {"seq": seq, **record}, cls=MiscJSONEncoder, separators=(",", ":")
+        )
+        self._log.write(line + "\n")
+        self._log.flush()
+
+    @metrics.timed()
+    def _write_checkpoint(self, blueprints: Dict[str, Blueprint], seq: int) -> None:
+        path = _checkpoint_path(self.directory, seq)
+        tmp_path = self.directory / "checkpoint.tmp.npz"
+        blueprint_io.save_blueprints(tmp_path, list(blueprints.values()))
+        os.replace(tmp_path, path)
+
+        for old_path in self.directory.glob("checkpoint-*.npz"):
+            if old_path != path:
+                old_path.unlink()
+        self._log.seek(0)
+        self._log.truncate()
+        logger.debug("Wrote journal checkpoint %s", path.name)
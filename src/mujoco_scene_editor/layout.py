@@ -1,19 +1,29 @@
 from typing import Dict
 from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
 from typing import Tuple
 
 import logging
 
+import numpy as np
 import viser
 
 from robits.core.config_manager import config_manager
 
-from mujoco_scene_editor.gui.transform_panel import TransformPanel
-from mujoco_scene_editor.utils import viser_utils
+from mujoco_scene_editor.gui.client_session import ClientSession
+from mujoco_scene_editor.gui.outliner import SceneIndex
 
 from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.constants import ALL_KINDS
+from mujoco_scene_editor.constants import LOADING
 from mujoco_scene_editor.constants import DEFAULT_ASSET_DIR
 from mujoco_scene_editor.constants import DEFAULT_EXPORT_TARGET
+from mujoco_scene_editor.constants import DEFAULT_DENSITY
+from mujoco_scene_editor.constants import DEFAULT_METRICS_TARGET
+from mujoco_scene_editor.constants import POSE_UPDATE_RATE_HZ
+from mujoco_scene_editor import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +39,16 @@ class SceneEditorLayout:
         ] = {}  # name -> ObjaverseItem for the drop down menu
         self.objaverse_labels = ()  # tuple of category labels
 
+        # Progress of a long running operation shown as a notification
+        self._progress: Optional[Tuple[str, str]] = None
+        self._progress_notifications: Dict[int, viser.NotificationHandle] = {}
+
+        # Per-client selection and GUI state, keyed by client id
+        self.sessions: Dict[int, ClientSession] = {}
+        self._session_callbacks: List[Callable[[ClientSession], None]] = []
+        # Paths of all scene elements shown in the outliner of each client
+        self.scene_index = SceneIndex()
+
         # Server + scene
         self.server = self._init_server()
         self.reset()
@@ -60,8 +80,76 @@ class SceneEditorLayout:
             loading=False,
         )
 
+        if self._progress:
+            self._show_progress(client, *self._progress)
+
+        with client.atomic():
+            session = ClientSession(
+                client,
+                self.server,
+                self.scene_index,
+                element_order=self._element_order,
+                panel_order=self._panel_order,
+                gizmo_visible=self.enable_gizmo_checkbox.value,
+                pose_rate_hz=self.pose_rate.value,
+            )
+        self.sessions[client.client_id] = session
+        # the scene might have changed while the GUI was created
+        session.refresh_elements()
+        for cb in self._session_callbacks:
+            cb(session)
+
     def on_disconnect(self, client: viser.ClientHandle) -> None:
         logger.info("Client disconnected %s", client)
+        self._progress_notifications.pop(client.client_id, None)
+        if session := self.sessions.pop(client.client_id, None):
+            session.clear_selection()
+
+    def on_session_created(self, cb: Callable[[ClientSession], None]) -> None:
+        """
+        Registers a callback for new client sessions. It is also called for
+        sessions that already exist.
+        """
+        self._session_callbacks.append(cb)
+        for session in list(self.sessions.values()):
+            cb(session)
+
+    def get_session(self, client_id: Optional[int]) -> Optional[ClientSession]:
+        if client_id is None:
+            return None
+        return self.sessions.get(client_id, None)
+
+    def refresh_outliners(self) -> None:
+        """
+        Updates the outliner of all clients after the scene index changed.
+        """
+        for session in list(self.sessions.values()):
+            session.refresh_elements()
+
+    def _show_progress(self, client: viser.ClientHandle, title: str, body: str) -> None:
+        self._progress_notifications[client.client_id] = client.add_notification(
+            title, body, loading=True, with_close_button=False
+        )
+
+    def set_progress(self, title: Optional[str], body: str = "") -> None:
+        """
+        Shows a progress notification on all clients, including clients that connect
+        later. Call with ``None`` to remove the notification.
+        """
+        if title is None:
+            self._progress = None
+            for notification in self._progress_notifications.values():
+                notification.remove()
+            self._progress_notifications.clear()
+            return
+
+        self._progress = (title, body)
+        for client_id, client in self.server.get_clients().items():
+            if notification := self._progress_notifications.get(client_id, None):
+                notification.title = title
+                notification.body = body
+            else:
+                self._show_progress(client, title, body)
 
     def reset(self):
         """
@@ -100,16 +188,18 @@ class SceneEditorLayout:
         if not self.server:
             raise RuntimeError("Server needs to be initialized first.")
 
-        self.element_list = self.server.gui.add_dropdown(
-            "Elements", options=(NO_SELECTION,), initial_value=NO_SELECTION
-        )
-
         # general controls
-        with self.server.gui.add_folder("Controls", expand_by_default=False):
+        controls_folder = self.server.gui.add_folder(
+            "Controls", expand_by_default=False
+        )
+        # The outliner of each client is placed here
+        self._element_order = controls_folder.order - 0.5
+        with controls_folder:
             self.btn_clear = self.server.gui.add_button("Clear scene")
             self.btn_quit = self.server.gui.add_button("Quit server")
             self.btn_undo = self.server.gui.add_button("Undo", disabled=True)
             self.btn_redo = self.server.gui.add_button("Redo", disabled=True)
+            self.history_info = self.server.gui.add_markdown("")
 
             self.allow_mouse_select = self.server.gui.add_checkbox(
                 "Allow mouse selection", initial_value=True
@@ -117,6 +207,9 @@ class SceneEditorLayout:
             self.enable_gizmo_checkbox = self.server.gui.add_checkbox(
                 "Interactive translation", initial_value=True
             )
+            self.pose_rate = self.server.gui.add_slider(
+                "Pose updates (Hz)", 1.0, 120.0, 1.0, POSE_UPDATE_RATE_HZ
+            )
             self.btn_delete_element = self.server.gui.add_button(
                 "Delete selected element"
             )
@@ -178,20 +271,32 @@ class SceneEditorLayout:
             )
             self.btn_scan_assets = self.server.gui.add_button("Scan assets")
             self.assets_list = self.server.gui.add_dropdown(
-                "Items", options=(NO_SELECTION,), initial_value=NO_SELECTION
+                "Items", options=(LOADING,), initial_value=LOADING
             )
+            self.asset_thumbnail = self._add_thumbnail()
             self.btn_add_asset = self.server.gui.add_button("Add asset")
+            self.thumbnail_info = self.server.gui.add_markdown("")
 
         with self.server.gui.add_folder(
             "Add Assets from Objaverse", expand_by_default=False
         ):
-            # Objaverse objects (from local cache)
+            # Objaverse objects, one page of the catalog at a time
             self.objaverse_category_list = self.server.gui.add_dropdown(
-                "Category", options=("— all —",), initial_value="— all —"
+                "Category", options=(LOADING,), initial_value=LOADING
+            )
+            self.objaverse_search = self.server.gui.add_text(
+                "Search",
+                initial_value="",
+                hint="Prefixes of object names or categories",
             )
             self.objaverse_list = self.server.gui.add_dropdown(
-                "Object", options=(NO_SELECTION,), initial_value=NO_SELECTION
+                "Object", options=(LOADING,), initial_value=LOADING
             )
+            self.objaverse_page_buttons = self.server.gui.add_button_group(
+                "Page", ("◀", "▶")
+            )
+            self.objaverse_page_info = self.server.gui.add_markdown("")
+            self.objaverse_thumbnail = self._add_thumbnail()
             self.objaverse_scale = self.server.gui.add_slider(
                 "Unit scaling", 0.0001, 10.0, 0.0001, 0.01
             )
@@ -211,56 +316,60 @@ class SceneEditorLayout:
             )
             self.btn_add_camera = self.server.gui.add_button("Add camera")
 
-        with self.server.gui.add_folder("Transform"):
-            self.transform = TransformPanel(self.server)
-
-        with self.server.gui.add_folder("Properties"):
-            self.prop_color = self.server.gui.add_rgb(
-                "Color",
-                initial_value=(200, 200, 200),
-            )
-            self.prop_opacity = self.server.gui.add_slider(
-                "Opacity", 0.0, 1.0, 0.01, 1.0
-            )
-            self.prop_box_dims = self.server.gui.add_vector3(
-                "Box dimensions",
-                initial_value=(0.1, 0.1, 0.1),
-                min=(0.01, 0.01, 0.01),
-                step=0.01,
-            )
-            self.prop_sphere_radius = self.server.gui.add_slider(
-                "Sphere radius", 0.01, 2.0, 0.01, 0.05
-            )
-            self.prop_cyl_radius = self.server.gui.add_slider(
-                "Cylinder radius", 0.01, 2.0, 0.01, 0.05
+        export_folder = self.server.gui.add_folder("Export")
+        # The transform and properties panels of each client are placed here
+        self._panel_order = export_folder.order - 0.5
+        with export_folder:
+            self.export_path = self.server.gui.add_text(
+                "File", initial_value=DEFAULT_EXPORT_TARGET
             )
-            self.prop_cyl_height = self.server.gui.add_slider(
-                "Cylinder height", 0.02, 4.0, 0.02, 0.2
+            self.estimate_masses = self.server.gui.add_checkbox(
+                "Estimate masses",
+                initial_value=False,
+                hint="Compute mass and inertia of movable objects from their geometry",
             )
-            self.prop_element_mass = self.server.gui.add_slider(
-                "Element mass", 0.02, 4.0, 0.02, 0.2
+            self.density = self.server.gui.add_number(
+                "Density (kg/m³)", initial_value=DEFAULT_DENSITY, min=1.0, step=10.0
             )
-            self.btn_update_element = self.server.gui.add_button("Update element")
-
-        with self.server.gui.add_folder("Export"):
-            self.export_path = self.server.gui.add_text(
-                "File", initial_value=DEFAULT_EXPORT_TARGET
+            self.btn_analyze = self.server.gui.add_button(
+                "Analyze scene",
+                hint="Simulate the scene briefly and list its most expensive objects",
             )
+            self.analysis_markdown = self.server.gui.add_markdown("")
             self.btn_export_mj = self.server.gui.add_button("Export scene")
             self.btn_launch_mj = self.server.gui.add_button("Launch MuJoCo")
 
-        self.gizmo = self.server.scene.add_transform_controls(
-            "/transform", scale=0.8, visible=False
-        )  # We can also set this to None
+        with self.server.gui.add_folder("Performance", expand_by_default=False):
+            self.metrics_enabled = self.server.gui.add_checkbox(
+                "Collect metrics", initial_value=metrics.is_enabled()
+            )
+            self.metrics_markdown = self.server.gui.add_markdown("")
+            self.btn_reset_metrics = self.server.gui.add_button("Reset metrics")
+            self.metrics_path = self.server.gui.add_text(
+                "Metrics file", initial_value=DEFAULT_METRICS_TARGET
+            )
+            self.btn_write_metrics = self.server.gui.add_button("Write metrics")
 
-    def disable_all_properties_gui_elements(self):
-        self.prop_color.disabled = True
-        self.prop_opacity.disabled = True
-        self.prop_box_dims.disabled = True
-        self.prop_sphere_radius.disabled = True
-        self.prop_cyl_radius.disabled = True
-        self.prop_cyl_height.disabled = True
-        self.prop_element_mass.disabled = True
+    def _add_thumbnail(self) -> viser.GuiImageHandle:
+        return self.server.gui.add_image(
+            np.zeros((1, 1, 3), dtype=np.uint8), format="png", visible=False
+        )
+
+    def show_thumbnail(
+        self, handle: viser.GuiImageHandle, image: Optional[np.ndarray]
+    ) -> None:
+        if image is None:
+            handle.visible = False
+            return
+        with self.server.atomic():
+            handle.image = image
+            handle.visible = True
+
+    def update_metrics_panel(self) -> None:
+        if metrics.is_enabled():
+            self.metrics_markdown.content = metrics.registry.to_markdown()
+        else:
+            self.metrics_markdown.content = "Metrics collection is disabled."
 
     def update_assets_dropdown(self) -> None:
         names = tuple(self.asset_items.keys()) or (NO_SELECTION,)
@@ -272,9 +381,19 @@ class SceneEditorLayout:
         self.objaverse_list.options = names
         self.objaverse_list.value = names[0]
 
+    def update_objaverse_page_info(
+        self, offset: int, num_items: int, total: int
+    ) -> None:
+        if total == 0:
+            self.objaverse_page_info.content = "No objects found"
+        else:
+            self.objaverse_page_info.content = (
+                f"Objects {offset + 1}–{offset + num_items} of {total}"
+            )
+
     def update_objaverse_label_dropdown(self) -> None:
         labels = getattr(self, "objaverse_labels", ())
-        options = tuple(labels) or (NO_SELECTION,)
+        options = (ALL_KINDS,) + tuple(labels) if labels else (NO_SELECTION,)
         self.objaverse_category_list.options = options
         self.objaverse_category_list.value = options[0]
 
@@ -290,30 +409,3 @@ class SceneEditorLayout:
         """
         camera_choices = config_manager.available_cameras
         return tuple(camera_choices) or (NO_SELECTION,)
-
-    def on_select(self, node) -> None:
-        self.transform.on_select(node)
-
-        if self.gizmo:
-            logger.info("Removing previous gizmo %s", self.gizmo.name)
-            self.gizmo.remove()
-
-        # self.properties.on_select(node)
-        gizmo_visible = self.enable_gizmo_checkbox.value
-
-        parent_node_name = viser_utils.parent_name(node.name)
-        base_node_name = viser_utils.base_name(node.name)
-
-        gizmo = self.server.scene.add_transform_controls(
-            f"{parent_node_name}/{base_node_name}_transform",
-            visible=gizmo_visible,
-            position=node.position,
-            wxyz=node.wxyz,
-        )
-
-        @gizmo.on_update
-        def _(_evt: viser.GuiEvent) -> None:
-            node.position = gizmo.position
-            node.wxyz = gizmo.wxyz
-
-        self.gizmo = gizmo
@@ -0,0 +1,205 @@
+"""
+Latency metrics for GUI callbacks and scene operations.
+
+Collection is off by default and can be switched on in the "Performance" panel
+or with ``MJEDIT_METRICS=1``. While it is off an instrumented function costs one
+extra call and a flag check.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+import bisect
+import json
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Upper bounds of the histogram buckets in milliseconds. The last bucket is open.
+BUCKET_BOUNDS_MS = (0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0, 300.0, 1000.0, 3000.0)
+
+_enabled = os.environ.get("MJEDIT_METRICS", "") not in ("", "0")
+
+
+def enable(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def record(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket that contains the q-th percentile.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+            "buckets": dict(
+                zip([f"<={b}" for b in BUCKET_BOUNDS_MS] + ["inf"], self.buckets)
+            ),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        # GUI callbacks that are currently being executed by the server's thread pool.
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, name: str, duration_s: float) -> None:
+        with self._lock:
+            if (histogram := self.histograms.get(name, None)) is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(duration_s * 1000.0)
+
+    def increment(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def enter_callback(self) -> None:
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def exit_callback(self) -> None:
+        with self._lock:
+            self.queue_depth -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.max_queue_depth = self.queue_depth
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "counters": dict(self.counters),
+                "operations": {
+                    name: h.to_dict() for name, h in sorted(self.histograms.items())
+                },
+            }
+
+    def to_markdown(self) -> str:
+        snapshot = self.snapshot()
+        lines: List[str] = [
+            f"Queue depth: {snapshot['queue_depth']} (max {snapshot['max_queue_depth']})",
+            "",
+            "| Operation | Calls | Mean | p95 | Max |",
+            "|---|---:|---:|---:|---:|",
+        ]
+        for name, h in snapshot["operations"].items():
+            lines.append(
+                f"| {name} | {h['count']} | {h['mean_ms']:.1f} | {h['p95_ms']:.1f} | {h['max_ms']:.1f} |"
+            )
+        if snapshot["counters"]:
+            lines += ["", "| Counter | Value |", "|---|---:|"]
+            for name, value in sorted(snapshot["counters"].items()):
+                lines.append(f"| {name} | {value} |")
+        lines += ["", "Times in ms."]
+        return "\n".join(lines)
+
+    def write(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+
+
+registry = MetricsRegistry()
+
+
+def increment(name: str, n: int = 1) -> None:
+    if _enabled:
+        registry.increment(name, n)
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Records the latency of each call. Defaults to the qualified function name.
+    """
+
+    def decorator(fn: F) -> F:
+        metric_name = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start_time = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.record(metric_name, time.perf_counter() - start_time)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def timed_callback(fn: F) -> F:
+    """
+    Like :func:`timed`, but also tracks the number of GUI callbacks in flight.
+    """
+    metric_name = fn.__qualname__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        registry.enter_callback()
+        start_time = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            registry.record(metric_name, time.perf_counter() - start_time)
+            registry.exit_callback()
+
+    return wrapper  # type: ignore[return-value]
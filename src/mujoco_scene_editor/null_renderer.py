@@ -0,0 +1,64 @@
+from typing import Any
+from typing import Dict
+from typing import List
+
+
+class NullRenderer:
+    """
+    Renderer that draws nothing. Lets the controller run without a server, e.g.,
+    to build scenes from scripts.
+    """
+
+    # There are no GUI elements to update
+    layout = None
+
+    def render_from_state(self, blueprints: List[Any]) -> None:
+        pass
+
+    def render_progressive(
+        self, blueprints: List[Any], *args: Any, **kwargs: Any
+    ) -> None:
+        pass
+
+    def add(self, bp: Any) -> None:
+        pass
+
+    def add_many(self, blueprints: List[Any]) -> None:
+        pass
+
+    def add_robot(self, bp: Any, gripper_bp: Any = None) -> None:
+        pass
+
+    def remove(self, node_name: str) -> None:
+        pass
+
+    def remove_many(self, node_names: List[str]) -> None:
+        pass
+
+    def replace_subtrees(self, node_names: List[str], blueprints: List[Any]) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    def update_pose(self, node_name: str, position: Any, wxyz: Any) -> None:
+        pass
+
+    def update_poses(self, poses: Dict[str, Any]) -> None:
+        pass
+
+    def update_element(
+        self, node_name: str, color: Any, opacity: Any, **kwargs: Any
+    ) -> None:
+        pass
+
+    def update_elements(
+        self, node_names: List[str], color: Any, opacity: Any, **kwargs: Any
+    ) -> None:
+        pass
+
+    def on_select(self, node_name: str, session: Any) -> None:
+        pass
+
+    def get_joint_positions(self) -> Dict[str, List[float]]:
+        return {}
@@ -0,0 +1,337 @@
+"""
+Simulation cost of a scene and suggestions to make it cheaper.
+
+The scene is compiled headlessly and simulated for a short rollout. Besides the
+size of the model, the report counts the geom pairs that the collision filter
+lets through, the contacts per step and the achieved steps per second. The
+cost is attributed to the blueprints, or to the top-level bodies of an MJCF
+file, so that the most expensive elements can be pointed out.
+"""
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import logging
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+import mujoco
+import numpy as np
+
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import MeshBlueprint
+
+logger = logging.getLogger(__name__)
+
+# Steps of the rollout, cut short once it takes longer than the time budget
+ROLLOUT_STEPS = 1000
+ROLLOUT_TIME_S = 2.0
+
+# Meshes with more faces are reported as dense
+DENSE_MESH_FACES = 5000
+
+# Elements that can collide with more geoms or have more contacts per step are
+# reported
+MAX_CONTACT_PAIRS = 100
+MAX_CONTACTS_PER_STEP = 20
+
+# Scenes with more dynamic bodies are reported
+MAX_DYNAMIC_BODIES = 50
+
+# Dynamic elements that move less than this in meters are considered at rest
+REST_DISPLACEMENT = 0.001
+
+# Number of elements listed in the report
+NUM_REPORTED_ELEMENTS = 10
+
+
+@dataclass
+class ElementCost:
+    name: str
+    num_geoms: int = 0
+    mesh_faces: int = 0
+    # Geoms this element can collide with according to the collision filter
+    contact_pairs: int = 0
+    contacts_per_step: float = 0.0
+    is_dynamic: bool = False
+    # Largest displacement of its bodies during the rollout
+    displacement: Optional[float] = None
+    suggestions: List[str] = field(default_factory=list)
+
+    @property
+    def score(self) -> float:
+        """
+        Rough estimate of the cost. Contacts dominate, followed by collision
+        checks and mesh size.
+        """
+        return (
+            10.0 * self.contacts_per_step
+            + self.contact_pairs
+            + self.mesh_faces / 1000.0
+        )
+
+
+@dataclass
+class SceneReport:
+    compile_s: float
+    nbody: int
+    ngeom: int
+    nmesh: int
+    mesh_faces: int
+    ndof: int
+    num_dynamic_bodies: int
+    contact_pairs: int
+    timestep: float
+    steps_per_s: Optional[float] = None
+    contacts_per_step: Optional[float] = None
+    elements: List[ElementCost] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        if self.steps_per_s is None:
+            return None
+        return self.steps_per_s * self.timestep
+
+    def to_markdown(self, num_elements: int = NUM_REPORTED_ELEMENTS) -> str:
+        lines = [
+            f"**Compile** {self.compile_s:.2f}s · **Bodies** {self.nbody} "
+            f"({self.num_dynamic_bodies} dynamic) · **Geoms** {self.ngeom} · "
+            f"**DoF** {self.ndof} · **Meshes** {self.nmesh} "
+            f"({self.mesh_faces:,} faces) · **Contact pairs** {self.contact_pairs:,}",
+            "",
+        ]
+        if self.steps_per_s is not None:
+            lines += [
+                f"**Steps/s** {self.steps_per_s:,.0f} "
+                f"({self.realtime_factor:.1f}× real time) · "
+                f"**Contacts/step** {self.contacts_per_step:.1f}",
+                "",
+            ]
+        lines += [f"- {warning}" for warning in self.warnings]
+        if self.warnings:
+            lines.append("")
+
+        elements = self.elements[:num_elements]
+        if elements:
+            lines += [
+                "| Element | Faces | Pairs | Contacts/step | Suggestion |",
+                "| --- | ---: | ---: | ---: | --- |",
+            ]
+            for e in elements:
+                lines.append(
+                    f"| {e.name} | {e.mesh_faces:,} | {e.contact_pairs} | "
+                    f"{e.contacts_per_step:.1f} | {' '.join(e.suggestions)} |"
+                )
+        return "\n".join(lines)
+
+
+def potential_contact_pairs(model: mujoco.MjModel) -> np.ndarray:
+    """
+    Returns which geoms pass the collision filter of MuJoCo: contype and
+    conaffinity, same body and, unless disabled, parent and child body.
+    """
+    contype = model.geom_contype
+    conaffinity = model.geom_conaffinity
+    can_collide = (
+        (contype[:, None] & conaffinity[None, :])
+        | (contype[None, :] & conaffinity[:, None])
+    ) != 0
+
+    weld = model.body_weldid[model.geom_bodyid]
+    can_collide &= weld[:, None] != weld[None, :]
+    if not model.opt.disableflags & mujoco.mjtDisableBit.mjDSBL_FILTERPARENT:
+        # the world body is exempt from the parent filter
+        parent = model.body_weldid[model.body_parentid[weld]]
+        is_parent = (parent[:, None] == weld[None, :]) & (weld[None, :] != 0)
+        can_collide &= ~is_parent & ~is_parent.T
+    np.fill_diagonal(can_collide, False)
+    return can_collide
+
+
+def _top_level_body(model: mujoco.MjModel, body_id: int) -> int:
+    while body_id != 0 and model.body_parentid[body_id] != 0:
+        body_id = model.body_parentid[body_id]
+    return body_id
+
+
+def _element_names(
+    model: mujoco.MjModel, geom_elements: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """
+    Names the element of each geom. Geoms of blueprints are named after the
+    blueprint, other geoms after their top-level body.
+    """
+    geom_elements = geom_elements or {}
+    names: List[str] = []
+    for geom_id in range(model.ngeom):
+        geom_name = model.geom(geom_id).name
+        if geom_name in geom_elements:
+            names.append(geom_elements[geom_name])
+            continue
+        body_id = _top_level_body(model, model.geom_bodyid[geom_id])
+        if body_id != 0:
+            names.append(model.body(body_id).name or f"body {body_id}")
+        else:
+            names.append(geom_name or f"geom {geom_id}")
+    return names
+
+
+def _rollout(
+    model: mujoco.MjModel, num_steps: int, time_budget_s: float
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Returns the steps per second, the contacts per step of each geom and the
+    displacement of each body.
+    """
+    data = mujoco.MjData(model)
+    if model.nkey > 0:
+        mujoco.mj_resetDataKeyframe(model, data, 0)
+    mujoco.mj_forward(model, data)
+    start_xpos = data.xpos.copy()
+
+    contacts = np.zeros(model.ngeom)
+    step_s = 0.0
+    steps = 0
+    deadline = time.perf_counter() + time_budget_s
+    while steps < num_steps and time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        mujoco.mj_step(model, data)
+        step_s += time.perf_counter() - start_time
+        steps += 1
+        np.add.at(contacts, data.contact.geom[: data.ncon].ravel(), 1)
+    displacement = np.linalg.norm(data.xpos - start_xpos, axis=1)
+    return steps / max(step_s, 1e-9), contacts / max(steps, 1), displacement
+
+
+def _suggest(element: ElementCost) -> None:
+    if element.mesh_faces > DENSE_MESH_FACES:
+        if element.is_dynamic:
+            element.suggestions.append(
+                f"Replace the mesh ({element.mesh_faces:,} faces) with a primitive, "
+                "collisions use its convex hull anyway."
+            )
+        else:
+            element.suggestions.append(
+                f"Decimate the mesh ({element.mesh_faces:,} faces) or use a "
+                "primitive for collisions."
+            )
+    if element.is_dynamic and element.displacement is not None:
+        if element.displacement < REST_DISPLACEMENT:
+            element.suggestions.append(
+                "It does not move, mark it static unless it is manipulated."
+            )
+    if element.is_dynamic and element.contact_pairs > MAX_CONTACT_PAIRS:
+        element.suggestions.append(
+            f"It can collide with {element.contact_pairs} geoms. Mark it static or "
+            "merge its parts into fewer geoms."
+        )
+    if element.contacts_per_step > MAX_CONTACTS_PER_STEP:
+        element.suggestions.append(
+            f"It has {element.contacts_per_step:.0f} contacts per step. Use simpler "
+            "collision shapes."
+        )
+
+
+def analyze_model(
+    model: mujoco.MjModel,
+    geom_elements: Optional[Dict[str, str]] = None,
+    num_steps: int = ROLLOUT_STEPS,
+    compile_s: float = 0.0,
+) -> SceneReport:
+    """
+    Analyzes a compiled model. ``geom_elements`` maps geom names to the
+    element they are reported as. With ``num_steps=0`` there is no rollout.
+    """
+    can_collide = potential_contact_pairs(model)
+    is_mesh = model.geom_type == mujoco.mjtGeom.mjGEOM_MESH
+    geom_mesh_faces = np.zeros(model.ngeom, dtype=int)
+    geom_mesh_faces[is_mesh] = model.mesh_facenum[model.geom_dataid[is_mesh]]
+    is_dynamic_body = model.body_weldid != 0
+    report = SceneReport(
+        compile_s=compile_s,
+        nbody=model.nbody,
+        ngeom=model.ngeom,
+        nmesh=model.nmesh,
+        mesh_faces=int(model.mesh_facenum.sum()),
+        ndof=model.nv,
+        num_dynamic_bodies=int(np.count_nonzero(is_dynamic_body)),
+        contact_pairs=int(np.count_nonzero(np.triu(can_collide))) + model.npair,
+        timestep=model.opt.timestep,
+    )
+
+    contacts: Optional[np.ndarray] = None
+    displacement: Optional[np.ndarray] = None
+    if num_steps > 0:
+        report.steps_per_s, contacts, displacement = _rollout(
+            model, num_steps, ROLLOUT_TIME_S
+        )
+        # every contact involves two geoms
+        report.contacts_per_step = float(contacts.sum() / 2.0)
+
+    elements: Dict[str, ElementCost] = {}
+    for geom_id, name in enumerate(_element_names(model, geom_elements)):
+        element = elements.setdefault(name, ElementCost(name))
+        body_id = model.geom_bodyid[geom_id]
+        element.num_geoms += 1
+        element.mesh_faces += int(geom_mesh_faces[geom_id])
+        element.contact_pairs += int(np.count_nonzero(can_collide[geom_id]))
+        element.is_dynamic |= bool(is_dynamic_body[body_id])
+        if contacts is not None:
+            element.contacts_per_step += float(contacts[geom_id])
+        if displacement is not None and is_dynamic_body[body_id]:
+            element.displacement = max(
+                element.displacement or 0.0, float(displacement[body_id])
+            )
+    for element in elements.values():
+        _suggest(element)
+    report.elements = sorted(elements.values(), key=lambda e: e.score, reverse=True)
+
+    if report.num_dynamic_bodies > MAX_DYNAMIC_BODIES:
+        report.warnings.append(
+            f"The scene has {report.num_dynamic_bodies} dynamic bodies. Mark the "
+            "background objects static."
+        )
+    if report.realtime_factor is not None and report.realtime_factor < 1.0:
+        report.warnings.append(
+            f"The scene simulates at {report.realtime_factor:.2f}× real time."
+        )
+    return report
+
+
+def analyze_blueprints(
+    blueprints: Sequence[Blueprint], num_steps: int = ROLLOUT_STEPS
+) -> SceneReport:
+    from robits.sim.model_factory import SceneBuilder
+
+    start_time = time.perf_counter()
+    model = SceneBuilder(add_floor=False).build_from_blueprints(blueprints)
+    compile_s = time.perf_counter() - start_time
+    geom_elements = {
+        bp.basename: bp.path
+        for bp in blueprints
+        if isinstance(bp, (GeomBlueprint, MeshBlueprint))
+    }
+    return analyze_model(model, geom_elements, num_steps, compile_s)
+
+
+def analyze_file(path: Path, num_steps: int = ROLLOUT_STEPS) -> SceneReport:
+    """
+    Analyzes an MJCF file or a blueprint file.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".xml":
+        start_time = time.perf_counter()
+        model = mujoco.MjModel.from_xml_path(str(path))
+        compile_s = time.perf_counter() - start_time
+        return analyze_model(model, num_steps=num_steps, compile_s=compile_s)
+
+    from mujoco_scene_editor.utils import blueprint_io
+
+    return analyze_blueprints(blueprint_io.load_blueprints(path), num_steps)
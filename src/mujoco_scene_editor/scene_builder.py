@@ -0,0 +1,288 @@
+"""
+Fluent API to build scenes from Python scripts without a server.
+
+Example::
+
+    from mujoco_scene_editor.scene_builder import SceneBuilder
+
+    scene = SceneBuilder()
+    with scene.group("table", position=(0.0, 0.0, 0.4)) as table:
+        table.box("top", dims=(1.0, 0.6, 0.02), rgba=(0.6, 0.4, 0.2, 1.0))
+        for i in range(4):
+            table.sphere(radius=0.02, position=(0.1 * i, 0.0, 0.03))
+    scene.cylinder("pole", radius=0.02, height=1.0)
+    scene.translate(["/pole"], (1.0, 0.0, 0.0))
+    scene.export("~/temp/export/scene.xml")
+
+Elements are collected and inserted in one batch before they are read, moved or
+exported. By default no undo history is kept.
+"""
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import logging
+from pathlib import Path
+
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import MeshBlueprint
+from robits.sim.blueprints import Pose
+
+from mujoco_scene_editor.controller import SceneEditorController
+from mujoco_scene_editor.null_renderer import NullRenderer
+from mujoco_scene_editor.state import State
+from mujoco_scene_editor.utils import blueprint_io
+from mujoco_scene_editor.utils import transforms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RGBA = (0.8, 0.8, 0.8, 1.0)
+
+
+def _pose(position: Optional[Sequence[float]], wxyz: Optional[Sequence[float]]) -> Pose:
+    return Pose(
+        transforms.pose_to_matrix(
+            (0.0, 0.0, 0.0) if position is None else position,
+            (1.0, 0.0, 0.0, 0.0) if wxyz is None else wxyz,
+        )
+    )
+
+
+class GroupBuilder:
+    """
+    Adds elements below ``path``. Methods return the builder for chaining.
+    """
+
+    def __init__(self, scene: "SceneBuilder", path: str) -> None:
+        self.scene = scene
+        self.path = path
+
+    def __enter__(self) -> "GroupBuilder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def _path(self, name: Optional[str], kind: str) -> str:
+        if name:
+            return f"{self.path}/{name}"
+        return self.scene._auto_path(self.path, kind)
+
+    def add(self, bp: Blueprint) -> "GroupBuilder":
+        """
+        Adds a blueprint as is. Its path must be absolute.
+        """
+        self.scene._queue(bp)
+        return self
+
+    def group(
+        self,
+        name: Optional[str] = None,
+        position: Optional[Sequence[float]] = None,
+        wxyz: Optional[Sequence[float]] = None,
+    ) -> "GroupBuilder":
+        """
+        Adds a group and returns a builder for its children.
+        """
+        path = self._path(name, "group")
+        self.add(BlueprintGroup(path, _pose(position, wxyz)))
+        return GroupBuilder(self.scene, path)
+
+    def box(
+        self,
+        name: Optional[str] = None,
+        dims: Sequence[float] = (0.1, 0.1, 0.1),
+        rgba: Sequence[float] = DEFAULT_RGBA,
+        position: Optional[Sequence[float]] = None,
+        wxyz: Optional[Sequence[float]] = None,
+        is_static: bool = False,
+    ) -> "GroupBuilder":
+        return self.add(
+            GeomBlueprint(
+                path=self._path(name, "box"),
+                geom_type="box",
+                pose=_pose(position, wxyz),
+                size=[d / 2.0 for d in dims],
+                rgba=list(rgba),
+                is_static=is_static,
+            )
+        )
+
+    def sphere(
+        self,
+        name: Optional[str] = None,
+        radius: float = 0.05,
+        rgba: Sequence[float] = DEFAULT_RGBA,
+        position: Optional[Sequence[float]] = None,
+        is_static: bool = False,
+    ) -> "GroupBuilder":
+        return self.add(
+            GeomBlueprint(
+                path=self._path(name, "sphere"),
+                geom_type="sphere",
+                pose=_pose(position, None),
+                size=[radius],
+                rgba=list(rgba),
+                is_static=is_static,
+            )
+        )
+
+    def cylinder(
+        self,
+        name: Optional[str] = None,
+        radius: float = 0.05,
+        height: float = 0.2,
+        rgba: Sequence[float] = DEFAULT_RGBA,
+        position: Optional[Sequence[float]] = None,
+        wxyz: Optional[Sequence[float]] = None,
+        is_static: bool = False,
+    ) -> "GroupBuilder":
+        return self.add(
+            GeomBlueprint(
+                path=self._path(name, "cylinder"),
+                geom_type="cylinder",
+                pose=_pose(position, wxyz),
+                size=[radius, height / 2.0],
+                rgba=list(rgba),
+                is_static=is_static,
+            )
+        )
+
+    def mesh(
+        self,
+        mesh_path: Union[str, Path],
+        name: Optional[str] = None,
+        scale: float = 1.0,
+        position: Optional[Sequence[float]] = None,
+        wxyz: Optional[Sequence[float]] = None,
+        is_static: bool = False,
+    ) -> "GroupBuilder":
+        mesh_path = Path(mesh_path).expanduser()
+        return self.add(
+            MeshBlueprint(
+                path=self._path(name, f"asset_{mesh_path.name}"),
+                mesh_path=str(mesh_path),
+                pose=_pose(position, wxyz),
+                is_static=is_static,
+                scale=scale,
+            )
+        )
+
+    def move(
+        self,
+        path: str,
+        position: Sequence[float] = (0.0, 0.0, 0.0),
+        wxyz: Sequence[float] = (1.0, 0.0, 0.0, 0.0),
+    ) -> "GroupBuilder":
+        """
+        Sets the pose of an element relative to its parent.
+        """
+        self.scene.flush()
+        self.scene.controller.update_pose(path, position, wxyz)
+        return self
+
+    def translate(
+        self, paths: Sequence[str], offset: Sequence[float]
+    ) -> "GroupBuilder":
+        self.scene.flush()
+        self.scene.controller.move_many(paths, offset)
+        return self
+
+    def reparent(self, paths: Sequence[str], parent_path: str) -> "GroupBuilder":
+        self.scene.flush()
+        self.scene.controller.reparent(paths, parent_path)
+        return self
+
+    def remove(self, paths: Sequence[str]) -> "GroupBuilder":
+        self.scene.flush()
+        self.scene.controller.remove_many(paths)
+        return self
+
+
+class SceneBuilder(GroupBuilder):
+    """
+    Builds a scene with a headless controller.
+
+    Pass ``keep_history=True`` to be able to undo the changes or a controller
+    to edit the scene of a running editor.
+    """
+
+    def __init__(
+        self,
+        controller: Optional[SceneEditorController] = None,
+        keep_history: bool = False,
+    ) -> None:
+        super().__init__(self, "")
+        if controller is None:
+            controller = SceneEditorController(NullRenderer(), State(keep_history))
+        self.controller = controller
+        self._pending: Dict[str, Blueprint] = {}
+        self._seq = int(controller.state.element_seq)
+
+    def _queue(self, bp: Blueprint) -> None:
+        if bp.path in self._pending or bp.path in self.controller.state.blueprints:
+            raise ValueError(f"Element {bp.path} already exists")
+        self._pending[bp.path] = bp
+
+    def _auto_path(self, parent_path: str, kind: str) -> str:
+        while True:
+            path = f"{parent_path}/{kind}_{self._seq:04d}"
+            self._seq += 1
+            if (
+                path not in self._pending
+                and path not in self.controller.state.blueprints
+            ):
+                return path
+
+    def flush(self) -> "SceneBuilder":
+        """
+        Inserts the queued elements.
+        """
+        if self._pending:
+            self.controller.add_many(list(self._pending.values()))
+            self._pending.clear()
+        return self
+
+    def __len__(self) -> int:
+        return len(self.controller.state.blueprints) + len(self._pending)
+
+    @property
+    def blueprints(self) -> List[Blueprint]:
+        self.flush()
+        return list(self.controller.state.blueprints.values())
+
+    def load(self, path: Union[str, Path]) -> "SceneBuilder":
+        """
+        Replaces the scene with a blueprint file.
+        """
+        self._pending.clear()
+        self.controller.load_blueprints(
+            blueprint_io.load_blueprints(Path(path).expanduser())
+        )
+        self._seq = int(self.controller.state.element_seq)
+        return self
+
+    def save(self, path: Union[str, Path]) -> "SceneBuilder":
+        """
+        Writes the blueprints only, as JSON or, for ``.npz``, in the binary format.
+        """
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blueprint_io.save_blueprints(path, self.blueprints)
+        return self
+
+    def export(
+        self, path: Union[str, Path], density: Optional[float] = None
+    ) -> "SceneBuilder":
+        """
+        Writes the MuJoCo XML and the blueprint file next to it. If ``density``
+        is given in kg/m³, masses and inertias are estimated from the geometry.
+        """
+        self.flush()
+        self.controller.export_scene(Path(path).expanduser(), density=density)
+        return self
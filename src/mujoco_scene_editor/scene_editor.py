@@ -1,50 +1,205 @@
+from typing import List
+from typing import Optional
+from typing import Tuple
+
 import sys
 import logging
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
 import subprocess
+import threading
+import time
 
+from mujoco_scene_editor.camera_preview import CameraPreview
 from mujoco_scene_editor.layout import SceneEditorLayout
+from mujoco_scene_editor.gui.client_session import ClientSession
 from mujoco_scene_editor.inventory.local_assets import ObjectModel
 from mujoco_scene_editor.inventory.local_assets import Inventory
 from mujoco_scene_editor.inventory.objverse import ObjaverseInventory
 from mujoco_scene_editor.inventory.objverse import ObjaverseItem
 from mujoco_scene_editor.inventory.objverse import lookup_default_scale
-from mujoco_scene_editor.inventory.objverse import SCALE_OVERRIDES
+from mujoco_scene_editor.inventory.objaverse_catalog import ObjaverseCatalog
+from mujoco_scene_editor.inventory.mesh_index import MeshIndex
+from mujoco_scene_editor.inventory.thumbnails import ThumbnailCache
+from mujoco_scene_editor.inventory.thumbnails import load_thumbnail
 
 from mujoco_scene_editor.utils.viser_utils import color_to_blueprint_rgba
+from mujoco_scene_editor.utils import transforms
 from mujoco_scene_editor.utils.mesh_conversion import convert_to_mujoco_mesh
+from mujoco_scene_editor.utils import urdf_cache
+from mujoco_scene_editor.utils.rate_limiter import RateLimiter
+from mujoco_scene_editor import metrics
 
 from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.constants import LOADING
+from mujoco_scene_editor.constants import ALL_KINDS
+from mujoco_scene_editor.constants import OBJAVERSE_PAGE_SIZE
+from mujoco_scene_editor.constants import CAMERA_PREVIEW_RATE_HZ
+
+from robits.sim.blueprints import CameraBlueprint
+from robits.sim.blueprints import Pose
 
 from viser import GuiEvent
 
 logger = logging.getLogger(__name__)
 
+# Seconds between updates of the performance panel while metrics are collected
+METRICS_REFRESH_PERIOD = 2.0
+
+# Updates per second of the thumbnail progress
+THUMBNAIL_INFO_RATE_HZ = 1.0
+
+# Maximum rate of catalog queries while typing a search
+OBJAVERSE_SEARCH_RATE_HZ = 5.0
+
 
 class SceneEditor:
     def __init__(self, controller, layout: SceneEditorLayout) -> None:
+        self._start_time = time.perf_counter()
         self.controller = controller
         self.layout = layout
 
         self.inventory = Inventory()
         self.obj_inventory = ObjaverseInventory()
+        self.objaverse_catalog = ObjaverseCatalog()
+        # Index of the first object on the shown page of the catalog
+        self._objaverse_offset = 0
+        self._objaverse_search = RateLimiter(
+            self.show_objaverse_page, OBJAVERSE_SEARCH_RATE_HZ, "objaverse_search"
+        )
+        self.camera_preview = CameraPreview()
+        self.thumbnails = ThumbnailCache()
+        self.mesh_index = MeshIndex()
+        self._index_lock = threading.Lock()
+        self.thumbnails.on_ready(self._on_thumbnail_ready)
+        self._thumbnail_info = RateLimiter(
+            self.update_thumbnail_info, THUMBNAIL_INFO_RATE_HZ, "thumbnail_info"
+        )
+
+        robot_choices = [
+            r for r in self.layout.get_robot_choices() if r != NO_SELECTION
+        ]
+        urdf_cache.preload_async(robot_choices)
 
-        self._load_inventory()
         self._register_cbs()
+        self.layout.update_metrics_panel()
+        threading.Thread(
+            target=self._refresh_metrics_panel, name="metrics-panel", daemon=True
+        ).start()
+        threading.Thread(
+            target=self._refresh_camera_previews, name="camera-previews", daemon=True
+        ).start()
+        logger.info(
+            "Scene editor is interactive after %.2fs",
+            time.perf_counter() - self._start_time,
+        )
+
+        # Inventory sources can take long on a cold cache. The dropdowns show a
+        # loading state until each source is available.
+        self._inventory_thread = threading.Thread(
+            target=self._load_inventory, name="inventory-loader", daemon=True
+        )
+        self._inventory_thread.start()
 
     def _load_inventory(self):
-        items = self.inventory.list(
+        sources = (
+            ("local assets", self._list_local_assets, self._set_asset_items),
+            (
+                "objaverse catalog",
+                self._load_objaverse_catalog,
+                self._set_objaverse_labels,
+            ),
+        )
+        for source_name, list_fn, set_fn in sources:
+            start_time = time.perf_counter()
+            try:
+                items = list_fn()
+            except Exception as e:
+                logger.error("Unable to load %s: %s", source_name, e)
+                items = []
+            else:
+                logger.info(
+                    "Loaded %s in %.2fs", source_name, time.perf_counter() - start_time
+                )
+            set_fn(items)
+        logger.info(
+            "Inventory loaded %.2fs after startup",
+            time.perf_counter() - self._start_time,
+        )
+        self.index_meshes()
+
+    def index_meshes(self) -> None:
+        """
+        Computes the statistics of new inventory meshes. They are used to
+        guess the scale of Objaverse objects.
+        """
+        objaverse_items = self.objaverse_catalog.local_items()
+        mesh_paths = [m.path for m in self.layout.asset_items.values()]
+        mesh_paths += [item.path for item in objaverse_items if item.path is not None]
+        with self._index_lock:
+            try:
+                self.mesh_index.set_objects(
+                    (item.uid, item.label, item.path) for item in objaverse_items
+                )
+                self.mesh_index.update(mesh_paths)
+            except Exception as e:
+                logger.error("Unable to index meshes: %s", e)
+
+    def index_meshes_async(self) -> None:
+        threading.Thread(
+            target=self.index_meshes, name="mesh-indexer", daemon=True
+        ).start()
+
+    def _list_local_assets(self) -> List[ObjectModel]:
+        return self.inventory.list(
             root=Path(self.layout.assets_dir.value.strip()).expanduser()
         )
+
+    def _set_asset_items(self, items: List[ObjectModel]) -> None:
         self.layout.asset_items = {m.name: m for m in items}
         self.layout.update_assets_dropdown()
+        self.thumbnails.submit(m.path for m in items)
+        self.show_thumbnails()
 
-        self.layout.objaverse_labels = tuple(self.obj_inventory.list_labels())
+    def _load_objaverse_catalog(self) -> List[str]:
+        local_paths = {item.uid: item.path for item in self.obj_inventory.list_local()}
+        if len(self.objaverse_catalog) == 0:
+            self.objaverse_catalog.build(self.obj_inventory.annotations(), local_paths)
+        else:
+            self.objaverse_catalog.build({}, local_paths)
+            self.objaverse_catalog.set_paths(local_paths)
+        return self.objaverse_catalog.labels()
+
+    def _set_objaverse_labels(self, labels: List[str]) -> None:
+        self.layout.objaverse_labels = tuple(labels)
         self.layout.update_objaverse_label_dropdown()
+        self.show_objaverse_page()
+
+    def show_objaverse_page(self, offset: int = 0) -> None:
+        """
+        Shows the catalog objects that match the search and category, starting
+        at ``offset``.
+        """
+        label = self.layout.objaverse_category_list.value
+        if label in (ALL_KINDS, NO_SELECTION, LOADING):
+            label = None
+        try:
+            page = self.objaverse_catalog.search(
+                self.layout.objaverse_search.value, label, offset
+            )
+        except Exception as e:
+            logger.error("Unable to search the Objaverse catalog: %s", e)
+            return
+        self._objaverse_offset = page.offset
+        self._set_objaverse_items(page.items)
+        self.layout.update_objaverse_page_info(page.offset, len(page.items), page.total)
 
-        obj_items = self.obj_inventory.list_by_labels(labels=None, limit_per_label=50)
-        self.layout.objaverse_items = {m.name: m for m in obj_items}
+    def _set_objaverse_items(self, items: List[ObjaverseItem]) -> None:
+        self.layout.objaverse_items = {m.name: m for m in items}
         self.layout.update_objaverse_dropdown()
+        self.thumbnails.submit(m.path for m in items if m.path is not None)
+        self.show_thumbnails()
 
     def _register_cbs(self):
         self.layout.btn_clear.on_click(self.reset_scene)
@@ -60,30 +215,140 @@ class SceneEditor:
         self.layout.btn_add_robot.on_click(self.add_robot)
 
         self.layout.btn_delete_element.on_click(self.delete_element)
-        self.layout.element_list.on_update(self.on_select)
-        self.layout.transform.btn_reset.on_click(self.reset_selected_transform)
-        self.layout.transform.btn_set_transform.on_click(self.set_selected_transform)
         self.layout.btn_scan_assets.on_click(self.scan_assets)
         self.layout.btn_add_asset.on_click(self.add_asset)
+        self.layout.assets_list.on_update(self.on_asset_item_change)
         self.layout.btn_add_objaverse.on_click(self.add_objaverse_object)
         self.layout.objaverse_scale.on_update(self.on_objaverse_scale_change)
         self.layout.objaverse_category_list.on_update(self.on_objaverse_category_change)
         self.layout.objaverse_list.on_update(self.on_objaverse_item_change)
+        self.layout.objaverse_search.on_update(
+            lambda _evt: self._objaverse_search.submit()
+        )
+        self.layout.objaverse_page_buttons.on_click(self.on_objaverse_page_click)
 
+        self.layout.btn_analyze.on_click(self.analyze_scene)
         self.layout.btn_export_mj.on_click(self.export_mujoco)
         self.layout.btn_launch_mj.on_click(self.launch_mujoco_viewer)
 
-        self.layout.btn_update_element.on_click(self.update_element)
         self.layout.enable_gizmo_checkbox.on_update(self.toggle_gizmo_visibility)
+        self.layout.pose_rate.on_update(self.set_pose_rate)
         self.layout.btn_create_group.on_click(self.create_group)
 
-    def toggle_gizmo_visibility(self, _evt: GuiEvent) -> None:
-        self.layout.gizmo.visible = self.layout.enable_gizmo_checkbox.value
+        self.layout.metrics_enabled.on_update(self.toggle_metrics)
+        self.layout.btn_reset_metrics.on_click(self.reset_metrics)
+        self.layout.btn_write_metrics.on_click(self.write_metrics)
+
+        self.layout.on_session_created(self._register_session_cbs)
+
+    def _register_session_cbs(self, session: ClientSession) -> None:
+        session.on_selection_change(partial(self.on_select, session))
+        session.transform.btn_reset.on_click(
+            partial(self.reset_selected_transform, session)
+        )
+        session.transform.btn_set_transform.on_click(
+            partial(self.set_selected_transform, session)
+        )
+        session.btn_update_element.on_click(partial(self.update_element, session))
+        session.btn_bulk_move.on_click(partial(self.move_selected, session))
+        session.btn_bulk_color.on_click(partial(self.recolor_selected, session))
+        session.btn_bulk_reparent.on_click(partial(self.reparent_selected, session))
+
+    def _session(self, evt: GuiEvent) -> Optional[ClientSession]:
+        return self.layout.get_session(evt.client_id)
+
+    def _select_created(self, evt: GuiEvent, name: Optional[str]) -> None:
+        """
+        Selects a newly created element for the client that created it.
+        """
+        if name and (session := self._session(evt)):
+            session.select(name)
+
+    def toggle_metrics(self, _evt: GuiEvent) -> None:
+        metrics.enable(self.layout.metrics_enabled.value)
+        self.layout.update_metrics_panel()
+
+    def reset_metrics(self, _evt: GuiEvent) -> None:
+        metrics.registry.reset()
+        self.layout.update_metrics_panel()
+
+    def write_metrics(self, evt: GuiEvent) -> None:
+        out_path = Path(self.layout.metrics_path.value).expanduser()
+        metrics.registry.write(out_path)
+        evt.client.add_notification(
+            "Metrics written",
+            f"Metrics written to {out_path}",
+            auto_close_seconds=3.0,
+            loading=False,
+        )
 
-    def on_gizmo_drag_end(self, _evt: GuiEvent) -> None:
-        gizmo = self.layout.gizmo
-        sel = self.layout.element_list.value
-        self.controller.update_pose(sel, gizmo.position, gizmo.wxyz)
+    def _refresh_metrics_panel(self) -> None:
+        while self.is_running:
+            if metrics.is_enabled():
+                self.layout.update_metrics_panel()
+            time.sleep(METRICS_REFRESH_PERIOD)
+
+    def _refresh_camera_previews(self) -> None:
+        while self.is_running:
+            self.refresh_camera_previews()
+            time.sleep(1.0 / CAMERA_PREVIEW_RATE_HZ)
+
+    def refresh_camera_previews(self) -> None:
+        """
+        Requests the view of the selected camera for each client with an open
+        preview. Elements that are dragged are shown at the gizmo pose.
+        """
+        sessions = list(self.layout.sessions.values())
+        if not any(s.preview_enabled.value for s in sessions):
+            return
+        blueprints = dict(self.controller.state.blueprints)
+        for session in sessions:
+            if session.drag_pose is None:
+                continue
+            name, position, wxyz = session.drag_pose
+            if getattr(bp := blueprints.get(name, None), "pose", None) is not None:
+                pose = Pose(transforms.pose_to_matrix(position, wxyz))
+                blueprints[name] = replace(bp, pose=pose)
+
+        for session in sessions:
+            if not session.preview_enabled.value:
+                continue
+            if not isinstance(blueprints.get(session.selection, None), CameraBlueprint):
+                session.clear_preview()
+                continue
+            try:
+                self.camera_preview.request(
+                    session.selection, blueprints, session.show_preview
+                )
+            except Exception as e:
+                logger.exception("Unable to preview camera %s", session.selection)
+                session.show_preview(None, None, str(e))
+
+    @metrics.timed_callback
+    def toggle_gizmo_visibility(self, _evt: GuiEvent) -> None:
+        for session in list(self.layout.sessions.values()):
+            session.set_gizmo_visible(self.layout.enable_gizmo_checkbox.value)
+
+    @metrics.timed_callback
+    def set_pose_rate(self, _evt: GuiEvent) -> None:
+        rate_hz = self.layout.pose_rate.value
+        for session in list(self.layout.sessions.values()):
+            session.set_pose_rate(rate_hz)
+        self.controller.renderer.set_pose_rate(rate_hz)
+
+    @metrics.timed_callback
+    def on_gizmo_drag_end(self, session: ClientSession, _evt: GuiEvent) -> None:
+        gizmo = session.gizmo
+        if gizmo is None:
+            return
+        # repeated drags of the same element are undone at once
+        self.controller.update_pose(
+            session.selection,
+            gizmo.position,
+            gizmo.wxyz,
+            interaction=("pose", session.client_id, session.selection),
+        )
+        session.drag_pose = None
 
     @property
     def url(self) -> str:
@@ -96,6 +361,7 @@ class SceneEditor:
     def show(self) -> None:
         logger.info("Open the Scene Editor UI in your browser: %s", self.url)
 
+    @metrics.timed_callback
     def reset_scene(self, _evt: GuiEvent) -> None:
         self.layout.reset()
         self.controller.reset()
@@ -104,92 +370,181 @@ class SceneEditor:
     def is_running(self) -> bool:
         return self.controller.is_running
 
+    @metrics.timed_callback
     def quit_server(self, _evt: GuiEvent) -> None:
         self.layout.server.stop()
         self.controller.shutdown()
+        self.camera_preview.close()
+        self.thumbnails.close()
+        self.mesh_index.close()
+        self.objaverse_catalog.close()
 
+    @metrics.timed_callback
     def undo(self, _evt: GuiEvent) -> None:
         self.controller.undo()
 
+    @metrics.timed_callback
     def redo(self, _evt: GuiEvent) -> None:
         self.controller.redo()
 
-    def get_selected_parent(self) -> str:
-        sel = self.layout.element_list.value
-        if sel == NO_SELECTION:
+    def get_selected_parent(self, evt: GuiEvent) -> str:
+        session = self._session(evt)
+        if session is None or session.selection == NO_SELECTION:
             return ""
-        return sel
+        return session.selection
 
-    def create_group(self, _evt: GuiEvent) -> None:
+    @metrics.timed_callback
+    def create_group(self, evt: GuiEvent) -> None:
         name = self.layout.txt_group_name.value
-        parent_name = self.get_selected_parent()
-        self.controller.create_group(parent_name, name)
+        parent_name = self.get_selected_parent(evt)
+        self._select_created(evt, self.controller.create_group(parent_name, name))
 
-    def create_box(self, _evt: GuiEvent) -> None:
-        parent_name = self.get_selected_parent()
+    @metrics.timed_callback
+    def create_box(self, evt: GuiEvent) -> None:
+        parent_name = self.get_selected_parent(evt)
         dims = self.layout.box_dims.value
         color = self.layout.box_color.value  # RGB 0–255
         opacity = self.layout.box_opacity.value
         rgba = color_to_blueprint_rgba(color, opacity)
-        self.controller.create_box(parent_name, dims, rgba)
+        self._select_created(evt, self.controller.create_box(parent_name, dims, rgba))
 
-    def create_cylinder(self, _evt: GuiEvent) -> None:
-        parent_name = self.get_selected_parent()
+    @metrics.timed_callback
+    def create_cylinder(self, evt: GuiEvent) -> None:
+        parent_name = self.get_selected_parent(evt)
         radius = self.layout.cyl_radius.value
         height = self.layout.cyl_height.value
         half_height = 0.5 * height
         color = self.layout.cyl_color.value  # RGB 0–255
         opacity = self.layout.cyl_opacity.value
         rgba = color_to_blueprint_rgba(color, opacity)
-        self.controller.create_cylinder(parent_name, radius, half_height, rgba)
+        name = self.controller.create_cylinder(parent_name, radius, half_height, rgba)
+        self._select_created(evt, name)
 
-    def create_sphere(self, _evt: GuiEvent) -> None:
-        parent_name = self.get_selected_parent()
+    @metrics.timed_callback
+    def create_sphere(self, evt: GuiEvent) -> None:
+        parent_name = self.get_selected_parent(evt)
         radius = self.layout.sphere_radius.value
         color = self.layout.sphere_color.value
         opacity = self.layout.sphere_opacity.value
         rgba = color_to_blueprint_rgba(color, opacity)
-        self.controller.create_sphere(parent_name, radius, rgba)
+        self._select_created(
+            evt, self.controller.create_sphere(parent_name, radius, rgba)
+        )
 
-    def delete_element(self, _evt: GuiEvent) -> None:
-        sel = self.layout.element_list.value
-        self.controller.remove(sel)
+    @metrics.timed_callback
+    def delete_element(self, evt: GuiEvent) -> None:
+        if session := self._session(evt):
+            self.controller.remove_many(session.selected_names())
+
+    @metrics.timed_callback
+    def move_selected(self, session: ClientSession, _evt: GuiEvent) -> None:
+        self.controller.move_many(session.selected_names(), session.bulk_offset.value)
+
+    @metrics.timed_callback
+    def recolor_selected(self, session: ClientSession, _evt: GuiEvent) -> None:
+        self.controller.update_elements(
+            session.selected_names(),
+            session.bulk_color.value,
+            session.bulk_opacity.value,
+        )
 
-    def on_select(self, _evt: GuiEvent) -> None:
-        sel = self.layout.element_list.value
+    @metrics.timed_callback
+    def reparent_selected(self, session: ClientSession, evt: GuiEvent) -> None:
+        parent_name = session.bulk_parent.value.strip().rstrip("/")
+        if parent_name and parent_name not in self.controller.state.blueprints:
+            evt.client.add_notification(
+                "Unable to reparent",
+                f"Element {parent_name} does not exist.",
+                auto_close_seconds=3.0,
+                loading=False,
+            )
+            return
+        moves = self.controller.reparent(session.selected_names(), parent_name)
+        session.outliner.set_marked(moves.get(n, n) for n in session.outliner.marked)
+        if session.selection in moves:
+            session.select(moves[session.selection])
 
-        self.controller.select(sel)
+    @metrics.timed_callback
+    def on_select(self, session: ClientSession) -> None:
+        self.controller.end_interaction()
+        self.controller.select(session.selection, session)
 
-        if self.layout.gizmo:
-            self.layout.gizmo.on_drag_end(self.on_gizmo_drag_end)
+        if session.gizmo:
+            session.gizmo.on_drag_end(partial(self.on_gizmo_drag_end, session))
 
-    def reset_selected_transform(self, _evt: GuiEvent) -> None:
-        sel = self.layout.element_list.value
+    @metrics.timed_callback
+    def reset_selected_transform(self, session: ClientSession, _evt: GuiEvent) -> None:
         position = (0.0, 0.0, 0.0)
         wxyz = (1.0, 0.0, 0.0, 0.0)
-        self.controller.update_pose(sel, position, wxyz)
-
-    def set_selected_transform(self, _evt: GuiEvent) -> None:
-        sel = self.layout.element_list.value
-        position, wxyz = self.layout.transform.get_transform()
-        self.controller.update_pose(sel, position, wxyz)
+        self.controller.update_pose(session.selection, position, wxyz)
+
+    @metrics.timed_callback
+    def set_selected_transform(self, session: ClientSession, _evt: GuiEvent) -> None:
+        position, wxyz = session.transform.get_transform()
+        self.controller.update_pose(
+            session.selection,
+            position,
+            wxyz,
+            interaction=("pose", session.client_id, session.selection),
+        )
 
+    @metrics.timed_callback
     def scan_assets(self, _evt: GuiEvent) -> None:
         root = self.layout.assets_dir.value.strip() or "~"
-        items = self.inventory.list(
-            root=Path(root).expanduser(), cachier__overwrite_cache=True
+        items = self.inventory.list(root=Path(root).expanduser(), refresh_cache=True)
+        self._set_asset_items(items)
+        self.index_meshes_async()
+
+    def _show_thumbnail(self, handle, mesh_path: Optional[Path]) -> None:
+        png_path = self.thumbnails.path_for(mesh_path) if mesh_path else None
+        if png_path is None and mesh_path is not None:
+            self.thumbnails.prioritize(mesh_path)
+        self.layout.show_thumbnail(
+            handle, load_thumbnail(png_path) if png_path else None
         )
-        self.layout.asset_items = {m.name: m for m in items}
-        self.layout.update_assets_dropdown()
 
-    def add_asset(self, _evt: GuiEvent) -> None:
+    def _selected_mesh_paths(self) -> Tuple[Optional[Path], Optional[Path]]:
+        model = self.layout.asset_items.get(self.layout.assets_list.value, None)
+        item = self.layout.objaverse_items.get(self.layout.objaverse_list.value, None)
+        return (model.path if model else None, item.path if item else None)
+
+    def show_thumbnails(self) -> None:
+        """
+        Shows the thumbnails of the selected assets. Missing ones are generated
+        next.
+        """
+        asset_path, objaverse_path = self._selected_mesh_paths()
+        self._show_thumbnail(self.layout.asset_thumbnail, asset_path)
+        self._show_thumbnail(self.layout.objaverse_thumbnail, objaverse_path)
+        self._thumbnail_info.submit()
+
+    def update_thumbnail_info(self) -> None:
+        if pending := self.thumbnails.pending:
+            self.layout.thumbnail_info.content = f"Creating thumbnails, {pending} left"
+        else:
+            self.layout.thumbnail_info.content = ""
+
+    def _on_thumbnail_ready(self, mesh_path: Path, _png_path: Optional[Path]) -> None:
+        if mesh_path in self._selected_mesh_paths():
+            self.show_thumbnails()
+        else:
+            self._thumbnail_info.submit()
+
+    @metrics.timed_callback
+    def on_asset_item_change(self, _evt: GuiEvent) -> None:
+        self.show_thumbnails()
+
+    @metrics.timed_callback
+    def add_asset(self, evt: GuiEvent) -> None:
         sel = self.layout.assets_list.value
         if sel not in self.layout.asset_items:
             return
         model: ObjectModel = self.layout.asset_items[sel]
-        parent_name = self.get_selected_parent()
-        self.controller.create_mesh(parent_name, model.path.resolve())
+        parent_name = self.get_selected_parent(evt)
+        name = self.controller.create_mesh(parent_name, model.path.resolve())
+        self._select_created(evt, name)
 
+    @metrics.timed_callback
     def add_objaverse_object(self, event: GuiEvent) -> None:
         sel = self.layout.objaverse_list.value
         if sel not in self.layout.objaverse_items:
@@ -214,49 +569,76 @@ class SceneEditor:
                 logger.error("Download failed for object %s", sel)
                 return
             self.layout.objaverse_items[sel] = ObjaverseItem(
-                uid=item.uid, name=item.name, path=mesh_path
+                uid=item.uid, name=item.name, path=mesh_path, label=item.label
             )
+            self.objaverse_catalog.set_paths({item.uid: mesh_path})
+            self.index_meshes_async()
 
         mesh_path = Path(mesh_path).resolve()
         mesh_path = convert_to_mujoco_mesh(mesh_path, out_ext=".obj")
 
         scale = self.layout.objaverse_scale.value
-        parent_name = self.get_selected_parent()
-        self.controller.create_mesh(parent_name, mesh_path, scale)
+        parent_name = self.get_selected_parent(event)
+        name = self.controller.create_mesh(parent_name, mesh_path, scale)
+        self._select_created(event, name)
 
+    @metrics.timed_callback
     def on_objaverse_item_change(self, _evt: GuiEvent) -> None:
         sel = self.layout.objaverse_list.value
         if sel not in self.layout.objaverse_items:
             return
         item: ObjaverseItem = self.layout.objaverse_items[sel]
-        self.layout.objaverse_scale.value = lookup_default_scale(
-            item,
-            cachier__overwrite_cache=True,  # pyright: ignore[reportCallIssue]
-        )
+        scale = lookup_default_scale(item, self.mesh_index)
+        slider = self.layout.objaverse_scale
+        slider.value = min(max(scale, slider.min), slider.max)
+        self.show_thumbnails()
 
-    def on_objaverse_scale_change(self, _evt: GuiEvent) -> None:
+    @metrics.timed_callback
+    def on_objaverse_scale_change(self, evt: GuiEvent) -> None:
         sel = self.layout.objaverse_list.value
-        if sel not in self.layout.objaverse_items:
+        if evt.client_id is None or sel not in self.layout.objaverse_items:
+            # set by the editor, e.g., the default scale of a newly selected item
             return
         item: ObjaverseItem = self.layout.objaverse_items[sel]
-        SCALE_OVERRIDES[item.uid] = self.layout.objaverse_scale.value
+        self.mesh_index.set_scale_override(item.uid, self.layout.objaverse_scale.value)
 
+    @metrics.timed_callback
     def on_objaverse_category_change(self, _evt: GuiEvent) -> None:
-        label = self.layout.objaverse_category_list.value
-        if label == "— all —":
-            obj_items = self.obj_inventory.list_by_labels(
-                labels=None, limit_per_label=50
-            )
-        else:
-            obj_items = self.obj_inventory.list_by_labels(
-                labels=[label], limit_per_label=50
-            )
-        self.layout.objaverse_items = {m.name: m for m in obj_items}
-        self.layout.update_objaverse_dropdown()
+        if self.layout.objaverse_category_list.value in (NO_SELECTION, LOADING):
+            return
+        self.show_objaverse_page()
+
+    @metrics.timed_callback
+    def on_objaverse_page_click(self, _evt: GuiEvent) -> None:
+        step = -1 if self.layout.objaverse_page_buttons.value == "◀" else 1
+        self.show_objaverse_page(self._objaverse_offset + step * OBJAVERSE_PAGE_SIZE)
 
+    @metrics.timed_callback
+    def analyze_scene(self, evt: GuiEvent) -> None:
+        from mujoco_scene_editor.scene_analysis import analyze_blueprints
+
+        notification = evt.client.add_notification(
+            title="Analyzing scene", body="Simulating the scene", loading=True
+        )
+        try:
+            report = analyze_blueprints(list(self.controller.state.blueprints.values()))
+        except Exception as e:
+            logger.error("Failed to analyze the scene: %s", e)
+            self.layout.analysis_markdown.content = f"Failed to compile the scene: {e}"
+            return
+        finally:
+            notification.remove()
+        self.layout.analysis_markdown.content = report.to_markdown()
+
+    @metrics.timed_callback
     def export_mujoco(self, evt: GuiEvent) -> None:
         out_path = Path(self.layout.export_path.value).expanduser()
-        self.controller.export_scene(out_path)
+        if self.layout.estimate_masses.value:
+            self.controller.export_scene(
+                out_path, density=self.layout.density.value, mesh_index=self.mesh_index
+            )
+        else:
+            self.controller.export_scene(out_path)
         evt.client.add_notification(
             "Exported",
             f"Model exported to {out_path}",
@@ -264,6 +646,7 @@ class SceneEditor:
             loading=False,
         )
 
+    @metrics.timed_callback
     def launch_mujoco_viewer(self, evt: GuiEvent) -> None:
         out_path = Path(self.layout.export_path.value).expanduser()
         out_path = out_path.with_suffix(".xml")
@@ -284,31 +667,41 @@ class SceneEditor:
         except Exception as e:
             logger.error("Failed to launch MuJoCo viewer: %s", e)
 
-    def add_camera(self, _evt: GuiEvent) -> None:
+    @metrics.timed_callback
+    def add_camera(self, evt: GuiEvent) -> None:
         camera_name = self.layout.camera_list.value
-        self.controller.create_camera(camera_name)
+        self._select_created(evt, self.controller.create_camera(camera_name))
 
-    def add_robot(self, _evt: GuiEvent) -> None:
+    @metrics.timed_callback
+    def add_robot(self, evt: GuiEvent) -> None:
         sel = self.layout.robot_list.value
-        self.controller.create_robot(sel)
+        self._select_created(evt, self.controller.create_robot(sel))
 
-    def update_element(self, _evt: GuiEvent) -> None:
-        sel = self.layout.element_list.value
-        color = self.layout.prop_color.value
-        opacity = self.layout.prop_opacity.value
+    @metrics.timed_callback
+    def update_element(self, session: ClientSession, _evt: GuiEvent) -> None:
+        sel = session.selection
+        color = session.prop_color.value
+        opacity = session.prop_opacity.value
 
         # TODO revise
-        if not self.layout.prop_box_dims.disabled:
-            dim = self.layout.prop_box_dims.value
+        if not session.prop_box_dims.disabled:
+            dim = session.prop_box_dims.value
             size = [dim[0] / 2.0, dim[1] / 2.0, dim[2] / 2.0]
-        elif not self.layout.prop_sphere_radius.disabled:
-            size = [self.layout.prop_sphere_radius.value, 0.0]
-        elif not self.layout.prop_cyl_radius.disabled:
+        elif not session.prop_sphere_radius.disabled:
+            size = [session.prop_sphere_radius.value, 0.0]
+        elif not session.prop_cyl_radius.disabled:
             size = [
-                self.layout.prop_cyl_radius.value,
-                self.layout.prop_cyl_height.value / 2.0,
+                session.prop_cyl_radius.value,
+                session.prop_cyl_height.value / 2.0,
             ]
         else:
             size = None
-        mass = self.layout.prop_element_mass.value
-        self.controller.update_element(sel, color, opacity, size=size, mass=mass)
+        mass = session.prop_element_mass.value
+        self.controller.update_element(
+            sel,
+            color,
+            opacity,
+            interaction=("properties", session.client_id, sel),
+            size=size,
+            mass=mass,
+        )
@@ -0,0 +1,199 @@
+"""
+Generation of MuJoCo scenes from natural-language prompts.
+
+Prompts are sent concurrently to an OpenAI-compatible chat endpoint, limited to
+a number of requests in flight. Responses are cached by a hash of the prompt
+and the model, so rerunning a corpus only queries new prompts. Each resulting
+XML is compiled with MuJoCo to check that it is valid.
+"""
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from mujoco_scene_editor.constants import DEFAULT_PROMPT_MODEL
+from mujoco_scene_editor.constants import PROMPT_CONCURRENCY
+from mujoco_scene_editor.utils import disk_cache
+
+logger = logging.getLogger(__name__)
+
+SCENE_PROMPT = """
+Generate a MuJoCo 3.3.7 XML. Here are some guidelines:
+- Don't use global tags for colors or other elements
+- Don't use textures/materials. Use a color instead assigned to each element
+- If the scene should contain a robot try match it first to an existing description in the robot_description package (https://github.com/robot-descriptions/robot_descriptions.py). If found copy the content.
+- For moving objects add a freejoint
+- There is no geom cone element
+- Avoid accelerometer and sensor tags
+Output the complete XML file. The scene is as follows:
+"""
+
+# Bump when the instructions change so that cached responses are not reused
+PROMPT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class PromptResult:
+    name: str
+    latency_s: float
+    is_cached: bool = False
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+
+def extract_mjcf(content: str) -> Optional[str]:
+    match = re.search(r"<mujoco\b[^>]*>.*?</mujoco>", content, flags=re.DOTALL)
+    return match.group(0) if match else None
+
+
+def validate_mjcf(xml: str) -> Optional[str]:
+    """
+    Compiles the model. Returns the error message if that fails.
+    """
+    import mujoco
+
+    try:
+        mujoco.MjModel.from_xml_string(xml)
+    except Exception as e:
+        return str(e).strip() or type(e).__name__
+    return None
+
+
+def _prompt_from_text(text: str) -> str:
+    # Logged requests, e.g., in examples/prompt, end with the scene description
+    if text.lstrip().startswith("'json_data'"):
+        texts = re.findall(r"""'text':\s*(['"])(.*?)\1\s*}""", text, flags=re.DOTALL)
+        if texts:
+            text = texts[-1][1]
+    return " ".join(text.split())
+
+
+def load_prompts(path: Path) -> Dict[str, str]:
+    """
+    Reads the prompts of a directory, one per ``.txt`` file and named after
+    it, or of a file with one prompt per line.
+    """
+    path = Path(path).expanduser()
+    if path.is_dir():
+        prompts = {
+            p.stem: _prompt_from_text(p.read_text(encoding="utf-8"))
+            for p in sorted(path.glob("*.txt"))
+        }
+    else:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        prompts = {
+            f"{path.stem}_{i:03d}": " ".join(line.split())
+            for i, line in enumerate(line for line in lines if line.strip())
+        }
+    return {name: prompt for name, prompt in prompts.items() if prompt}
+
+
+def response_key(prompt: str, model: str) -> str:
+    digest = hashlib.sha256(f"{SCENE_PROMPT}{prompt}".encode("utf-8")).hexdigest()
+    return f"{model}/{digest}"
+
+
+async def _query(client, prompt: str, model: str) -> str:
+    response = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": f"{SCENE_PROMPT}{prompt}"}],
+    )
+    return response.choices[0].message.content or ""
+
+
+async def _generate(
+    client,
+    semaphore: asyncio.Semaphore,
+    name: str,
+    prompt: str,
+    model: str,
+    out_dir: Path,
+    use_cache: bool,
+) -> PromptResult:
+    start_time = time.perf_counter()
+    cache = disk_cache.get_cache()
+    key = response_key(prompt, model)
+    is_cached, content = False, None
+    if use_cache:
+        is_cached, content = cache.get("prompt_responses", key, PROMPT_VERSION)
+    if not is_cached:
+        try:
+            async with semaphore:
+                content = await _query(client, prompt, model)
+        except Exception as e:
+            logger.warning("Request for %s failed: %s", name, e)
+            return PromptResult(
+                name, time.perf_counter() - start_time, error=f"request failed: {e}"
+            )
+        cache.put(
+            "prompt_responses",
+            key,
+            content,
+            PROMPT_VERSION,
+            compute_s=time.perf_counter() - start_time,
+        )
+
+    xml = extract_mjcf(content)
+    if xml is None:
+        return PromptResult(
+            name,
+            time.perf_counter() - start_time,
+            is_cached,
+            error="no MuJoCo XML in the response",
+        )
+    output_path = out_dir / f"{name}.xml"
+    output_path.write_text(xml, encoding="utf-8")
+    error = await asyncio.to_thread(validate_mjcf, xml)
+    return PromptResult(
+        name, time.perf_counter() - start_time, is_cached, output_path, error
+    )
+
+
+async def generate_scenes(
+    prompts: Dict[str, str],
+    out_dir: Path,
+    model: str = DEFAULT_PROMPT_MODEL,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    concurrency: int = PROMPT_CONCURRENCY,
+    use_cache: bool = True,
+    on_result: Optional[Callable[[PromptResult], None]] = None,
+) -> List[PromptResult]:
+    """
+    Generates a scene per prompt and writes it to ``out_dir/<name>.xml``. At
+    most ``concurrency`` requests are in flight. ``on_result`` is called as
+    soon as a scene is done. Results are returned in the order of the prompts.
+    """
+    from openai import AsyncOpenAI
+
+    out_dir = Path(out_dir).expanduser()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if base_url and not api_key:
+        # local servers usually do not check the key, but the client needs one
+        api_key = "unused"
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncOpenAI(base_url=base_url, api_key=api_key) as client:
+
+        async def run(name: str, prompt: str) -> PromptResult:
+            result = await _generate(
+                client, semaphore, name, prompt, model, out_dir, use_cache
+            )
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(run(n, p) for n, p in prompts.items())))
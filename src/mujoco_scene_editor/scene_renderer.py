@@ -1,16 +1,24 @@
 from typing import Tuple
+from typing import Callable
 from typing import Dict
 from typing import Any
 from typing import Optional
 from typing import List
+from typing import Sequence
 
 import logging
 
+import contextlib
 import math
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from functools import singledispatchmethod
 
+import numpy as np
 import trimesh
 
 from viser import SceneNodeHandle
@@ -28,51 +36,251 @@ from mujoco_scene_editor.utils.simple_ik import SimpleIK
 
 
 from mujoco_scene_editor.gui.robot_node import RobotNode
+from mujoco_scene_editor.gui.client_session import ClientSession
+from mujoco_scene_editor import metrics
 from mujoco_scene_editor.utils.mj_urdf_map import mj_to_urdf_description_name
+from mujoco_scene_editor.utils import transforms
 from mujoco_scene_editor.utils import viser_utils
+from mujoco_scene_editor.utils.rate_limiter import RateLimiter
 from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.constants import POSE_UPDATE_RATE_HZ
+from mujoco_scene_editor.constants import STREAM_PROGRESS_RATE_HZ
 
 
 logger = logging.getLogger(__name__)
 
 
+# Rotation by pi around y
+CAMERA_FLIP_WXYZ = (0.0, 0.0, 1.0, 0.0)
+
+# Number of threads to parse mesh files while streaming
+MESH_LOADER_THREADS = 4
+
+# Element type shown and filtered by in the outliner
+ELEMENT_KIND_BY_BLUEPRINT = {
+    BlueprintGroup: "group",
+    GeomBlueprint: "geom",
+    MeshBlueprint: "mesh",
+    RobotBlueprint: "robot",
+    GripperBlueprint: "gripper",
+    CameraBlueprint: "camera",
+}
+
+
 def _is_path_or_descendant(path: str, root: str) -> bool:
     return path == root or path.startswith(f"{root}/")
 
 
+def _global_position(bp: Blueprint, bp_by_path: Dict[str, Blueprint]) -> np.ndarray:
+    transform = np.identity(4)
+    path = bp.path
+    while path:
+        current = bp_by_path.get(path, None)
+        if pose := getattr(current, "pose", None):
+            transform = pose.matrix @ transform
+        path = viser_utils.parent_name(path)
+    return transform[:3, 3]
+
+
+def _stream_priority(
+    bp: Blueprint,
+    bp_by_path: Dict[str, Blueprint],
+    focus: Tuple[float, float, float],
+) -> Tuple[int, float]:
+    # Grippers have to exist before the robot they are attached to.
+    is_attached_robot = isinstance(bp, RobotBlueprint) and bool(bp.attachment)
+    distance = float(np.linalg.norm(_global_position(bp, bp_by_path) - focus))
+    return int(is_attached_robot), distance
+
+
 class ViserSceneRenderer:
     def __init__(self, layout) -> None:
         self.name_to_node: Dict[str, SceneNodeHandle] = {}  #
         self.layout = layout
+        self.pose_rate_hz = POSE_UPDATE_RATE_HZ
+        # incremented on reset to cancel streaming from a previous render
+        self._generation = 0
+        # serializes changes of the nodes by the GUI and the streaming thread
+        self._lock = threading.RLock()
+        # outliner updates are deferred per thread, so that streaming does not
+        # hold back the updates of edits
+        self._local = threading.local()
+
+    @property
+    def _defer_outliner_updates(self) -> bool:
+        """
+        While set, the outliners are updated once at the end.
+        """
+        return getattr(self._local, "defer_outliner_updates", False)
+
+    @_defer_outliner_updates.setter
+    def _defer_outliner_updates(self, value: bool) -> None:
+        self._local.defer_outliner_updates = value
 
+    @metrics.timed()
     def render_from_state(self, blueprints: List[Blueprint]):
         """
         TODO can we batch this?
         """
-        self.reset()
+        with self._batched_outliner_updates():
+            # keeps the selection of the clients if the element still exists
+            self.reset()
+            self._add_all(blueprints)
+        self._restore_selections()
+
+    @metrics.timed()
+    def add_many(self, blueprints: List[Blueprint]) -> None:
+        with self.layout.server.atomic(), self._batched_outliner_updates():
+            self._add_all(blueprints)
+
+    def _add_all(self, blueprints: List[Blueprint]) -> None:
+        """
+        Adds parents before children and robots after the grippers they hold.
+        """
         blueprints.sort(key=lambda bp: bp.path)
-        gripper_bps: Dict[str, GripperBlueprint] = {}
+        gripper_bps: Dict[str, GripperBlueprint] = {
+            bp.path: bp for bp in blueprints if isinstance(bp, GripperBlueprint)
+        }
         for bp in blueprints:
             if isinstance(bp, RobotBlueprint) and bp.attachment:
                 continue
-            if isinstance(bp, GripperBlueprint):
-                gripper_bps[bp.path] = bp
             self.add(bp)
 
         for bp in blueprints:
             if isinstance(bp, RobotBlueprint) and bp.attachment:
                 self.add_robot(bp, gripper_bps.get(bp.attachment.gripper_path))
 
+    @metrics.timed()
+    def render_progressive(
+        self,
+        blueprints: List[Blueprint],
+        focus: Tuple[float, float, float] = (0.0, 0.0, 0.0),
+        is_current: Optional[Callable[[Blueprint], bool]] = None,
+    ) -> threading.Thread:
+        """
+        Renders groups, cameras and primitive geoms right away and streams
+        meshes and robots in on a background thread, closest to ``focus`` first.
+
+        A later reset, e.g., caused by undo or redo, cancels the stream.
+        Blueprints for which ``is_current`` returns false, e.g., because they
+        were removed in the meantime, are skipped.
+        """
+        blueprints = sorted(blueprints, key=lambda bp: bp.path)
+        deferred: List[Blueprint] = []
+        with self.layout.server.atomic(), self._batched_outliner_updates(), self._lock:
+            self.reset()
+            generation = self._generation
+            for bp in blueprints:
+                if isinstance(bp, (MeshBlueprint, RobotBlueprint, GripperBlueprint)):
+                    deferred.append(bp)
+                else:
+                    self.add(bp)
+        self._restore_selections()
+
+        bp_by_path = {bp.path: bp for bp in blueprints}
+        deferred.sort(key=lambda bp: _stream_priority(bp, bp_by_path, focus))
+
+        thread = threading.Thread(
+            target=self._stream_nodes,
+            args=(deferred, bp_by_path, generation, is_current),
+            name="scene-stream",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _stream_nodes(
+        self,
+        blueprints: List[Blueprint],
+        bp_by_path: Dict[str, Blueprint],
+        generation: int,
+        is_current: Optional[Callable[[Blueprint], bool]] = None,
+    ) -> None:
+        total = len(blueprints)
+        if not total:
+            return
+        mesh_bps = [bp for bp in blueprints if isinstance(bp, MeshBlueprint)]
+        futures: Dict[str, Future] = {}
+        start_time = time.perf_counter()
+        progress = RateLimiter(
+            lambda i: self.layout.set_progress(
+                "Loading scene", f"Loaded {i} of {total} elements"
+            ),
+            STREAM_PROGRESS_RATE_HZ,
+            "stream_progress",
+        )
+
+        # The outliners are updated once the stream is done or cancelled
+        with ThreadPoolExecutor(max_workers=MESH_LOADER_THREADS) as pool:
+            with self._batched_outliner_updates():
+
+                def prefetch(index: int) -> None:
+                    for bp in mesh_bps[index : index + 2 * MESH_LOADER_THREADS]:
+                        if bp.path not in futures:
+                            futures[bp.path] = pool.submit(self._load_mesh, bp)
+
+                num_meshes = 0
+                for i, bp in enumerate(blueprints):
+                    if generation != self._generation:
+                        logger.info(
+                            "Scene changed. Cancelling streaming after %d of %d.",
+                            i,
+                            total,
+                        )
+                        for future in futures.values():
+                            future.cancel()
+                        progress.cancel()
+                        self.layout.set_progress(None)
+                        return
+
+                    progress.submit(i)
+                    try:
+                        tri = None
+                        if isinstance(bp, MeshBlueprint):
+                            prefetch(num_meshes)
+                            num_meshes += 1
+                            tri = futures.pop(bp.path).result()
+                        # Nodes are only added if the scene was not reset and the
+                        # element was neither removed nor re-added in the meantime
+                        with self._lock:
+                            if generation != self._generation:
+                                continue
+                            if bp.path in self.name_to_node or (
+                                is_current is not None and not is_current(bp)
+                            ):
+                                logger.debug("Skipping outdated blueprint %s", bp.path)
+                                continue
+                            if tri is not None:
+                                self.register_node(self._add_mesh_node(bp, tri), "mesh")
+                            elif isinstance(bp, RobotBlueprint) and bp.attachment:
+                                gripper_bp = bp_by_path.get(
+                                    bp.attachment.gripper_path, None
+                                )
+                                self.add_robot(bp, gripper_bp)
+                            else:
+                                self.add(bp)
+                    except Exception:
+                        logger.exception("Unable to stream blueprint %s", bp.path)
+
+        progress.cancel()
+        self.layout.set_progress(None)
+        self._restore_selections()
+        logger.info(
+            "Streamed %d elements in %.2fs", total, time.perf_counter() - start_time
+        )
+
+    @metrics.timed()
     def add(self, bp: Blueprint):
         logger.debug("Adding blueprint %s", bp)
         node = self._create_node(bp)
-        self.register_node(node)
+        self.register_node(node, ELEMENT_KIND_BY_BLUEPRINT.get(type(bp), ""))
         return node
 
     def replace(self, bp: Blueprint) -> SceneNodeHandle:
-        if node := self.name_to_node.pop(bp.path, None):
-            node.remove()
-        return self.add(bp)
+        with self._lock:
+            if node := self.name_to_node.pop(bp.path, None):
+                node.remove()
+            return self.add(bp)
 
     @singledispatchmethod
     def _create_node(self, bp: Blueprint) -> SceneNodeHandle:
@@ -96,13 +304,8 @@ class ViserSceneRenderer:
         fx = bp.intrinsics[0][0]
         fov = 2.0 * math.atan2(bp.width / 2.0, fx)
         aspect_ratio = bp.width / bp.height
-        from scipy.spatial.transform import Rotation as R
-
-        xyzw = viser_utils.wxyz_to_xyzw(wxyz)
-        rotated_xyzw = (
-            R.from_quat(xyzw) * R.from_euler("XYZ", [0, 3.141592, 0.0])
-        ).as_quat()
-        rotated_wxyz = viser_utils.xyzw_to_wxyz(rotated_xyzw)
+        # viser frustums look along +z, MuJoCo cameras along -z
+        rotated_wxyz = transforms.quat_multiply(wxyz, CAMERA_FLIP_WXYZ)
         node = self.layout.server.scene.add_camera_frustum(
             bp.path, fov=fov, aspect=aspect_ratio, position=position, wxyz=rotated_wxyz
         )
@@ -203,12 +406,19 @@ class ViserSceneRenderer:
 
     @_create_node.register
     def _create_mesh_node(self, bp: MeshBlueprint) -> SceneNodeHandle:
-        position, wxyz = viser_utils.pose_to_gui(bp)
+        return self._add_mesh_node(bp, self._load_mesh(bp))
+
+    def _load_mesh(self, bp: MeshBlueprint) -> trimesh.Trimesh:
         tri = trimesh.load_mesh(str(Path(bp.mesh_path).resolve()))
         scale = getattr(bp, "scale", None)
         if scale is not None:
             tri.apply_scale(scale)
+        return tri
 
+    def _add_mesh_node(
+        self, bp: MeshBlueprint, tri: trimesh.Trimesh
+    ) -> SceneNodeHandle:
+        position, wxyz = viser_utils.pose_to_gui(bp)
         node = self.layout.server.scene.add_mesh_trimesh(
             bp.path, mesh=tri, wxyz=wxyz, position=position
         )
@@ -228,12 +438,17 @@ class ViserSceneRenderer:
             desc = f"{desc}_{variant_name}"
         urdf_desc_name = mj_to_urdf_description_name(desc)
         robot_node = RobotNode(
-            self.layout, bp.path, urdf_desc_name, position, wxyz, create_eef_gizmo=False
+            self.layout,
+            bp.path,
+            urdf_desc_name,
+            position,
+            wxyz,
+            create_eef_gizmo=False,
+            pose_rate_hz=self.pose_rate_hz,
         )
 
         if bp.default_joint_positions:
-            for slider, q in zip(robot_node.slider_handles, bp.default_joint_positions):
-                slider.value = q
+            robot_node.set_joint_positions(bp.default_joint_positions)
         return robot_node
 
     @_create_node.register
@@ -252,14 +467,20 @@ class ViserSceneRenderer:
             desc = f"{desc}_{variant_name}"
         urdf_desc_name = mj_to_urdf_description_name(desc)
         robot_node = RobotNode(
-            self.layout, bp.path, urdf_desc_name, position, wxyz, create_eef_gizmo=True
+            self.layout,
+            bp.path,
+            urdf_desc_name,
+            position,
+            wxyz,
+            create_eef_gizmo=True,
+            pose_rate_hz=self.pose_rate_hz,
         )
 
         if bp.default_joint_positions:
-            for slider, q in zip(robot_node.slider_handles, bp.default_joint_positions):
-                slider.value = q
+            robot_node.set_joint_positions(bp.default_joint_positions)
         return robot_node
 
+    @metrics.timed()
     def add_robot(
         self, bp: RobotBlueprint, gripper_bp: Optional[GripperBlueprint] = None
     ):
@@ -283,6 +504,7 @@ class ViserSceneRenderer:
             position,
             wxyz,
             create_eef_gizmo=has_gripper,
+            pose_rate_hz=self.pose_rate_hz,
         )
 
         if has_gripper:
@@ -291,58 +513,93 @@ class ViserSceneRenderer:
             robot_node.eef_gizmo.position = eef_position
             robot_node.eef_gizmo.wxyz = eef_wxyz
 
+            def solve_ik(position, wxyz) -> None:
+                joint_positions = solver.set_target(position, wxyz)
+                with self.layout.server.atomic():
+                    robot_node.set_joint_positions(joint_positions)
+
+            ik_limiter = robot_node.rate_limited(solve_ik, "eef_ik")
+
             @robot_node.eef_gizmo.on_update
             def _(_e):
-                joint_positions = solver.set_target(
+                ik_limiter.submit(
                     robot_node.eef_gizmo.position, robot_node.eef_gizmo.wxyz
                 )
-                joint_positions = joint_positions[: len(robot_node.slider_handles)]
-                robot_node.current_joint_positions = joint_positions
-                for slider, q in zip(robot_node.slider_handles, joint_positions):
-                    slider.value = q
 
-            _(None)
+            robot_node.eef_gizmo.on_drag_end(lambda _e: ik_limiter.flush())
+
+            solve_ik(eef_position, eef_wxyz)
 
             if gripper_node := self.name_to_node.get(gripper_bp.path, None):
                 robot_node.attach_gripper_node(gripper_node, bp.attachment)
             else:
                 logger.error("Unable to find gripper node. %s", bp.attachment)
-        self.register_node(robot_node)
+        self.register_node(robot_node, "robot")
 
         return robot_node
 
-    def register_node(self, node: SceneNodeHandle):
+    def register_node(self, node: SceneNodeHandle, kind: str = ""):
         node_name = node.name
-        self.name_to_node[node_name] = node
+        with self._lock:
+            self.name_to_node[node_name] = node
+            self.layout.scene_index.add(node_name, kind)
 
-        self.update_elements_dropdown(node_name)
+        if not self._defer_outliner_updates:
+            self.update_outliners()
 
         @node.on_click
-        def _(_evt) -> None:
-            if self.layout.allow_mouse_select.value:
-                self.layout.element_list.value = node.name
+        def _(evt) -> None:
+            if not self.layout.allow_mouse_select.value:
+                return
+            if session := self.layout.get_session(evt.client_id):
+                session.select(node.name)
+
+    def set_pose_rate(self, rate_hz: float) -> None:
+        self.pose_rate_hz = rate_hz
+        with self._lock:
+            nodes = list(self.name_to_node.values())
+        for node in nodes:
+            if isinstance(node, RobotNode):
+                node.set_pose_rate(rate_hz)
 
     def get_joint_positions(self) -> Dict[str, List[float]]:
         all_joint_positions = {}
-        for name, node in self.name_to_node.items():
+        with self._lock:
+            nodes = list(self.name_to_node.items())
+        for name, node in nodes:
             if isinstance(node, RobotNode):
                 all_joint_positions[name] = node.get_joint_positions()
         return all_joint_positions
 
-    def update_elements_dropdown(self, selected_value: Optional[str] = None) -> None:
-        previous_value = self.layout.element_list.value
-        names = (NO_SELECTION,) + tuple(self.name_to_node.keys())
-        self.layout.element_list.options = names
-        if selected_value:
-            self.layout.element_list.value = selected_value
-        elif previous_value not in names:
-            self.layout.element_list.value = names[0]
+    def update_outliners(self) -> None:
+        self.layout.refresh_outliners()
 
-    def node_to_global_pose(self, node_name: str) -> Tuple[Any, Any]:
-        import numpy as np
-        from scipy.spatial.transform import Rotation as R
+    @contextlib.contextmanager
+    def _batched_outliner_updates(self):
+        """
+        Updates the outliners once instead of once per node.
+        """
+        if self._defer_outliner_updates:
+            yield
+            return
+        self._defer_outliner_updates = True
+        try:
+            yield
+        finally:
+            self._defer_outliner_updates = False
+            self.update_outliners()
+
+    def _restore_selections(self) -> None:
+        """
+        Attaches the gizmos of all clients to the re-created nodes.
+        """
+        for session in list(self.layout.sessions.values()):
+            if session.selection in self.name_to_node:
+                self.on_select(session.selection, session)
 
-        global_pose = np.identity(4)
+    def node_to_global_pose(self, node_name: str) -> Tuple[Any, Any]:
+        positions = []
+        wxyzs = []
 
         prefix = []
         for n in node_name.split("/"):
@@ -354,19 +611,17 @@ class ViserSceneRenderer:
             if current_node is None:
                 logger.warning("Unable to find node with path %s", current_node_path)
                 continue
-            position, wxyz = current_node.position, current_node.wxyz
-            current_transform = np.identity(4)
-            current_transform[:3, :3] = R.from_quat(
-                viser_utils.wxyz_to_xyzw(wxyz)
-            ).as_matrix()
-            current_transform[:3, 3] = position
-            global_pose = np.dot(global_pose, current_transform)
-
-        position = global_pose[:3, 3]
-        xyzw = R.from_matrix(global_pose[:3, :3]).as_quat()
+            positions.append(current_node.position)
+            wxyzs.append(current_node.wxyz)
 
-        return position, viser_utils.xyzw_to_wxyz(xyzw)
+        if not positions:
+            return np.zeros(3), np.array([1.0, 0.0, 0.0, 0.0])
+        global_pose = transforms.compose_chain(
+            transforms.pose_to_matrix(positions, wxyzs)
+        )
+        return transforms.matrix_to_pose(global_pose)
 
+    @metrics.timed()
     def update_pose(
         self,
         node_name: str,
@@ -379,68 +634,122 @@ class ViserSceneRenderer:
         node.wxyz = wxyz
         node.position = position
 
-        # also update the gizmo since we don't know who called this
-        self.layout.gizmo.position = position
-        self.layout.gizmo.wxyz = wxyz
-
-        global_position, global_wxyz = self.node_to_global_pose(node_name)
-
-        # TODO this is not the global position. We need to get the global position somehow
-        self.layout.transform.set_transform(position, wxyz)
+        # also update the gizmos of all clients that have the node selected since
+        # we don't know who called this
+        for session in list(self.layout.sessions.values()):
+            if session.selection != node_name:
+                continue
+            if session.gizmo:
+                session.gizmo.position = position
+                session.gizmo.wxyz = wxyz
+            # TODO this is not the global position. We need to get the global position somehow
+            session.transform.set_transform(position, wxyz)
+
+    @metrics.timed()
+    def update_poses(
+        self,
+        poses: Dict[
+            str, Tuple[Tuple[float, float, float], Tuple[float, float, float, float]]
+        ],
+    ) -> None:
+        with self.layout.server.atomic():
+            for node_name, (position, wxyz) in poses.items():
+                self.update_pose(node_name, position, wxyz)
+
+    @metrics.timed()
+    def remove_many(self, node_names: Sequence[str]) -> None:
+        with self.layout.server.atomic(), self._batched_outliner_updates(), self._lock:
+            for node_name in node_names:
+                self.remove(node_name)
+
+    @metrics.timed()
+    def replace_subtrees(
+        self, node_names: Sequence[str], blueprints: Sequence[Blueprint]
+    ) -> None:
+        """
+        Removes the nodes with their descendants and adds ``blueprints``, e.g.,
+        after the nodes were moved to another parent.
+        """
+        with self.layout.server.atomic(), self._batched_outliner_updates(), self._lock:
+            for node_name in node_names:
+                self.remove(node_name)
+            for bp in sorted(blueprints, key=lambda bp: bp.path):
+                self.add(bp)
 
+    @metrics.timed()
     def remove(self, node_name: str) -> None:
-        for name in list(sorted(self.name_to_node.keys())):
-            if _is_path_or_descendant(name, node_name):
-                node = self.name_to_node.pop(name)
-                node.remove()
+        with self._lock:
+            for name in list(sorted(self.name_to_node.keys())):
+                if _is_path_or_descendant(name, node_name):
+                    node = self.name_to_node.pop(name)
+                    node.remove()
+            self.layout.scene_index.remove(node_name)
 
-        if self.layout.gizmo:
-            self.layout.gizmo.remove()
-            self.layout.gizmo = None
+        for session in list(self.layout.sessions.values()):
+            if _is_path_or_descendant(session.selection, node_name):
+                session.clear_selection()
 
-        self.update_elements_dropdown()
+        if not self._defer_outliner_updates:
+            self.update_outliners()
 
+    @metrics.timed()
     def reset(self) -> None:
-        for _name, node in self.name_to_node.items():
-            node.remove()
-        self.name_to_node.clear()
+        with self._lock:
+            self._generation += 1
+            for _name, node in self.name_to_node.items():
+                node.remove()
+            self.name_to_node.clear()
+            self.layout.scene_index.clear()
 
-        self.update_elements_dropdown()
+        for session in list(self.layout.sessions.values()):
+            session.clear_selection()
 
-    def on_select(self, node_name: str) -> None:
+        if not self._defer_outliner_updates:
+            self.update_outliners()
+
+    @metrics.timed()
+    def on_select(self, node_name: str, session: ClientSession) -> None:
         """
         TODO adjust the scale of the gizmo to the object size.
         """
-        # Remove previous gizmo if any
-
         if node_name not in self.name_to_node:
-            logger.warning("Unable to select node with name %s", node_name)
+            session.clear_selection()
+            session.disable_all_properties_gui_elements()
+            if node_name != NO_SELECTION:
+                logger.warning("Unable to select node with name %s", node_name)
             return
 
-        self.configure_properties_panel(node_name)
-        node = self.name_to_node[node_name]
-        self.layout.on_select(node)
+        with session.client.atomic():
+            self.configure_properties_panel(node_name, session)
+            session.on_select(self.name_to_node[node_name])
 
-    def configure_properties_panel(self, node_name: str):
-        self.layout.disable_all_properties_gui_elements()
+    def configure_properties_panel(self, node_name: str, session: ClientSession):
+        session.disable_all_properties_gui_elements()
         node = self.name_to_node[node_name]
         if hasattr(node, "color") and hasattr(node, "opacity"):
-            self.layout.prop_color.value = node.color
-            self.layout.prop_opacity.value = node.opacity
-            self.layout.prop_color.disabled = False
-            self.layout.prop_opacity.disabled = False
+            session.prop_color.value = node.color
+            session.prop_opacity.value = node.opacity
+            session.prop_color.disabled = False
+            session.prop_opacity.disabled = False
         if hasattr(node, "dimensions"):
-            self.layout.prop_box_dims.value = node.dimensions
-            self.layout.prop_box_dims.disabled = False
+            session.prop_box_dims.value = node.dimensions
+            session.prop_box_dims.disabled = False
         elif hasattr(node, "height"):
-            self.layout.prop_cyl_radius.value = node.radius
-            self.layout.prop_cyl_height.value = node.height
-            self.layout.prop_cyl_radius.disabled = False
-            self.layout.prop_cyl_height.disabled = False
+            session.prop_cyl_radius.value = node.radius
+            session.prop_cyl_height.value = node.height
+            session.prop_cyl_radius.disabled = False
+            session.prop_cyl_height.disabled = False
         elif hasattr(node, "radius"):
-            self.layout.prop_sphere_radius.value = node.radius
-            self.layout.prop_sphere_radius.disabled = False
+            session.prop_sphere_radius.value = node.radius
+            session.prop_sphere_radius.disabled = False
+
+    @metrics.timed()
+    def update_elements(self, node_names: Sequence[str], color, opacity, **kwargs):
+        with self.layout.server.atomic():
+            for node_name in node_names:
+                self.update_element(node_name, color, opacity, **kwargs)
 
+    @metrics.timed()
     def update_element(self, node_name: str, color, opacity, **kwargs):
         if node_name not in self.name_to_node:
             return
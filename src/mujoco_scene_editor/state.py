@@ -1,12 +1,26 @@
+from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Sequence
 
-from copy import deepcopy
+from contextlib import contextmanager
+from dataclasses import fields
 from dataclasses import replace
 import logging
 
+import numpy as np
+
 from robits.sim.blueprints import Blueprint
 from robits.sim.blueprints import GripperBlueprint
+from robits.sim.blueprints import Pose
+from robits.sim.blueprints import RobotBlueprint
+
+from mujoco_scene_editor.history import History
+from mujoco_scene_editor.history import HistoryEntry
+from mujoco_scene_editor.journal import Journal
+from mujoco_scene_editor.utils import transforms
 
 
 logger = logging.getLogger(__name__)
@@ -16,12 +30,34 @@ def _is_path_or_descendant(path: str, root: str) -> bool:
     return path == root or path.startswith(f"{root}/")
 
 
+def top_level_paths(paths: Sequence[str]) -> List[str]:
+    """
+    Returns the sorted paths without the ones that are descendants of another.
+    """
+    path_set = set(paths)
+
+    def has_ancestor(path: str) -> bool:
+        parent = path.rsplit("/", maxsplit=1)[0]
+        while parent:
+            if parent in path_set:
+                return True
+            parent = parent.rsplit("/", maxsplit=1)[0]
+        return False
+
+    return sorted(p for p in path_set if not has_ancestor(p))
+
+
 class State:
-    def __init__(self):
+    def __init__(self, keep_history: bool = True, history: Optional[History] = None):
         self.blueprints: Dict[str, Blueprint] = {}
-        self.history_past: List[Dict[str, Blueprint]] = []
-        self.history_future: List[Dict[str, Blueprint]] = []
+        # Snapshots for undo and redo are only taken if set
+        self.keep_history = keep_history
+        self.history = history if history is not None else History()
+        # Scene at the begin of each open transaction, innermost last
+        self._transactions: List[Dict[str, Blueprint]] = []
         self._seq = 0
+        # Records every change for crash recovery if set
+        self.journal: Optional[Journal] = None
 
     def sync_seq_from_blueprints(self) -> None:
         max_suffix = -1
@@ -39,59 +75,225 @@ class State:
         else:
             self._seq = len(self.blueprints)
 
-    def create_snapshot(self) -> Dict[str, Blueprint]:
-        return deepcopy(self.blueprints)
+    @property
+    def history_past(self) -> List[HistoryEntry]:
+        return self.history.past
+
+    @property
+    def history_future(self) -> List[HistoryEntry]:
+        return self.history.future
+
+    def _record_scene(self) -> None:
+        if self.journal:
+            self.journal.record("scene", blueprints=list(self.blueprints.values()))
+
+    def load(self, blueprints: List[Blueprint]) -> None:
+        """
+        Replaces the scene and clears the history.
+        """
+        self.blueprints = {bp.path: bp for bp in blueprints}
+        self.sync_seq_from_blueprints()
+        self.history.clear()
+        self._record_scene()
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self._transactions)
+
+    def begin(self) -> None:
+        """
+        Starts a transaction. Transactions can be nested. The edits until the
+        outermost commit are recorded as a single history step.
+        """
+        self._transactions.append(dict(self.blueprints))
+
+    def commit(self) -> None:
+        snapshot = self._transactions.pop()
+        if self._transactions or not self.keep_history:
+            return
+        if snapshot.keys() != self.blueprints.keys() or any(
+            self.blueprints[n] is not bp for n, bp in snapshot.items()
+        ):
+            self.history.push(snapshot)
+
+    def abort(self) -> None:
+        """
+        Restores the scene from the begin of the innermost transaction.
+        """
+        self.blueprints = self._transactions.pop()
+        self._record_scene()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Commits the enclosed edits or aborts them on an exception.
+        """
+        self.begin()
+        try:
+            yield
+        except BaseException:
+            self.abort()
+            raise
+        self.commit()
 
     def push_state_to_history(self) -> None:
-        self.history_past.append(self.create_snapshot())
-        self.history_future.clear()
+        if not self.keep_history or self._transactions:
+            return
+        self.history.push(self.blueprints)
 
     def add(self, bp: Blueprint) -> None:
         self.push_state_to_history()
         self.blueprints[bp.path] = bp
         self._seq += 1
+        if self.journal:
+            self.journal.record("put", bp=bp)
+
+    def add_many(self, bps: Sequence[Blueprint]) -> None:
+        """
+        Adds the blueprints as a single history step.
+        """
+        if not bps:
+            return
+        self.push_state_to_history()
+        for bp in bps:
+            self.blueprints[bp.path] = bp
+            if self.journal:
+                self.journal.record("put", bp=bp)
+        self._seq += len(bps)
 
     def remove(self, bp_name: str) -> None:
-        if bp_name not in self.blueprints:
-            logger.error("Blueprint not found for removal: %s", bp_name)
+        self.remove_many([bp_name])
+
+    def remove_many(self, bp_names: Sequence[str]) -> None:
+        """
+        Removes the blueprints and their descendants as a single history step.
+        """
+        for n in bp_names:
+            if n not in self.blueprints:
+                logger.error("Blueprint not found for removal: %s", n)
+        bp_names = [n for n in top_level_paths(bp_names) if n in self.blueprints]
+        if not bp_names:
             return
         self.push_state_to_history()
-        for n in list(sorted(self.blueprints.keys())):
-            if _is_path_or_descendant(n, bp_name):
-                self.blueprints.pop(n)
+        for bp_name in bp_names:
+            for n in list(sorted(self.blueprints.keys())):
+                if _is_path_or_descendant(n, bp_name):
+                    self.blueprints.pop(n)
+            if self.journal:
+                self.journal.record("remove", name=bp_name)
 
     def update(self, bp_name: str, **kwargs) -> None:
-        old = self.blueprints.get(bp_name, None)
-        if old is None:
-            logger.error("Blueprint %s not found for update: %s", bp_name, kwargs)
-            return
-        if isinstance(old, GripperBlueprint):
-            logger.info("Not implemented yet")
+        self.update_many({bp_name: kwargs})
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Updates the fields of several blueprints as a single history step.
+        """
+        valid_updates = {}
+        for bp_name, kwargs in updates.items():
+            old = self.blueprints.get(bp_name, None)
+            if old is None:
+                logger.error("Blueprint %s not found for update: %s", bp_name, kwargs)
+            elif isinstance(old, GripperBlueprint):
+                logger.info("Not implemented yet")
+            else:
+                valid_updates[bp_name] = kwargs
+        if not valid_updates:
             return
         self.push_state_to_history()
-        self.blueprints[bp_name] = replace(old, **kwargs)
+        for bp_name, kwargs in valid_updates.items():
+            self.blueprints[bp_name] = replace(self.blueprints[bp_name], **kwargs)
+            if self.journal:
+                self.journal.record("put", bp=self.blueprints[bp_name])
+
+    def global_matrix(self, bp_name: str) -> np.ndarray:
+        """
+        Returns the transformation of ``bp_name`` relative to the world.
+        """
+        matrix = np.identity(4)
+        prefix = ""
+        for part in bp_name.strip("/").split("/"):
+            prefix = f"{prefix}/{part}"
+            pose = getattr(self.blueprints.get(prefix, None), "pose", None)
+            if pose is not None:
+                matrix = matrix @ pose.matrix
+        return matrix
+
+    def reparent(self, bp_names: Sequence[str], parent_name: str) -> Dict[str, str]:
+        """
+        Moves the blueprints and their descendants below ``parent_name`` as a
+        single history step. The elements keep their placement in the world.
+        Robots and grippers are not moved.
+
+        Returns the new name of each moved blueprint.
+        """
+        parent_matrix = (
+            self.global_matrix(parent_name) if parent_name else np.identity(4)
+        )
+        moves: Dict[str, str] = {}
+        for bp_name in top_level_paths(bp_names):
+            new_name = f"{parent_name}/{bp_name.rsplit('/', maxsplit=1)[-1]}"
+            subtree = [n for n in self.blueprints if _is_path_or_descendant(n, bp_name)]
+            if bp_name not in self.blueprints or new_name == bp_name:
+                continue
+            if _is_path_or_descendant(parent_name, bp_name):
+                logger.error("Unable to move %s into itself", bp_name)
+            elif new_name in self.blueprints or new_name in moves.values():
+                logger.error("Unable to move %s. %s already exists.", bp_name, new_name)
+            elif any(
+                isinstance(self.blueprints[n], (RobotBlueprint, GripperBlueprint))
+                for n in subtree
+            ):
+                logger.error(
+                    "Unable to move %s. Moving robots is not supported.", bp_name
+                )
+            else:
+                moves[bp_name] = new_name
+        if not moves:
+            return {}
+
+        self.push_state_to_history()
+        for bp_name, new_name in moves.items():
+            # blueprints without a pose are placed at their parent's pose
+            has_pose = any(f.name == "pose" for f in fields(self.blueprints[bp_name]))
+            local_matrix = transforms.compose(
+                transforms.invert(parent_matrix), self.global_matrix(bp_name)
+            )
+            subtree = [n for n in self.blueprints if _is_path_or_descendant(n, bp_name)]
+            for n in sorted(subtree):
+                old = self.blueprints.pop(n)
+                moved = replace(old, path=f"{new_name}{n[len(bp_name) :]}")
+                if n == bp_name and has_pose:
+                    moved = replace(moved, pose=Pose(local_matrix))
+                self.blueprints[moved.path] = moved
+            if self.journal:
+                self.journal.record("remove", name=bp_name)
+                for n in sorted(subtree):
+                    moved_name = f"{new_name}{n[len(bp_name) :]}"
+                    self.journal.record("put", bp=self.blueprints[moved_name])
+        return moves
 
     def undo(self) -> bool:
-        if not self.history_past:
+        prev_state = self.history.undo(self.blueprints)
+        if prev_state is None:
             return False
-        prev_state = self.history_past.pop()
-        self.history_future.append(self.create_snapshot())
         self.blueprints = prev_state
+        self._record_scene()
         return True
 
     def redo(self) -> bool:
-        if not self.history_future:
+        future_state = self.history.redo(self.blueprints)
+        if future_state is None:
             return False
-        future_state = self.history_future.pop()
-        self.history_past.append(self.create_snapshot())
         self.blueprints = future_state
+        self._record_scene()
         return True
 
     def reset(self):
         self.blueprints.clear()
-        self.history_past.clear()
-        self.history_future.clear()
+        self.history.clear()
         self._seq = 0
+        self._record_scene()
 
     @property
     def element_seq(self) -> str:
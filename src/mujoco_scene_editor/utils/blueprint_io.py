@@ -0,0 +1,188 @@
+"""
+Reading and writing blueprint files.
+
+Blueprints are stored either as pretty-printed JSON (``.json``) or in a compact
+binary format (``.npz``). The binary format keeps poses, sizes and colors in
+columnar NumPy arrays and everything else in a small JSON header, so large
+scenes load and save considerably faster. Both formats round-trip losslessly.
+"""
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Union
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from robits.core.utils import MiscJSONEncoder
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import Pose
+from robits.sim.blueprints import blueprints_from_json
+from robits.sim.blueprints import convert_json_to_bp
+
+
+logger = logging.getLogger(__name__)
+
+BINARY_SUFFIX = ".npz"
+
+BINARY_FORMAT_VERSION = 1
+
+_POSE_CLASS_PATH = "robits.sim.blueprints.Pose"
+
+
+def is_binary_path(path: Union[str, Path]) -> bool:
+    return Path(path).suffix.lower() == BINARY_SUFFIX
+
+
+def load_blueprints(path: Union[str, Path]) -> List[Blueprint]:
+    """
+    Load blueprints from a JSON or binary blueprint file, detected by extension.
+    """
+    path = Path(path)
+    if is_binary_path(path):
+        return _load_binary(path)
+    return blueprints_from_json(path.read_text(encoding="utf-8"))
+
+
+def save_blueprints(path: Union[str, Path], blueprints: Sequence[Blueprint]) -> None:
+    """
+    Save blueprints to a JSON or binary blueprint file, detected by extension.
+    """
+    path = Path(path)
+    if is_binary_path(path):
+        _save_binary(path, blueprints)
+        return
+    blueprint_data = json.dumps(
+        {"blueprints": list(blueprints)},
+        cls=MiscJSONEncoder,
+        indent=3,
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(blueprint_data)
+
+
+def _is_float_vector(value: Any, max_len: int) -> bool:
+    return (
+        isinstance(value, list)
+        and 0 < len(value) <= max_len
+        and all(type(v) is float for v in value)
+    )
+
+
+def _is_plain_pose(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and value.keys() == {"class_path", "matrix"}
+        and value["class_path"] == _POSE_CLASS_PATH
+        and isinstance(value["matrix"], np.ndarray)
+        and value["matrix"].shape == (4, 4)
+    )
+
+
+def _save_binary(path: Path, blueprints: Sequence[Blueprint]) -> None:
+    n = len(blueprints)
+    poses = np.zeros((n, 4, 4), dtype=np.float64)
+    has_pose = np.zeros(n, dtype=bool)
+    sizes = np.zeros((n, 3), dtype=np.float64)
+    size_len = np.zeros(n, dtype=np.int8)
+    rgbas = np.zeros((n, 4), dtype=np.float64)
+    rgba_len = np.zeros(n, dtype=np.int8)
+
+    items: List[Dict[str, Any]] = []
+    for i, bp in enumerate(blueprints):
+        item = bp.to_dict()
+        # Only move values into the columns if they come back unchanged.
+        if _is_plain_pose(item.get("pose")):
+            poses[i] = item.pop("pose")["matrix"]
+            has_pose[i] = True
+        size = item.get("size")
+        if isinstance(size, tuple):
+            size = list(size)
+        if _is_float_vector(size, 3):
+            sizes[i, : len(size)] = item.pop("size")
+            size_len[i] = len(size)
+        rgba = item.get("rgba")
+        if _is_float_vector(rgba, 4):
+            rgbas[i, : len(rgba)] = item.pop("rgba")
+            rgba_len[i] = len(rgba)
+        items.append(item)
+
+    header = json.dumps(
+        {"version": BINARY_FORMAT_VERSION, "blueprints": items},
+        cls=MiscJSONEncoder,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    with open(path, "wb") as f:
+        np.savez_compressed(
+            f,
+            header=np.frombuffer(header, dtype=np.uint8),
+            poses=poses,
+            has_pose=has_pose,
+            sizes=sizes,
+            size_len=size_len,
+            rgbas=rgbas,
+            rgba_len=rgba_len,
+        )
+
+
+def _poses_from_matrices(poses: np.ndarray, has_pose: np.ndarray) -> List[Pose]:
+    """
+    Create Pose objects with single vectorized checks instead of the ones per
+    pose in ``Pose.__post_init__``. Each pose gets its own copy of its matrix.
+    """
+    if poses.ndim != 3 or poses.shape[1:] != (4, 4):
+        raise ValueError("Pose must be a 4x4 transformation matrix")
+    if has_pose.shape != poses.shape[:1]:
+        raise ValueError(
+            f"Expected {len(poses)} pose flags, got array of shape {has_pose.shape}"
+        )
+    det = np.linalg.det(poses[has_pose, :3, :3])
+    if not np.allclose(det, 1.0, rtol=0.0, atol=1e-4):
+        raise ValueError("Not a rotation matrix. Determinant does not equal 1.")
+    pose_objects = []
+    for matrix in poses.astype(np.float64, copy=False):
+        pose = object.__new__(Pose)
+        object.__setattr__(pose, "matrix", matrix.copy())
+        pose_objects.append(pose)
+    return pose_objects
+
+
+def _load_binary(path: Path) -> List[Blueprint]:
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(data["header"].tobytes().decode("utf-8"))
+        version = header.get("version")
+        if version != BINARY_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported blueprint file version {version} in {path}. "
+                f"Expected version {BINARY_FORMAT_VERSION}."
+            )
+        poses = data["poses"]
+        has_pose = data["has_pose"].astype(bool)
+        sizes = data["sizes"].tolist()
+        size_len = data["size_len"].tolist()
+        rgbas = data["rgbas"].tolist()
+        rgba_len = data["rgba_len"].tolist()
+
+    if len(has_pose) != len(header["blueprints"]):
+        raise ValueError(
+            f"{path} has {len(has_pose)} poses for {len(header['blueprints'])} blueprints"
+        )
+    pose_objects = _poses_from_matrices(poses, has_pose)
+
+    blueprints = []
+    for i, item in enumerate(header["blueprints"]):
+        if has_pose[i]:
+            item["pose"] = pose_objects[i]
+        if size_len[i]:
+            item["size"] = sizes[i][: size_len[i]]
+        if rgba_len[i]:
+            item["rgba"] = rgbas[i][: rgba_len[i]]
+        blueprints.append(convert_json_to_bp(item))
+    logger.debug("Loaded %d blueprints from %s", len(blueprints), path)
+    return blueprints
@@ -0,0 +1,347 @@
+"""
+Versioned on-disk cache of function results.
+
+Entries are stored in SQLite under a namespace and an explicit key. An entry is
+only used if it was written with the same schema version, is younger than its
+maximum age and its dependencies, i.e., files or directories, have not been
+modified since. Least recently used entries are removed once the cache exceeds
+its size budget. Hits, misses and the time spent loading and computing results
+are recorded per namespace.
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+from dataclasses import dataclass
+from functools import wraps
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import threading
+import time
+
+from mujoco_scene_editor import metrics
+from mujoco_scene_editor.constants import CACHE_MAX_MB
+from mujoco_scene_editor.constants import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    deps TEXT NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed);
+CREATE TABLE IF NOT EXISTS stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    load_s REAL NOT NULL DEFAULT 0.0,
+    compute_s REAL NOT NULL DEFAULT 0.0
+);
+"""
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    namespace: str
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+    # Total time spent loading cached and computing missing results
+    load_s: float
+    compute_s: float
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def fingerprint(paths: Iterable[Path]) -> str:
+    """
+    Summarizes the modification time and size of files or directories.
+    """
+    stamps: List[Tuple[str, Optional[int], Optional[int]]] = []
+    for path in paths:
+        path = Path(path).expanduser()
+        try:
+            stat = path.stat()
+        except OSError:
+            stamps.append((str(path), None, None))
+        else:
+            stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return json.dumps(stamps)
+
+
+class DiskCache:
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_mb: float = CACHE_MAX_MB
+    ) -> None:
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.cache_dir / "cache.sqlite"), check_same_thread=False
+        )
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _record(
+        self,
+        namespace: str,
+        hits: int = 0,
+        misses: int = 0,
+        load_s: float = 0.0,
+        compute_s: float = 0.0,
+    ) -> None:
+        self._db.execute(
+            "INSERT OR IGNORE INTO stats (namespace) VALUES (?)", (namespace,)
+        )
+        self._db.execute(
+            "UPDATE stats SET hits = hits + ?, misses = misses + ?, "
+            "load_s = load_s + ?, compute_s = compute_s + ? WHERE namespace = ?",
+            (hits, misses, load_s, compute_s, namespace),
+        )
+        if hits:
+            metrics.increment(f"cache.{namespace}.hits", hits)
+        if misses:
+            metrics.increment(f"cache.{namespace}.misses", misses)
+
+    def get(
+        self, namespace: str, key: str, version: int = 1, deps: str = "[]"
+    ) -> Tuple[bool, Any]:
+        """
+        Returns whether a valid entry exists and its value.
+        """
+        start_time = time.perf_counter()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, deps, expires, value FROM entries "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        value = None
+        is_valid = (
+            row is not None
+            and row[0] == version
+            and row[1] == deps
+            and (row[2] is None or row[2] >= time.time())
+        )
+        if is_valid:
+            try:
+                value = pickle.loads(row[3])
+            except Exception as e:
+                logger.warning("Unable to load cached %s %s: %s", namespace, key, e)
+                is_valid = False
+        with self._lock, self._db:
+            if not is_valid:
+                self._record(namespace, misses=1)
+                return False, None
+            self._db.execute(
+                "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key),
+            )
+            self._record(namespace, hits=1, load_s=time.perf_counter() - start_time)
+        return True, value
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        version: int = 1,
+        deps: str = "[]",
+        max_age: Optional[float] = None,
+        compute_s: float = 0.0,
+    ) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    version,
+                    deps,
+                    now + max_age if max_age is not None else None,
+                    now,
+                    len(data),
+                    data,
+                ),
+            )
+            self._record(namespace, compute_s=compute_s)
+            self._evict(self.max_bytes)
+
+    def _evict(self, max_bytes: int) -> int:
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        rows = self._db.execute(
+            "SELECT namespace, key, size FROM entries ORDER BY accessed, rowid"
+        ).fetchall()
+        removed: List[Tuple[str, str]] = []
+        for namespace, key, size in rows:
+            if total <= max_bytes:
+                break
+            removed.append((namespace, key))
+            total -= size
+        self._db.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", removed
+        )
+        return len(removed)
+
+    def prune(self, max_mb: Optional[float] = None) -> int:
+        """
+        Removes expired entries and entries whose dependencies changed, then
+        the least recently used ones beyond the size budget. Returns the
+        number of removed entries.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT namespace, key, deps, expires FROM entries"
+            ).fetchall()
+        stale = [
+            (namespace, key)
+            for namespace, key, deps, expires in rows
+            if (expires is not None and expires < now)
+            or fingerprint(Path(p) for p, _, _ in json.loads(deps)) != deps
+        ]
+        max_bytes = self.max_bytes if max_mb is None else int(max_mb * 1024 * 1024)
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", stale
+            )
+            return len(stale) + self._evict(max_bytes)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """
+        Removes all entries and statistics, or those of ``namespace``.
+        """
+        condition, params = ("", ())
+        if namespace is not None:
+            condition, params = ("WHERE namespace = ?", (namespace,))
+        with self._lock, self._db:
+            num_entries = self._db.execute(
+                f"DELETE FROM entries {condition}", params
+            ).rowcount
+            self._db.execute(f"DELETE FROM stats {condition}", params)
+        return num_entries
+
+    def stats(self) -> List[CacheStats]:
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT n.namespace, COUNT(e.key), COALESCE(SUM(e.size), 0),
+                    COALESCE(s.hits, 0), COALESCE(s.misses, 0),
+                    COALESCE(s.load_s, 0.0), COALESCE(s.compute_s, 0.0)
+                FROM (SELECT namespace FROM entries UNION SELECT namespace FROM stats) n
+                LEFT JOIN entries e ON e.namespace = n.namespace
+                LEFT JOIN stats s ON s.namespace = n.namespace
+                GROUP BY n.namespace ORDER BY n.namespace
+                """
+            ).fetchall()
+        return [CacheStats(*row) for row in rows]
+
+
+_cache: Optional[DiskCache] = None
+_cache_guard = threading.Lock()
+
+
+def cache_dir() -> Path:
+    """
+    Returns the directory given by ``MUJOCO_SCENE_EDITOR_CACHE_DIR``, if set, or
+    the default one.
+    """
+    return Path(
+        os.environ.get("MUJOCO_SCENE_EDITOR_CACHE_DIR", DEFAULT_CACHE_DIR)
+    ).expanduser()
+
+
+def get_cache() -> DiskCache:
+    """
+    Returns the cache shared by the process, stored in :func:`cache_dir`.
+    """
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = DiskCache(str(cache_dir()))
+        return _cache
+
+
+def set_cache(cache: Optional[DiskCache]) -> None:
+    global _cache
+    with _cache_guard:
+        _cache = cache
+
+
+def cached(
+    namespace: str,
+    key: Callable[..., str],
+    version: int = 1,
+    deps: Optional[Callable[..., Iterable[Path]]] = None,
+    max_age: Optional[float] = None,
+) -> Callable[[F], F]:
+    """
+    Caches the results of a function in the shared cache. ``key`` and ``deps``
+    are called with the arguments of the function. Bump ``version`` whenever
+    the format of the results changes.
+
+    Callers can pass ``refresh_cache=True`` to recompute and store the result
+    or ``skip_cache=True`` to bypass the cache.
+    """
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(
+            *args, refresh_cache: bool = False, skip_cache: bool = False, **kwargs
+        ):
+            if skip_cache:
+                return fn(*args, **kwargs)
+            cache = get_cache()
+            entry_key = key(*args, **kwargs)
+            entry_deps = fingerprint(deps(*args, **kwargs)) if deps else "[]"
+            if not refresh_cache:
+                found, value = cache.get(namespace, entry_key, version, entry_deps)
+                if found:
+                    return value
+            start_time = time.perf_counter()
+            value = fn(*args, **kwargs)
+            cache.put(
+                namespace,
+                entry_key,
+                value,
+                version,
+                entry_deps,
+                max_age,
+                time.perf_counter() - start_time,
+            )
+            return value
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
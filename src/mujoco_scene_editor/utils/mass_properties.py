@@ -0,0 +1,211 @@
+"""
+Mass and inertia of geoms and meshes from their shape and a uniform density.
+
+Primitives are computed analytically. Meshes use their volume if they are
+watertight and their convex hull otherwise. Values are per unit density, i.e.,
+the mass equals the volume.
+"""
+
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from dataclasses import dataclass
+import logging
+import math
+from pathlib import Path
+
+import numpy as np
+
+from robits.sim.blueprints import Blueprint
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import MeshBlueprint
+
+from mujoco_scene_editor.utils import transforms
+
+logger = logging.getLogger(__name__)
+
+# Mesh file and scale
+MeshKey = Tuple[Path, float]
+
+
+@dataclass(frozen=True)
+class MassProperties:
+    volume: float
+    center_of_mass: Tuple[float, float, float]
+    # Inertia tensor about the center of mass as (xx, yy, zz, xy, xz, yz)
+    inertia: Tuple[float, float, float, float, float, float]
+    is_convex_hull: bool = False
+
+    @property
+    def inertia_matrix(self) -> np.ndarray:
+        xx, yy, zz, xy, xz, yz = self.inertia
+        return np.array([[xx, xy, xz], [xy, yy, yz], [xz, yz, zz]])
+
+
+def _diagonal(volume: float, xx: float, yy: float, zz: float) -> MassProperties:
+    return MassProperties(volume, (0.0, 0.0, 0.0), (xx, yy, zz, 0.0, 0.0, 0.0))
+
+
+def primitive_mass_properties(
+    geom_type: str, size: Sequence[float]
+) -> Optional[MassProperties]:
+    """
+    Sizes are given as in MuJoCo, e.g., half extents of boxes. Returns None for
+    unsupported types such as planes.
+    """
+    if geom_type == "box":
+        a, b, c = size[:3]
+        volume = 8.0 * a * b * c
+        return _diagonal(
+            volume,
+            volume * (b * b + c * c) / 3.0,
+            volume * (a * a + c * c) / 3.0,
+            volume * (a * a + b * b) / 3.0,
+        )
+    if geom_type == "sphere":
+        r = size[0]
+        volume = 4.0 / 3.0 * math.pi * r**3
+        moment = 0.4 * volume * r * r
+        return _diagonal(volume, moment, moment, moment)
+    if geom_type == "ellipsoid":
+        a, b, c = size[:3]
+        volume = 4.0 / 3.0 * math.pi * a * b * c
+        return _diagonal(
+            volume,
+            volume * (b * b + c * c) / 5.0,
+            volume * (a * a + c * c) / 5.0,
+            volume * (a * a + b * b) / 5.0,
+        )
+    if geom_type == "cylinder":
+        r, half_height = size[:2]
+        volume = math.pi * r * r * 2.0 * half_height
+        moment = volume * (3.0 * r * r + 4.0 * half_height**2) / 12.0
+        return _diagonal(volume, moment, moment, volume * r * r / 2.0)
+    if geom_type == "capsule":
+        r, half_height = size[:2]
+        height = 2.0 * half_height
+        cylinder = math.pi * r * r * height
+        caps = 4.0 / 3.0 * math.pi * r**3
+        moment = cylinder * (height * height / 12.0 + r * r / 4.0) + caps * (
+            0.4 * r * r + height * height / 4.0 + 3.0 * height * r / 8.0
+        )
+        return _diagonal(
+            cylinder + caps, moment, moment, cylinder * r * r / 2.0 + caps * 0.4 * r * r
+        )
+    return None
+
+
+def mesh_mass_properties(mesh_path: Path, scale: float = 1.0) -> MassProperties:
+    import trimesh
+
+    mesh = trimesh.load(mesh_path, force="mesh")
+    mesh.apply_scale(scale)
+    is_convex_hull = not mesh.is_watertight
+    if is_convex_hull:
+        mesh = mesh.convex_hull
+    elif mesh.volume < 0.0:
+        mesh.invert()
+    if mesh.volume <= 0.0:
+        raise ValueError(f"Mesh {mesh_path} has no volume")
+    i = mesh.moment_inertia
+    return MassProperties(
+        volume=float(mesh.volume),
+        center_of_mass=tuple(float(v) for v in mesh.center_mass),
+        inertia=tuple(
+            float(v) for v in (i[0, 0], i[1, 1], i[2, 2], i[0, 1], i[0, 2], i[1, 2])
+        ),
+        is_convex_hull=is_convex_hull,
+    )
+
+
+def combine(
+    parts: Sequence[Tuple[float, np.ndarray, np.ndarray]],
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Combines ``(mass, center of mass, inertia)`` of rigidly attached parts that
+    are given in the same frame.
+    """
+    masses = np.array([p[0] for p in parts])
+    centers = np.array([p[1] for p in parts])
+    mass = float(masses.sum())
+    center = masses @ centers / mass
+    inertia = np.zeros((3, 3))
+    for part_mass, part_center, part_inertia in parts:
+        # parallel axis theorem
+        d = part_center - center
+        inertia += part_inertia + part_mass * (d @ d * np.identity(3) - np.outer(d, d))
+    return mass, center, inertia
+
+
+def mesh_keys(blueprints: Sequence[Blueprint]) -> List[MeshKey]:
+    return [
+        (Path(bp.mesh_path), float(bp.scale))
+        for bp in blueprints
+        if isinstance(bp, MeshBlueprint) and not bp.is_static
+    ]
+
+
+def apply_mass_properties(
+    builder,
+    blueprints: Sequence[Blueprint],
+    density: float,
+    mesh_properties: Dict[MeshKey, MassProperties],
+) -> int:
+    """
+    Sets the inertial of the bodies that ``builder`` created for non-static
+    geoms and meshes. Bodies that also contain other geoms are left as they
+    are. Returns the number of updated bodies.
+    """
+    parts: Dict[object, List[Tuple[float, np.ndarray, np.ndarray]]] = {}
+    for bp in blueprints:
+        if isinstance(bp, GeomBlueprint) and not bp.is_static:
+            props = primitive_mass_properties(bp.geom_type, bp.size)
+        elif isinstance(bp, MeshBlueprint) and not bp.is_static:
+            props = mesh_properties.get((Path(bp.mesh_path), float(bp.scale)), None)
+        else:
+            continue
+        geom = builder.scene.find("geom", bp.basename)
+        if props is None or geom is None or geom.parent is builder.scene.worldbody:
+            continue
+
+        rotation = transforms.quat_to_matrix(
+            geom.quat if geom.quat is not None else (1.0, 0.0, 0.0, 0.0)
+        )
+        position = (
+            np.zeros(3) if geom.pos is None else np.asarray(geom.pos, dtype=float)
+        )
+        mass = density * props.volume
+        geom.mass = mass
+        parts.setdefault(geom.parent, []).append(
+            (
+                mass,
+                position + rotation @ np.asarray(props.center_of_mass),
+                density * rotation @ props.inertia_matrix @ rotation.T,
+            )
+        )
+
+    num_bodies = 0
+    for body, body_parts in parts.items():
+        num_geoms = len(body.find_all("geom", immediate_children_only=True))
+        if num_geoms != len(body_parts) or body.inertial is not None:
+            logger.debug("Keeping the inertia of body %s", body.name)
+            continue
+        mass, center, inertia = combine(body_parts)
+        body.add(
+            "inertial",
+            pos=center,
+            mass=mass,
+            fullinertia=[
+                inertia[0, 0],
+                inertia[1, 1],
+                inertia[2, 2],
+                inertia[0, 1],
+                inertia[0, 2],
+                inertia[1, 2],
+            ],
+        )
+        num_bodies += 1
+    return num_bodies
@@ -0,0 +1,99 @@
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+
+import logging
+import threading
+import time
+
+from mujoco_scene_editor import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Calls ``fn`` with the most recently submitted arguments at most ``rate_hz``
+    times per second.
+
+    Submissions in between are coalesced. A trailing timer delivers the last one,
+    so the final state of a drag is never lost. Calls of ``fn`` never overlap and
+    a submission is never delivered after a newer one.
+    """
+
+    def __init__(
+        self, fn: Callable[..., Any], rate_hz: float, name: str = "rate_limiter"
+    ) -> None:
+        self._fn = fn
+        self.rate_hz = rate_hz
+        self.name = name
+        self.sent = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        # held while calling fn. Reentrant so that fn may submit again.
+        self._delivery_lock = threading.RLock()
+        # submissions are numbered to skip any older than the last delivered one
+        self._seq = 0
+        self._delivered_seq = 0
+        self._pending: Optional[Tuple[int, Tuple[Any, ...]]] = None
+        self._last_sent = -float("inf")
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def period(self) -> float:
+        return 1.0 / self.rate_hz if self.rate_hz > 0 else 0.0
+
+    def submit(self, *args: Any) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+                metrics.increment(f"{self.name}.dropped")
+            self._seq += 1
+            self._pending = (self._seq, args)
+            if self._timer is not None:
+                return
+            delay = self._last_sent + self.period - time.monotonic()
+            if delay > 0:
+                self._timer = threading.Timer(delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Delivers a pending submission right away.
+        """
+        with self._delivery_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    return
+                seq, args = pending
+                if seq <= self._delivered_seq:
+                    return
+                self._delivered_seq = seq
+                self._last_sent = time.monotonic()
+                self.sent += 1
+            metrics.increment(f"{self.name}.sent")
+            try:
+                self._fn(*args)
+            except Exception:
+                logger.exception("Unable to deliver update of %s", self.name)
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = None
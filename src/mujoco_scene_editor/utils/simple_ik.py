@@ -11,9 +11,9 @@ from robits.sim.blueprints import Pose
 from robits.sim.model_factory import SceneBuilder
 from robits.sim import mjcf_utils
 
-from robits.utils.transform_utils import transform_pose
-
+from mujoco_scene_editor.utils import transforms
 from mujoco_scene_editor.utils import viser_utils
+from mujoco_scene_editor import metrics
 
 import mujoco
 import mink
@@ -77,6 +77,7 @@ class SimpleIK:
         prefix = viser_utils.base_name(self.bp.path)
         return f"{prefix}/{self.bp.attachment.attachment_site}"
 
+    @metrics.timed()
     def get_eef_pose(self):
         """
         TODO we should simply return the position of the attachment site and skip the mocap
@@ -88,13 +89,9 @@ class SimpleIK:
         position, wxyz = data.mocap_pos[0].copy(), data.mocap_quat[0].copy()
 
         pose = self.bp.pose or Pose()
-        transform = np.linalg.inv(pose.matrix)
-        quat_xyzw = viser_utils.wxyz_to_xyzw(wxyz)
-
-        new_position, new_xyzw = transform_pose(transform, position, quat_xyzw)
-
-        return new_position, viser_utils.xyzw_to_wxyz(new_xyzw)
+        return transforms.transform_pose(transforms.invert(pose.matrix), position, wxyz)
 
+    @metrics.timed()
     def set_target(
         self,
         position: Tuple[float, float, float],
@@ -103,12 +100,7 @@ class SimpleIK:
         model, data = self.model, self.data
 
         pose = self.bp.pose or Pose()
-        transform = pose.matrix
-
-        quat_xyzw = viser_utils.wxyz_to_xyzw(wxyz)
-
-        new_position, new_xyzw = transform_pose(transform, position, quat_xyzw)
-        new_wxyz = np.concatenate((new_xyzw[-1:], new_xyzw[:-1]))
+        new_position, new_wxyz = transforms.transform_pose(pose.matrix, position, wxyz)
 
         # data.mocap_pos[0] = new_position
         # data.mocap_quat[0] = new_wxyz
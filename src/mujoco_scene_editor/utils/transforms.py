@@ -0,0 +1,292 @@
+"""
+Vectorized rotation and transformation kernels.
+
+All functions accept a single quaternion, matrix or vector as well as batches,
+i.e., arrays of shape ``(..., 4)``, ``(..., 3)``, ``(..., 3, 3)`` or
+``(..., 4, 4)``, and return arrays of the same batch shape. Quaternions are
+ordered ``(w, x, y, z)`` like in viser and MuJoCo unless noted otherwise. Euler
+angles are intrinsic ``XYZ`` rotations as used by robits.
+"""
+
+from typing import List
+from typing import Tuple
+
+import math
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+def wxyz_to_xyzw(q: ArrayLike) -> np.ndarray:
+    return np.asarray(q, dtype=float)[..., [1, 2, 3, 0]]
+
+
+def xyzw_to_wxyz(q: ArrayLike) -> np.ndarray:
+    return np.asarray(q, dtype=float)[..., [3, 0, 1, 2]]
+
+
+def quat_normalize(q: ArrayLike) -> np.ndarray:
+    q = np.asarray(q, dtype=float)
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def quat_conjugate(q: ArrayLike) -> np.ndarray:
+    return np.asarray(q, dtype=float) * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quat_multiply(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    Hamilton product, i.e., the rotation ``b`` followed by ``a``.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack(
+        (
+            aw * bw - ax * bx - ay * by - az * bz,
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+        ),
+        axis=-1,
+    )
+
+
+def quat_to_matrix(q: ArrayLike) -> np.ndarray:
+    """
+    Rotation matrices of shape ``(..., 3, 3)``. Quaternions are normalized first.
+    """
+    q = np.asarray(q, dtype=float)
+    if q.ndim == 1:
+        return np.array(_quat_to_matrix_single(*q.tolist()))
+    w, x, y, z = np.moveaxis(quat_normalize(q), -1, 0)
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    return np.stack(
+        (
+            np.stack(
+                (1.0 - 2.0 * (yy + zz), 2.0 * (xy - wz), 2.0 * (xz + wy)), axis=-1
+            ),
+            np.stack(
+                (2.0 * (xy + wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz - wx)), axis=-1
+            ),
+            np.stack(
+                (2.0 * (xz - wy), 2.0 * (yz + wx), 1.0 - 2.0 * (xx + yy)), axis=-1
+            ),
+        ),
+        axis=-2,
+    )
+
+
+def matrix_to_quat(m: ArrayLike) -> np.ndarray:
+    """
+    Quaternions with a non-negative ``w`` of the rotation part of ``(..., 3, 3)``
+    or ``(..., 4, 4)`` matrices.
+    """
+    m = np.asarray(m, dtype=float)[..., :3, :3]
+    if m.ndim == 2:
+        return np.array(_matrix_to_quat_single(m.tolist()))
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    trace = m00 + m11 + m22
+
+    # Each row computes the quaternion from the largest of w, x, y and z to
+    # avoid dividing by a small number.
+    candidates = np.stack(
+        (
+            np.stack(
+                (
+                    1.0 + trace,
+                    m[..., 2, 1] - m[..., 1, 2],
+                    m[..., 0, 2] - m[..., 2, 0],
+                    m[..., 1, 0] - m[..., 0, 1],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    m[..., 2, 1] - m[..., 1, 2],
+                    1.0 + m00 - m11 - m22,
+                    m[..., 0, 1] + m[..., 1, 0],
+                    m[..., 0, 2] + m[..., 2, 0],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    m[..., 0, 2] - m[..., 2, 0],
+                    m[..., 0, 1] + m[..., 1, 0],
+                    1.0 - m00 + m11 - m22,
+                    m[..., 1, 2] + m[..., 2, 1],
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    m[..., 1, 0] - m[..., 0, 1],
+                    m[..., 0, 2] + m[..., 2, 0],
+                    m[..., 1, 2] + m[..., 2, 1],
+                    1.0 - m00 - m11 + m22,
+                ),
+                axis=-1,
+            ),
+        ),
+        axis=-2,
+    )
+    best = np.argmax(np.stack((trace, m00, m11, m22), axis=-1), axis=-1)
+    q = np.take_along_axis(candidates, best[..., None, None], axis=-2)[..., 0, :]
+    q = quat_normalize(q)
+    return np.where(q[..., :1] < 0.0, -q, q)
+
+
+def euler_to_quat(angles: ArrayLike, degrees: bool = False) -> np.ndarray:
+    angles = np.asarray(angles, dtype=float)
+    if degrees:
+        angles = np.deg2rad(angles)
+    half = angles / 2.0
+    c, s = np.cos(half), np.sin(half)
+    zero = np.zeros_like(half[..., 0])
+    qx = np.stack((c[..., 0], s[..., 0], zero, zero), axis=-1)
+    qy = np.stack((c[..., 1], zero, s[..., 1], zero), axis=-1)
+    qz = np.stack((c[..., 2], zero, zero, s[..., 2]), axis=-1)
+    return quat_multiply(quat_multiply(qx, qy), qz)
+
+
+def matrix_to_euler(m: ArrayLike, degrees: bool = False) -> np.ndarray:
+    """
+    Intrinsic ``XYZ`` angles. In gimbal lock the angle around ``z`` is zero.
+    """
+    m = np.asarray(m, dtype=float)[..., :3, :3]
+    if m.ndim == 2:
+        angles = np.array(_matrix_to_euler_single(m.tolist()))
+        return np.rad2deg(angles) if degrees else angles
+    sin_y = np.clip(m[..., 0, 2], -1.0, 1.0)
+    is_locked = np.abs(sin_y) > 1.0 - 1e-9
+    x = np.where(
+        is_locked,
+        np.arctan2(m[..., 2, 1], m[..., 1, 1]),
+        np.arctan2(-m[..., 1, 2], m[..., 2, 2]),
+    )
+    y = np.arcsin(sin_y)
+    z = np.where(is_locked, 0.0, np.arctan2(-m[..., 0, 1], m[..., 0, 0]))
+    angles = np.stack((x, y, z), axis=-1)
+    return np.rad2deg(angles) if degrees else angles
+
+
+def quat_to_euler(q: ArrayLike, degrees: bool = False) -> np.ndarray:
+    return matrix_to_euler(quat_to_matrix(q), degrees)
+
+
+def pose_to_matrix(position: ArrayLike, wxyz: ArrayLike) -> np.ndarray:
+    """
+    Homogeneous transformations of shape ``(..., 4, 4)``.
+    """
+    position = np.asarray(position, dtype=float)
+    rotation = quat_to_matrix(wxyz)
+    batch_shape = np.broadcast_shapes(position.shape[:-1], rotation.shape[:-2])
+    m = np.zeros(batch_shape + (4, 4))
+    m[..., :3, :3] = rotation
+    m[..., :3, 3] = position
+    m[..., 3, 3] = 1.0
+    return m
+
+
+def matrix_to_pose(m: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the positions and the ``wxyz`` quaternions.
+    """
+    m = np.asarray(m, dtype=float)
+    return m[..., :3, 3].copy(), matrix_to_quat(m)
+
+
+def compose(a: ArrayLike, b: ArrayLike) -> np.ndarray:
+    """
+    The transformation ``b`` followed by ``a``, i.e., ``a @ b``.
+    """
+    return np.matmul(a, b)
+
+
+def compose_chain(m: ArrayLike) -> np.ndarray:
+    """
+    Composes a chain of ``(N, 4, 4)`` transformations from the root to the leaf.
+    """
+    m = np.asarray(m, dtype=float)
+    if len(m) == 0:
+        return np.identity(4)
+    if len(m) == 1:
+        return m[0].copy()
+    return np.linalg.multi_dot(list(m))
+
+
+def invert(m: ArrayLike) -> np.ndarray:
+    """
+    Inverts rigid transformations without a general matrix inverse.
+    """
+    m = np.asarray(m, dtype=float)
+    rotation_t = np.swapaxes(m[..., :3, :3], -1, -2)
+    result = np.zeros_like(m)
+    result[..., :3, :3] = rotation_t
+    result[..., :3, 3] = -np.einsum("...ij,...j->...i", rotation_t, m[..., :3, 3])
+    result[..., 3, 3] = 1.0
+    return result
+
+
+def apply(m: ArrayLike, points: ArrayLike) -> np.ndarray:
+    """
+    Transforms ``(..., 3)`` points.
+    """
+    m = np.asarray(m, dtype=float)
+    points = np.asarray(points, dtype=float)
+    return np.einsum("...ij,...j->...i", m[..., :3, :3], points) + m[..., :3, 3]
+
+
+def transform_pose(
+    m: ArrayLike, position: ArrayLike, wxyz: ArrayLike
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the position and ``wxyz`` quaternion of a pose transformed by ``m``.
+    """
+    return matrix_to_pose(compose(m, pose_to_matrix(position, wxyz)))
+
+
+# Single poses are converted with plain floats. This is several times faster
+# than the array code for one element, e.g., when a node is added.
+
+
+def _quat_to_matrix_single(w: float, x: float, y: float, z: float) -> List[List[float]]:
+    n = math.sqrt(w * w + x * x + y * y + z * z)
+    w, x, y, z = w / n, x / n, y / n, z / n
+    return [
+        [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)],
+        [2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)],
+        [2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)],
+    ]
+
+
+def _matrix_to_quat_single(m: List[List[float]]) -> List[float]:
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = m[0][:3], m[1][:3], m[2][:3]
+    trace = m00 + m11 + m22
+    if trace >= m00 and trace >= m11 and trace >= m22:
+        q = [1.0 + trace, m21 - m12, m02 - m20, m10 - m01]
+    elif m00 >= m11 and m00 >= m22:
+        q = [m21 - m12, 1.0 + m00 - m11 - m22, m01 + m10, m02 + m20]
+    elif m11 >= m22:
+        q = [m02 - m20, m01 + m10, 1.0 - m00 + m11 - m22, m12 + m21]
+    else:
+        q = [m10 - m01, m02 + m20, m12 + m21, 1.0 - m00 - m11 + m22]
+    n = math.sqrt(sum(v * v for v in q))
+    if q[0] < 0.0:
+        n = -n
+    return [v / n for v in q]
+
+
+def _matrix_to_euler_single(m: List[List[float]]) -> List[float]:
+    sin_y = min(max(m[0][2], -1.0), 1.0)
+    if abs(sin_y) > 1.0 - 1e-9:
+        return [math.atan2(m[2][1], m[1][1]), math.asin(sin_y), 0.0]
+    return [
+        math.atan2(-m[1][2], m[2][2]),
+        math.asin(sin_y),
+        math.atan2(-m[0][1], m[0][0]),
+    ]
@@ -0,0 +1,150 @@
+"""
+Process-level cache of parsed URDF models.
+
+Parsing a URDF and loading its link meshes is slow. Models are therefore loaded
+once per description name, including for nodes that are recreated after
+undo/redo. Each robot node gets its own copy, since setting the joint
+configuration modifies the model, but the meshes are shared.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import copy
+import logging
+import threading
+import time
+
+import numpy as np
+import trimesh
+from robits.core.config_manager import config_manager
+from robot_descriptions.loaders.yourdfpy import load_robot_description
+from yourdfpy import URDF
+
+from mujoco_scene_editor.utils.mj_urdf_map import mj_to_urdf_description_name
+
+logger = logging.getLogger(__name__)
+
+
+_urdf_models: Dict[str, URDF] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(urdf_desc_name: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(urdf_desc_name, threading.Lock())
+
+
+def _share_meshes(scene: Optional[trimesh.Scene]) -> Optional[trimesh.Scene]:
+    if scene is None:
+        return None
+    return trimesh.Scene(
+        geometry=dict(scene.geometry),
+        graph=scene.graph.copy(),
+        metadata=scene.metadata.copy(),
+    )
+
+
+def _copy(urdf: URDF) -> URDF:
+    """
+    Copies the joint configuration and the transforms of the model. The meshes
+    are shared since they are never modified.
+    """
+    copied = copy.copy(urdf)
+    copied._cfg = np.copy(urdf._cfg)
+    copied._scene = _share_meshes(urdf._scene)
+    copied._scene_collision = _share_meshes(urdf._scene_collision)
+    return copied
+
+
+def _load(urdf_desc_name: str) -> URDF:
+    """
+    Concurrent calls for the same name wait for a single load.
+    """
+    with _lock_for(urdf_desc_name):
+        if urdf_desc_name not in _urdf_models:
+            start_time = time.perf_counter()
+            _urdf_models[urdf_desc_name] = load_robot_description(urdf_desc_name)
+            logger.info(
+                "Loaded URDF model %s in %.2fs",
+                urdf_desc_name,
+                time.perf_counter() - start_time,
+            )
+        return _urdf_models[urdf_desc_name]
+
+
+def load_urdf(urdf_desc_name: str) -> URDF:
+    """
+    Returns a copy of the parsed URDF model for a robot description.
+    """
+    return _copy(_load(urdf_desc_name))
+
+
+def is_cached(urdf_desc_name: str) -> bool:
+    return urdf_desc_name in _urdf_models
+
+
+def clear() -> None:
+    _urdf_models.clear()
+
+
+def _urdf_name(description_name: str, variant_name: Optional[str]) -> str:
+    desc = f"{description_name}_{variant_name}" if variant_name else description_name
+    return mj_to_urdf_description_name(desc)
+
+
+def urdf_names_for_config(config_name: str) -> List[str]:
+    """
+    Collects the URDF description names that adding the robot configuration
+    ``config_name`` will load, including attached grippers and bimanual setups.
+    """
+    config_dict = config_manager.load_dict(config_name)
+    names: List[str] = []
+    for key in ("left_robot", "right_robot"):
+        if sub_config_name := config_dict.get(key, None):
+            names.extend(urdf_names_for_config(sub_config_name))
+    if "description_name" in config_dict:
+        names.append(
+            _urdf_name(
+                config_dict["description_name"], config_dict.get("variant_name", None)
+            )
+        )
+    if gripper_config_name := config_dict.get("gripper", None):
+        gripper_config = config_manager.load_dict(gripper_config_name)
+        names.append(
+            _urdf_name(
+                gripper_config["description_name"],
+                gripper_config.get("variant_name", None),
+            )
+        )
+    return [n for n in names if n]
+
+
+def _preload(config_names: Iterable[str]) -> None:
+    start_time = time.perf_counter()
+    for config_name in config_names:
+        try:
+            urdf_desc_names = urdf_names_for_config(config_name)
+        except Exception as e:
+            logger.warning("Unable to read robot configuration %s: %s", config_name, e)
+            continue
+        for urdf_desc_name in urdf_desc_names:
+            try:
+                _load(urdf_desc_name)
+            except Exception as e:
+                logger.warning("Unable to preload URDF model %s: %s", urdf_desc_name, e)
+    logger.info("Preloaded URDF models in %.2fs", time.perf_counter() - start_time)
+
+
+def preload_async(config_names: Iterable[str]) -> threading.Thread:
+    """
+    Warms the cache for the given robot configurations in a background thread.
+    """
+    thread = threading.Thread(
+        target=_preload, args=(list(config_names),), name="urdf-preload", daemon=True
+    )
+    thread.start()
+    return thread
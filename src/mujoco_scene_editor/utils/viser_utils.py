@@ -1,3 +1,4 @@
+from typing import Callable
 from typing import Sequence
 from typing import Tuple
 from typing import List
@@ -5,13 +6,14 @@ from typing import List
 import logging
 
 import numpy as np
-from scipy.spatial.transform import Rotation as R
 
 import viser
 from viser.extras import ViserUrdf
 
 from robits.sim.blueprints import Blueprint
 
+from mujoco_scene_editor.utils import transforms
+
 
 logger = logging.getLogger(__name__)
 
@@ -25,50 +27,71 @@ def base_name(fullpath: str) -> str:
 
 
 def wxyz_to_euler_deg(wxyz: Tuple[float, float, float, float]) -> np.ndarray:
-    xyzw = wxyz_to_xyzw(wxyz)
-    return R.from_quat(xyzw).as_euler("XYZ", degrees=True)
+    return transforms.quat_to_euler(wxyz, degrees=True)
 
 
 def wxyz_to_xyzw(q: Tuple[float, float, float, float]) -> np.ndarray:
     """Convert quaternion from (w, x, y, z) to (x, y, z, w)."""
-    return np.concatenate((q[1:], q[:1]))
+    return transforms.wxyz_to_xyzw(q)
 
 
 def xyzw_to_wxyz(q: Tuple[float, float, float, float]) -> np.ndarray:
     """Convert quaternion from (x, y, z, w) to (w, x, y, z)."""
-    return np.concatenate((q[-1:], q[:-1]))
+    return transforms.xyzw_to_wxyz(q)
+
+
+def joint_limits(viser_urdf: ViserUrdf) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Names, lower and upper limits of the actuated joints. Unlimited joints get +-pi.
+    """
+    names: List[str] = []
+    lower_limits: List[float] = []
+    upper_limits: List[float] = []
+    for joint_name, (lower, upper) in viser_urdf.get_actuated_joint_limits().items():
+        names.append(joint_name)
+        lower_limits.append(lower if lower is not None else -np.pi)
+        upper_limits.append(upper if upper is not None else np.pi)
+    return names, np.asarray(lower_limits), np.asarray(upper_limits)
+
+
+def initial_joint_positions(lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    Zero if it is within the limits, otherwise the center of the range.
+    """
+    center = (lower + upper) / 2.0
+    return np.where((lower < -0.1) & (upper > 0.1), 0.0, center)
 
 
 def create_robot_control_sliders(
-    server: viser.ViserServer, viser_urdf: ViserUrdf
-) -> Tuple[List[viser.GuiInputHandle[float]], List[float]]:
+    gui: viser.GuiApi,
+    joint_names: Sequence[str],
+    lower: np.ndarray,
+    upper: np.ndarray,
+    joint_positions: np.ndarray,
+    on_change: Callable[[int, float, viser.GuiEvent], None],
+) -> List[viser.GuiInputHandle[float]]:
     """
+    Creates one slider per joint. ``on_change`` is called with the joint index and
+    the new value.
+
     .. see:: https://viser.studio/main/examples/demos/urdf_visualizer/
     """
-    slider_handles: list[viser.GuiInputHandle[float]] = []
-    initial_config: list[float] = []
-    for joint_name, (
-        lower,
-        upper,
-    ) in viser_urdf.get_actuated_joint_limits().items():
-        lower = lower if lower is not None else -np.pi
-        upper = upper if upper is not None else np.pi
-        initial_pos = 0.0 if lower < -0.1 and upper > 0.1 else (lower + upper) / 2.0
-        slider = server.gui.add_slider(
+    slider_handles: List[viser.GuiInputHandle[float]] = []
+    for i, joint_name in enumerate(joint_names):
+        slider = gui.add_slider(
             label=joint_name,
-            min=lower,
-            max=upper,
+            min=float(lower[i]),
+            max=float(upper[i]),
             step=1e-3,
-            initial_value=initial_pos,
-        )
-        slider.on_update(  # When sliders move, we update the URDF configuration.
-            lambda _: viser_urdf.update_cfg(
-                np.array([slider.value for slider in slider_handles])
-            )
+            initial_value=float(joint_positions[i]),
         )
+
+        @slider.on_update
+        def _(evt: viser.GuiEvent, idx=i, handle=slider) -> None:
+            on_change(idx, handle.value, evt)
+
         slider_handles.append(slider)
-        initial_config.append(initial_pos)
-    return slider_handles, initial_config
+    return slider_handles
 
 
 def pose_to_gui(
@@ -79,8 +102,9 @@ def pose_to_gui(
     Falls back to identity if the blueprint has no pose.
     """
     if pose := getattr(bp, "pose", None):
-        position = tuple(v for v in pose.position)
-        wxyz = tuple(v for v in pose.quaternion_wxyz)
+        position, wxyz = transforms.matrix_to_pose(pose.matrix)
+        position = tuple(v for v in position)
+        wxyz = tuple(v for v in wxyz)
     else:
         logger.warning("Invalid blueprint %s. Pose is None", bp)
         position = (0.0, 0.0, 0.0)
@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from robits.core.utils import MiscJSONEncoder
+from robits.sim.blueprints import Attachment
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import CameraBlueprint
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import GripperBlueprint
+from robits.sim.blueprints import MeshBlueprint
+from robits.sim.blueprints import Pose
+from robits.sim.blueprints import RobotBlueprint
+from robits.sim.blueprints import RobotDescriptionModel
+
+from mujoco_scene_editor.utils import blueprint_io
+
+
+def _to_json(blueprints) -> str:
+    return json.dumps({"blueprints": blueprints}, cls=MiscJSONEncoder, sort_keys=True)
+
+
+class TestBlueprintIO(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.blueprints = [
+            BlueprintGroup("/table", Pose().with_position([0.1, 0.2, 0.3])),
+            BlueprintGroup("/no_pose"),
+            GeomBlueprint(
+                "/table/box_0001",
+                geom_type="box",
+                pose=Pose().with_euler([0.1, 0.2, 0.3]),
+                size=[0.1, 0.2, 0.3],
+                rgba=[0.1, 0.2, 0.3, 1.0],
+            ),
+            GeomBlueprint("/table/sphere_0002", geom_type="sphere", size=[1], mass=1.5),
+            MeshBlueprint("/table/asset_0003", mesh_path="/tmp/mesh.obj", scale=0.01),
+            CameraBlueprint(
+                "/camera",
+                width=640,
+                height=480,
+                intrinsics=np.identity(3),
+                pose=Pose().with_position([1.0, 0.0, 1.5]),
+            ),
+            GripperBlueprint(
+                "/robot_0004/gripper",
+                model=RobotDescriptionModel("robotiq_2f85_mj_description"),
+            ),
+            RobotBlueprint(
+                "/robot_0004",
+                model=RobotDescriptionModel("panda_mj_description", None, "robot"),
+                pose=Pose(),
+                attachment=Attachment(
+                    "/robot_0004/gripper",
+                    attachment_offset=Pose().with_position([0, 0, 0.1]),
+                ),
+                default_joint_positions=[0.0, 0.5],
+            ),
+        ]
+
+    def _roundtrip(self, suffix: str):
+        path = Path(self.tmp_dir.name) / f"scene{suffix}"
+        blueprint_io.save_blueprints(path, self.blueprints)
+        return blueprint_io.load_blueprints(path)
+
+    def test_binary_roundtrip_matches_json(self):
+        from_json = self._roundtrip(".json")
+        from_binary = self._roundtrip(".npz")
+
+        self.assertEqual(_to_json(from_json), _to_json(from_binary))
+        self.assertEqual(_to_json(self.blueprints), _to_json(from_binary))
+
+    def test_binary_restores_types(self):
+        loaded = {bp.path: bp for bp in self._roundtrip(".npz")}
+
+        self.assertIsNone(loaded["/no_pose"].pose)
+        self.assertEqual(loaded["/table/sphere_0002"].size, [1])
+        self.assertIsNone(loaded["/table/asset_0003"].pose)
+        np.testing.assert_allclose(
+            loaded["/table/box_0001"].pose.matrix, self.blueprints[2].pose.matrix
+        )
+        self.assertIsInstance(loaded["/robot_0004"].attachment, Attachment)
+
+    def test_binary_poses_are_validated_and_independent(self):
+        loaded = {bp.path: bp for bp in self._roundtrip(".npz")}
+        self.assertFalse(
+            np.shares_memory(
+                loaded["/table"].pose.matrix, loaded["/camera"].pose.matrix
+            )
+        )
+
+        path = Path(self.tmp_dir.name) / "scene.npz"
+        with np.load(path) as data:
+            arrays = dict(data)
+        arrays["poses"][0, :3, :3] *= 2.0
+        np.savez(path, **arrays)
+        with self.assertRaises(ValueError):
+            blueprint_io.load_blueprints(path)
+
+        arrays["poses"] = arrays["poses"][:, :3]
+        np.savez(path, **arrays)
+        with self.assertRaises(ValueError):
+            blueprint_io.load_blueprints(path)
+
+    def test_empty_scene(self):
+        self.blueprints = []
+        self.assertEqual(self._roundtrip(".npz"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from dataclasses import replace
+
+import numpy as np
+
+from robits.sim.blueprints import CameraBlueprint
+from robits.sim.blueprints import Pose
+
+from mujoco_scene_editor.camera_preview import CameraPreview
+from mujoco_scene_editor.camera_preview import FrameCache
+from mujoco_scene_editor.camera_preview import PreviewScene
+from mujoco_scene_editor.scene_builder import SceneBuilder
+from mujoco_scene_editor.utils import transforms
+
+
+def _pose(position) -> Pose:
+    return Pose(transforms.pose_to_matrix(position, (1.0, 0.0, 0.0, 0.0)))
+
+
+def _camera(path: str = "/front") -> CameraBlueprint:
+    intrinsics = np.array([[300.0, 0.0, 320.0], [0.0, 300.0, 240.0], [0.0, 0.0, 1.0]])
+    return CameraBlueprint(path, 640, 480, intrinsics, _pose((0.0, 0.0, 2.0)))
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_drops_least_recently_used(self):
+        cache = FrameCache(max_size=2)
+        cache.put("a", np.zeros(1))
+        cache.put("b", np.zeros(1))
+        cache.get("a")
+        cache.put("c", np.zeros(1))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+
+class TestPreviewScene(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        builder = SceneBuilder()
+        with builder.group("table", position=(1.0, 0.0, 0.0)) as table:
+            table.box(name="top", position=(0.0, 0.0, 0.5), is_static=False)
+        self.blueprints = {bp.path: bp for bp in builder.blueprints + [_camera()]}
+        self.scene = PreviewScene()
+        self.scene.update(list(self.blueprints.values()), [])
+        self.scene.forward()
+
+    def test_patches_poses(self):
+        group = replace(self.blueprints["/table"], pose=_pose((2.0, 0.0, 0.0)))
+        camera = replace(self.blueprints["/front"], pose=_pose((0.0, 1.0, 2.0)))
+        self.scene.update([group, camera], [])
+        self.scene.forward()
+
+        model, data = self.scene.model, self.scene.data
+        self.assertEqual(self.scene.num_compiles, 1)
+        np.testing.assert_allclose(
+            data.geom_xpos[model.geom("top").id], (2.0, 0.0, 0.5)
+        )
+        np.testing.assert_allclose(
+            data.cam_xpos[model.camera("front").id], (0.0, 1.0, 2.0)
+        )
+
+    def test_recompiles_on_other_changes(self):
+        top = replace(self.blueprints["/table/top"], rgba=[1.0, 0.0, 0.0, 1.0])
+        self.scene.update([top], [])
+        self.scene.forward()
+        self.assertEqual(self.scene.num_compiles, 2)
+
+        self.scene.update([], ["/table/top"])
+        self.scene.forward()
+        self.assertEqual(self.scene.num_compiles, 3)
+        self.assertEqual(self.scene.model.ngeom, 0)
+
+    def test_scene_with_floor(self):
+        builder = SceneBuilder()
+        builder.box(name="floor", dims=(2.0, 2.0, 0.1), is_static=True)
+        self.scene.update(builder.blueprints, [])
+        self.scene.forward()
+        self.assertEqual(self.scene.model.ngeom, 2)
+
+
+class TestCameraPreview(unittest.TestCase):
+    def test_preview_size(self):
+        preview = CameraPreview(max_width=320)
+        self.assertEqual(preview.preview_size(_camera()), (320, 240))
+
+
+if __name__ == "__main__":
+    unittest.main()
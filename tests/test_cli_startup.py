@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import time
+import unittest
+
+from mujoco_scene_editor.cli.startup_profiler import HEAVY_MODULES
+
+# Generous on purpose: a lazy --help takes well below a second, importing the
+# heavy subsystems takes several.
+HELP_TIME_BUDGET_S = 2.0
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, timeout=60
+    )
+
+
+class TestCliStartup(unittest.TestCase):
+    def test_help_within_time_budget(self):
+        for command in ([], ["edit"], ["new"], ["cache"], ["analyze"]):
+            start_time = time.perf_counter()
+            result = _run_python(
+                "-m", "mujoco_scene_editor.cli.editor_cli", *command, "--help"
+            )
+            elapsed = time.perf_counter() - start_time
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertLess(
+                elapsed,
+                HELP_TIME_BUDGET_S,
+                f"'{' '.join(command)} --help' took {elapsed:.2f}s",
+            )
+
+    def test_cli_does_not_import_heavy_modules(self):
+        result = _run_python(
+            "-c",
+            "import sys; import mujoco_scene_editor.cli.editor_cli; "
+            "print('\\n'.join(sorted(sys.modules)))",
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        loaded = set(result.stdout.split())
+        self.assertEqual([m for m in HEAVY_MODULES if m in loaded], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+from mujoco_scene_editor.constants import NO_SELECTION
+from mujoco_scene_editor.gui.client_session import ClientSession
+from mujoco_scene_editor.gui.outliner import SceneIndex
+
+
+def _make_session(index: SceneIndex) -> ClientSession:
+    return ClientSession(
+        mock.MagicMock(), mock.MagicMock(), index, element_order=0.0, panel_order=1.0
+    )
+
+
+class TestClientSession(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = SceneIndex()
+        self.index.add("/a", "group")
+
+    def test_starts_without_selection(self):
+        session = _make_session(self.index)
+        self.assertEqual(session.selection, NO_SELECTION)
+
+    def test_keeps_selection(self):
+        session = _make_session(self.index)
+        cb = mock.MagicMock()
+        session.on_selection_change(cb)
+        session.select("/a")
+        cb.assert_called_once()
+
+        self.index.add("/b", "geom")
+        session.refresh_elements()
+        self.assertEqual(session.selection, "/a")
+        cb.assert_called_once()
+
+        self.index.remove("/a")
+        session.refresh_elements()
+        self.assertEqual(session.selection, NO_SELECTION)
+        self.assertEqual(cb.call_count, 2)
+
+    def test_remove_gizmo(self):
+        session = _make_session(self.index)
+        gizmo = mock.MagicMock()
+        session.gizmo = gizmo
+
+        session.set_gizmo_visible(False)
+        self.assertFalse(gizmo.visible)
+
+        session.remove_gizmo()
+        gizmo.remove.assert_called_once()
+        self.assertIsNone(session.gizmo)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import Pose
+from mujoco_scene_editor.controller import SceneEditorController
+from mujoco_scene_editor.null_renderer import NullRenderer
+
+
+class TestInteraction(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.controller = SceneEditorController(NullRenderer())
+        self.controller.add_many(
+            [BlueprintGroup("/a", Pose()), BlueprintGroup("/b", Pose())]
+        )
+        self.state = self.controller.state
+
+    def position(self, name: str) -> np.ndarray:
+        return self.state.blueprints[name].pose.position
+
+    def test_drags_are_one_step(self):
+        for x in (1.0, 2.0, 3.0):
+            self.controller.update_pose(
+                "/a", (x, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0), interaction=("pose", "/a")
+            )
+        np.testing.assert_allclose(self.position("/a"), [3.0, 0.0, 0.0])
+
+        self.controller.undo()
+        np.testing.assert_allclose(self.position("/a"), [0.0, 0.0, 0.0])
+        self.assertEqual(len(self.state.history_past), 1)
+
+    def test_other_edit_ends_interaction(self):
+        key = ("pose", "/a")
+        self.controller.update_pose("/a", (1.0, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0), key)
+        self.controller.update_pose("/b", (2.0, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0))
+        self.controller.update_pose("/a", (3.0, 0.0, 0.0), (1.0, 0.0, 0.0, 0.0), key)
+        self.controller.remove("/b")
+
+        self.assertFalse(self.state.in_transaction)
+        self.assertEqual(len(self.state.history_past), 5)
+        self.controller.undo()
+        self.controller.undo()
+        np.testing.assert_allclose(self.position("/a"), [1.0, 0.0, 0.0])
+        np.testing.assert_allclose(self.position("/b"), [2.0, 0.0, 0.0])
+
+    def test_failed_transaction_is_restored(self):
+        with self.assertRaises(ValueError):
+            with self.controller.transaction():
+                self.controller.state.add(BlueprintGroup("/c"))
+                raise ValueError()
+        self.assertEqual(sorted(self.state.blueprints), ["/a", "/b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from mujoco_scene_editor.cli import startup_warning
+from mujoco_scene_editor.inventory.local_assets import Inventory
+from mujoco_scene_editor.utils import disk_cache
+from mujoco_scene_editor.utils.disk_cache import DiskCache
+from mujoco_scene_editor.utils.disk_cache import cached
+from mujoco_scene_editor.utils.disk_cache import fingerprint
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache = DiskCache(str(self.root / "cache"))
+        disk_cache.set_cache(self.cache)
+
+    def tearDown(self) -> None:
+        disk_cache.set_cache(None)
+        self.cache.close()
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def test_versions_and_dependencies(self):
+        assets = self.root / "assets"
+        assets.mkdir()
+        calls = []
+
+        @cached("listing", key=lambda root: str(root), deps=lambda root: [root])
+        def listing(root: Path):
+            calls.append(root)
+            return sorted(p.name for p in root.iterdir())
+
+        self.assertEqual(listing(assets), [])
+        self.assertEqual(listing(assets), [])
+        self.assertEqual(len(calls), 1)
+
+        (assets / "mug.obj").touch()
+        os.utime(assets, ns=(time.time_ns(), time.time_ns() + 1000))
+        self.assertEqual(listing(assets), ["mug.obj"])
+        self.assertEqual(listing(assets, refresh_cache=True), ["mug.obj"])
+        self.assertEqual(listing(assets, skip_cache=True), ["mug.obj"])
+        self.assertEqual(len(calls), 4)
+
+        self.cache.put("listing", "old", 1, version=1)
+        self.assertEqual(self.cache.get("listing", "old", version=2), (False, None))
+
+        (stats,) = self.cache.stats()
+        self.assertEqual((stats.namespace, stats.hits, stats.misses), ("listing", 1, 3))
+
+    def test_prune_and_clear(self):
+        self.cache.put("a", "expired", 1, max_age=-1.0)
+        self.cache.put("a", "stale", 2, deps=fingerprint([self.root / "missing"]))
+        (self.root / "missing").touch()
+        self.cache.put("b", "old", "x" * 1000)
+        self.cache.put("b", "new", "x" * 1000)
+        self.assertEqual(self.cache.prune(max_mb=1500 / 1024 / 1024), 3)
+        self.assertEqual(self.cache.get("b", "new"), (True, "x" * 1000))
+
+        self.assertEqual(self.cache.clear("b"), 1)
+        self.assertEqual([s.namespace for s in self.cache.stats()], ["a"])
+
+    def test_asset_listing_sees_subdirectories(self):
+        nested = self.root / "assets" / "kitchen" / "cups"
+        nested.mkdir(parents=True)
+        inventory = Inventory()
+        self.assertEqual(inventory.list(self.root / "assets"), [])
+
+        (nested / "mug.obj").touch()
+        os.utime(nested, ns=(time.time_ns(), time.time_ns() + 1000))
+        self.assertEqual(inventory.list_names(self.root / "assets"), ["mug"])
+
+    def test_first_start_message_survives_clear(self):
+        with mock.patch.object(startup_warning, "print") as print_message:
+            startup_warning.print_first_start_info("python", self.cache.cache_dir)
+            startup_warning.print_first_start_info("python", self.cache.cache_dir)
+            self.cache.clear()
+            self.cache.prune(max_mb=0.0)
+            startup_warning.print_first_start_info("python", self.cache.cache_dir)
+        print_message.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from robits.sim.blueprints import BlueprintGroup
+from mujoco_scene_editor.history import History
+from mujoco_scene_editor.history import NUM_UNCOMPRESSED
+
+
+def make_snapshot(i: int, num_elements: int = 50):
+    return {f"/g{i}_{j}": BlueprintGroup(f"/g{i}_{j}") for j in range(num_elements)}
+
+
+class TestHistory(unittest.TestCase):
+    def test_undo_redo(self):
+        history = History()
+        history.push(make_snapshot(0))
+        history.push(make_snapshot(1))
+
+        self.assertEqual(history.undo(make_snapshot(2)), make_snapshot(1))
+        self.assertEqual(history.undo(make_snapshot(1)), make_snapshot(0))
+        self.assertIsNone(history.undo(make_snapshot(0)))
+        self.assertEqual(history.redo(make_snapshot(0)), make_snapshot(1))
+        self.assertEqual(len(history.past), 1)
+        self.assertEqual(len(history.future), 1)
+
+        history.push(make_snapshot(3))
+        self.assertListEqual(history.future, [])
+
+    def test_older_entries_are_compressed(self):
+        history = History()
+        for i in range(5):
+            history.push(make_snapshot(i))
+        self.assertListEqual(
+            [e.is_compressed for e in history.past],
+            [True] * (5 - NUM_UNCOMPRESSED) + [False] * NUM_UNCOMPRESSED,
+        )
+        self.assertEqual(history.undo({}), make_snapshot(4))
+
+    def test_max_entries(self):
+        history = History(max_entries=3)
+        for i in range(10):
+            history.push(make_snapshot(i))
+        self.assertEqual(len(history), 3)
+        history.undo({})
+        history.undo({})
+        self.assertEqual(history.undo({}), make_snapshot(7))
+        self.assertIsNone(history.undo({}))
+
+    def test_spill(self):
+        history = History(max_bytes=1)
+        for i in range(5):
+            history.push(make_snapshot(i))
+        self.assertEqual(history.memory_bytes, 0)
+        self.assertGreater(history.disk_bytes, 0)
+        self.assertIn("on disk", history.summary())
+
+        for i in reversed(range(5)):
+            self.assertEqual(history.undo({}), make_snapshot(i))
+        for i in range(5):
+            self.assertEqual(history.redo({}), {})
+
+        history.clear()
+        self.assertEqual(history.disk_bytes, 0)
+
+    def test_spill_file_is_compacted(self):
+        history = History(max_bytes=1, max_entries=10)
+        for i in range(10):
+            history.push(make_snapshot(i))
+        for _ in range(20):
+            for _ in range(5):
+                history.undo({})
+            for _ in range(5):
+                history.redo({})
+            self.assertLessEqual(history._spill_size, 2 * history.disk_bytes)
+
+        for i in reversed(range(10)):
+            undone = history.undo({})
+            self.assertEqual(undone, make_snapshot(i) if i < 5 else {})
+
+    def test_drop_without_spill(self):
+        history = History(max_bytes=2000, spill=False)
+        for i in range(10):
+            history.push(make_snapshot(i))
+        self.assertLessEqual(history.memory_bytes, 2000)
+        self.assertEqual(history.disk_bytes, 0)
+        self.assertGreater(len(history), 0)
+        self.assertEqual(history.undo({}), make_snapshot(9))
@@ -0,0 +1,133 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import GeomBlueprint
+from robits.sim.blueprints import Pose
+
+from mujoco_scene_editor import journal
+from mujoco_scene_editor.journal import Journal
+from mujoco_scene_editor.state import State
+
+
+def _box(path: str) -> GeomBlueprint:
+    return GeomBlueprint(
+        path,
+        geom_type="box",
+        pose=Pose(),
+        size=[0.1, 0.1, 0.1],
+        rgba=[1.0, 0.0, 0.0, 1.0],
+    )
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.state = State()
+        self.state.journal = Journal(self.root, checkpoint_delay=60.0)
+        self.directory = self.state.journal.directory
+
+    def tearDown(self) -> None:
+        self.state.journal.close()
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def _edit(self) -> None:
+        self.state.load([BlueprintGroup("/table")])
+        self.state.add(_box("/table/box"))
+        self.state.add(_box("/other"))
+        self.state.update("/table/box", pose=Pose().with_position([1.0, 2.0, 3.0]))
+        self.state.remove("/other")
+
+    def _assert_recovered(self, blueprints=None) -> None:
+        if blueprints is None:
+            blueprints = journal.load_session(self.directory)
+        recovered = {bp.path: bp for bp in blueprints}
+        self.assertEqual(sorted(recovered), ["/table", "/table/box"])
+        np.testing.assert_allclose(
+            recovered["/table/box"].pose.position, [1.0, 2.0, 3.0]
+        )
+
+    def test_replays_log(self):
+        self._edit()
+        self.state.journal.flush()
+        # operations after the checkpoint of the load are only in the log
+        self.assertEqual(len(list(self.directory.glob("checkpoint-*.npz"))), 1)
+        self._assert_recovered()
+
+    def test_checkpoint_on_close(self):
+        self._edit()
+        self.state.journal.close()
+        self.assertEqual((self.directory / journal.LOG_NAME).read_text(), "")
+        self._assert_recovered()
+
+    def test_undo(self):
+        self._edit()
+        self.state.add(_box("/table/box_2"))
+        self.state.undo()
+        self.state.journal.flush()
+        self._assert_recovered()
+
+    def test_ignores_incomplete_line(self):
+        self._edit()
+        self.state.journal.flush()
+        with open(self.directory / journal.LOG_NAME, "a", encoding="utf-8") as f:
+            f.write('{"seq":99,"op":"put","bp":{"cla')
+        self._assert_recovered()
+
+    def test_saved_scene_is_not_recovered(self):
+        self._edit()
+        self.state.journal.mark_saved()
+        self.state.journal.flush()
+        self.assertIsNone(journal.load_session(self.directory))
+
+        self.state.add(_box("/later"))
+        self.state.journal.flush()
+        self.assertEqual(len(journal.load_session(self.directory)), 3)
+
+    def test_saved_session_is_removed_on_close(self):
+        self._edit()
+        self.state.journal.mark_saved()
+        self.state.journal.close()
+        self.assertFalse(self.directory.exists())
+        self.assertIsNone(journal.recover(self.root))
+
+    def test_nothing_to_recover(self):
+        self.assertIsNone(journal.recover(self.root / "missing"))
+
+    def test_running_session_is_not_recovered(self):
+        self._edit()
+        self.state.journal.flush()
+        self.assertIsNone(journal.recover(self.root))
+
+        self.state.journal.close()
+        self._assert_recovered(journal.recover(self.root))
+
+    def test_new_session_keeps_running_session(self):
+        self._edit()
+        self.state.journal.flush()
+        other = Journal(self.root, checkpoint_delay=60.0)
+        try:
+            self.assertNotEqual(other.directory, self.directory)
+            self._assert_recovered()
+        finally:
+            other.close()
+
+    def test_new_session_removes_stopped_session(self):
+        self._edit()
+        self.state.journal.close()
+        other = Journal(self.root, checkpoint_delay=60.0)
+        try:
+            self.assertFalse(self.directory.exists())
+            self.assertIsNone(journal.recover(self.root))
+        finally:
+            other.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
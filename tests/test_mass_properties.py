@@ -0,0 +1,94 @@
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import trimesh
+
+from robits.sim import mjcf_utils
+from robits.sim.model_factory import SceneBuilder as ModelBuilder
+
+from mujoco_scene_editor.inventory.mesh_index import MeshIndex
+from mujoco_scene_editor.scene_builder import SceneBuilder
+from mujoco_scene_editor.utils.mass_properties import apply_mass_properties
+from mujoco_scene_editor.utils.mass_properties import combine
+from mujoco_scene_editor.utils.mass_properties import mesh_mass_properties
+from mujoco_scene_editor.utils.mass_properties import primitive_mass_properties
+
+
+class TestMassProperties(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def test_primitives(self):
+        box = primitive_mass_properties("box", (0.5, 1.0, 1.5))
+        self.assertAlmostEqual(box.volume, 6.0)
+        np.testing.assert_allclose(box.inertia[:3], (6.5, 5.0, 2.5))
+
+        sphere = primitive_mass_properties("sphere", (1.0,))
+        self.assertAlmostEqual(sphere.volume, 4.0 / 3.0 * math.pi)
+        self.assertAlmostEqual(sphere.inertia[0], 0.4 * sphere.volume)
+        self.assertIsNone(primitive_mass_properties("plane", (1.0, 1.0, 0.1)))
+
+    def test_mesh_falls_back_to_convex_hull(self):
+        box = trimesh.creation.box((2.0, 2.0, 2.0))
+        box.export(self.root / "box.stl")
+        props = mesh_mass_properties(self.root / "box.stl", scale=0.5)
+        self.assertFalse(props.is_convex_hull)
+        self.assertAlmostEqual(props.volume, 1.0)
+
+        open_box = trimesh.Trimesh(box.vertices, box.faces[:-2])
+        open_box.export(self.root / "open_box.stl")
+        props = mesh_mass_properties(self.root / "open_box.stl")
+        self.assertTrue(props.is_convex_hull)
+        self.assertAlmostEqual(props.volume, 8.0)
+
+    def test_combine(self):
+        inertia = np.diag((1.0, 1.0, 1.0))
+        mass, center, combined = combine(
+            [
+                (1.0, np.array((1.0, 0.0, 0.0)), inertia),
+                (1.0, np.array((-1.0, 0.0, 0.0)), inertia),
+            ]
+        )
+        self.assertEqual(mass, 2.0)
+        np.testing.assert_allclose(center, np.zeros(3))
+        np.testing.assert_allclose(np.diag(combined), (2.0, 4.0, 4.0))
+
+    def test_apply_to_model(self):
+        scene = SceneBuilder()
+        scene.box("crate", dims=(0.2, 0.2, 0.2), position=(0.0, 0.0, 0.5))
+        scene.box("floor", dims=(1.0, 1.0, 0.1), is_static=True)
+        blueprints = scene.blueprints
+
+        builder = ModelBuilder(add_floor=False)
+        builder.build_from_blueprints(blueprints)
+        self.assertEqual(apply_mass_properties(builder, blueprints, 500.0, {}), 1)
+        model = mjcf_utils.reload_model_with_assets(builder.scene)
+        body = model.geom("crate").bodyid[0]
+        self.assertAlmostEqual(model.body_mass[body], 4.0)
+        np.testing.assert_allclose(model.body_inertia[body], [4.0 * 0.02 / 3.0] * 3)
+
+    def test_cached_in_mesh_index(self):
+        trimesh.creation.box((1.0, 1.0, 1.0)).export(self.root / "box.stl")
+        key = (self.root / "box.stl", 0.1)
+        index = MeshIndex(str(self.root / "index.sqlite"))
+        try:
+            first = index.mass_properties([key])[key]
+            (self.root / "box.stl").unlink()
+            trimesh.creation.box((1.0, 1.0, 1.0)).export(self.root / "box.stl")
+            self.assertEqual(index.mass_properties([key])[key], first)
+        finally:
+            index.close()
+        self.assertAlmostEqual(first.volume, 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
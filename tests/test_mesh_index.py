@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import trimesh
+
+from mujoco_scene_editor.inventory.mesh_index import FALLBACK_SCALE
+from mujoco_scene_editor.inventory.mesh_index import MeshIndex
+from mujoco_scene_editor.inventory.mesh_index import infer_unit_scale
+
+
+class TestMeshIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.index = MeshIndex(str(self.root / "index.sqlite"))
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def _box(self, name: str, extents) -> Path:
+        mesh_path = self.root / name
+        trimesh.creation.box(extents).export(mesh_path)
+        return mesh_path
+
+    def test_infer_unit_scale(self):
+        self.assertEqual(infer_unit_scale(0.3), 1.0)
+        self.assertEqual(infer_unit_scale(30.0), 0.01)
+        self.assertEqual(infer_unit_scale(300.0), 0.001)
+
+    def test_stats_once_per_content(self):
+        mug = self._box("mug.stl", (10.0, 10.0, 12.0))
+        copy = self.root / "copy.stl"
+        copy.write_bytes(mug.read_bytes())
+        self.assertIsNone(self.index.stats_for(mug))
+
+        self.assertEqual(self.index.update([mug, copy], max_workers=1), 1)
+        self.assertEqual(self.index.update([mug, copy], max_workers=1), 0)
+        stats = self.index.stats_for(copy)
+        self.assertEqual(stats, self.index.stats_for(mug))
+        self.assertEqual(stats.num_triangles, 12)
+        self.assertTrue(stats.is_watertight)
+        self.assertAlmostEqual(stats.volume, 1200.0)
+        self.assertAlmostEqual(stats.extent, 12.0)
+
+    def test_default_scale(self):
+        mug = self._box("mug.stl", (10.0, 10.0, 12.0))
+        other_mug = self._box("other_mug.stl", (1.0, 1.0, 1.0))
+        self.index.update([mug, other_mug], max_workers=1)
+        self.index.set_objects(
+            [("a", "mug", mug), ("b", "mug", other_mug), ("c", "mug", None)]
+        )
+
+        self.assertEqual(self.index.default_scale("c"), FALLBACK_SCALE)
+        self.assertEqual(self.index.default_scale("a", mug, "mug"), 0.01)
+
+        self.index.set_scale_override("a", 0.01)
+        self.assertAlmostEqual(self.index.class_size("mug"), 0.12)
+        self.assertAlmostEqual(self.index.default_scale("b", other_mug, "mug"), 0.12)
+
+        index = MeshIndex(self.index.db_path)
+        self.assertEqual(index.scale_override("a"), 0.01)
+        index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from mujoco_scene_editor import metrics
+
+
+@metrics.timed("test.op")
+def _operation(x):
+    return x * 2
+
+
+@metrics.timed_callback
+def _callback():
+    return metrics.registry.queue_depth
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        was_enabled = metrics.is_enabled()
+        self.addCleanup(metrics.enable, was_enabled)
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+
+        self.assertEqual(_operation(2), 4)
+        metrics.increment("counter")
+
+        self.assertEqual(metrics.registry.histograms, {})
+        self.assertEqual(metrics.registry.counters, {})
+
+    def test_enabled_records_calls(self):
+        metrics.enable(True)
+
+        for i in range(3):
+            _operation(i)
+        metrics.increment("counter", 2)
+
+        snapshot = metrics.registry.snapshot()
+        self.assertEqual(snapshot["operations"]["test.op"]["count"], 3)
+        self.assertEqual(snapshot["counters"], {"counter": 2})
+
+    def test_callback_tracks_queue_depth(self):
+        metrics.enable(True)
+
+        self.assertEqual(_callback(), 1)
+        self.assertEqual(metrics.registry.queue_depth, 0)
+        self.assertEqual(metrics.registry.max_queue_depth, 1)
+        self.assertIn("_callback", metrics.registry.histograms)
+
+    def test_histogram_percentiles(self):
+        histogram = metrics.Histogram()
+        for duration_ms in [0.05] * 90 + [50.0] * 10:
+            histogram.record(duration_ms)
+
+        # bucket upper bound, capped by the maximum
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertEqual(histogram.percentile(95), 50.0)
+        self.assertAlmostEqual(histogram.mean_ms, 5.045)
+
+    def test_write(self):
+        metrics.enable(True)
+        _operation(1)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "metrics" / "metrics.json"
+            metrics.registry.write(path)
+            data = json.loads(path.read_text())
+
+        self.assertEqual(data["operations"]["test.op"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from pathlib import Path
+
+from mujoco_scene_editor.inventory.objaverse_catalog import ObjaverseCatalog
+from mujoco_scene_editor.inventory.objaverse_catalog import match_expression
+
+
+class TestObjaverseCatalog(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.catalog = ObjaverseCatalog(":memory:")
+        annotations = {
+            "mug": [f"{i:04d}mug" for i in range(120)],
+            "coffee_table": ["table0001", "table0002"],
+        }
+        local_paths = {
+            "table0001": Path("/cache/table0001/oak_table.glb"),
+            "extra0001": Path("/cache/extra0001/teapot.glb"),
+        }
+        self.assertEqual(self.catalog.build(annotations, local_paths), 123)
+
+    def tearDown(self) -> None:
+        self.catalog.close()
+        super().tearDown()
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression(' red "mug '), '"red"* "mug"*')
+        self.assertEqual(match_expression("  "), "")
+
+    def test_pages(self):
+        page = self.catalog.search(label="mug", offset=100, limit=50)
+        self.assertEqual((page.offset, page.total, len(page.items)), (100, 120, 20))
+        # out of range offsets are clamped to the last page
+        page = self.catalog.search(label="mug", offset=500, limit=50)
+        self.assertEqual(page.offset, 100)
+
+        names = [item.name for item in self.catalog.search(label="mug").items]
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_search(self):
+        page = self.catalog.search("oak")
+        self.assertEqual([item.uid for item in page.items], ["table0001"])
+        self.assertEqual(self.catalog.search("coff").total, 2)
+        self.assertEqual(self.catalog.search("tea").items[0].label, None)
+        self.assertEqual(self.catalog.search("table", label="mug").total, 0)
+
+    def test_paths(self):
+        self.assertEqual(self.catalog.labels(), ["coffee_table", "mug"])
+        self.catalog.set_paths({"0003mug": Path("/cache/mug0003/mug.glb")})
+        uids = sorted(item.uid for item in self.catalog.local_items())
+        self.assertEqual(uids, ["0003mug", "extra0001", "table0001"])
+        # the catalog is only extended by later builds
+        self.assertEqual(self.catalog.build({"mug": ["0000mug", "9999mug"]}), 1)
+        self.assertEqual(len(self.catalog), 124)
+
+
+if __name__ == "__main__":
+    unittest.main()
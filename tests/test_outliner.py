@@ -0,0 +1,143 @@
+import unittest
+from unittest import mock
+
+from mujoco_scene_editor.gui.outliner import OutlinerPanel
+from mujoco_scene_editor.gui.outliner import OutlinerView
+from mujoco_scene_editor.gui.outliner import SceneIndex
+
+
+def _make_gui() -> mock.MagicMock:
+    gui = mock.MagicMock()
+    gui.add_checkbox.return_value = mock.MagicMock(value=False)
+    return gui
+
+
+def _make_index() -> SceneIndex:
+    index = SceneIndex()
+    index.add("/table", "group")
+    for i in range(5):
+        index.add(f"/table/box_{i}", "geom")
+    index.add("/robot", "robot")
+    return index
+
+
+class TestSceneIndex(unittest.TestCase):
+    def test_children_are_sorted(self):
+        index = _make_index()
+        self.assertEqual(index.children(), ("/robot", "/table"))
+        self.assertEqual(len(index.children("/table")), 5)
+
+    def test_adopts_children_added_earlier(self):
+        index = SceneIndex()
+        index.add("/g/a")
+        index.add("/g/b")
+        self.assertEqual(index.children(), ("/g/a", "/g/b"))
+
+        index.add("/g", "group")
+        self.assertEqual(index.children(), ("/g",))
+        self.assertEqual(index.children("/g"), ("/g/a", "/g/b"))
+        self.assertEqual(index.parent("/g/a"), "/g")
+
+    def test_remove_subtree(self):
+        index = _make_index()
+        index.remove("/table")
+        self.assertEqual(len(index), 1)
+        self.assertNotIn("/table/box_0", index)
+        self.assertEqual(index.children(), ("/robot",))
+
+    def test_search(self):
+        index = _make_index()
+        self.assertEqual(index.search("BOX_1"), ["/table/box_1"])
+        self.assertEqual(index.search(kind="robot"), ["/robot"])
+        self.assertEqual(len(index.search("box", "geom")), 5)
+        self.assertEqual(index.search("box", "robot"), [])
+
+
+class TestOutlinerView(unittest.TestCase):
+    def test_expand_and_page(self):
+        view = OutlinerView(_make_index(), page_size=3)
+        self.assertEqual([r.path for r in view.rows()], ["/robot", "/table"])
+
+        view.toggle("/table")
+        self.assertEqual(view.num_pages, 3)
+        rows = view.rows()
+        self.assertEqual(rows[1].path, "/table")
+        self.assertTrue(rows[1].expanded)
+        self.assertEqual(rows[2].depth, 1)
+
+        view.set_page(10)
+        self.assertEqual(view.page, 2)
+        self.assertEqual([r.path for r in view.rows()], ["/table/box_4"])
+
+    def test_reveal(self):
+        view = OutlinerView(_make_index(), page_size=3)
+        view.reveal("/table/box_3")
+        self.assertIn("/table", view.expanded)
+        self.assertIn("/table/box_3", [r.path for r in view.rows()])
+
+    def test_filter(self):
+        view = OutlinerView(_make_index(), page_size=3)
+        view.set_filter("box")
+        self.assertEqual(view.num_pages, 2)
+        self.assertTrue(all(r.depth == 0 for r in view.rows()))
+
+    def test_sees_index_changes(self):
+        index = _make_index()
+        view = OutlinerView(index)
+        self.assertEqual(len(view.visible_paths()), 2)
+        index.add("/camera", "camera")
+        self.assertEqual(len(view.visible_paths()), 3)
+
+
+class TestOutlinerPanel(unittest.TestCase):
+    def test_updates_changed_rows_only(self):
+        index = _make_index()
+        gui = _make_gui()
+        buttons = [mock.MagicMock(name=f"row_{i}") for i in range(4)]
+        gui.add_button.side_effect = [mock.MagicMock() for _ in range(3)] + buttons
+        panel = OutlinerPanel(gui, index, mock.MagicMock(), num_rows=4)
+
+        self.assertIn("robot", buttons[0].label)
+        self.assertIn("table", buttons[1].label)
+
+        for button in buttons:
+            button.reset_mock()
+        index.add("/zebra", "geom")
+        panel.refresh()
+
+        # only the new row is sent
+        self.assertIn("zebra", buttons[2].label)
+        self.assertTrue(buttons[2].visible)
+        self.assertEqual(buttons[0].mock_calls, [])
+        self.assertEqual(buttons[1].mock_calls, [])
+
+    def test_click_selects_and_expands(self):
+        index = _make_index()
+        on_click = mock.MagicMock()
+        panel = OutlinerPanel(_make_gui(), index, on_click, num_rows=4)
+
+        panel._on_row_click(1)
+        on_click.assert_called_once_with("/table")
+        self.assertIn("/table", panel.view.expanded)
+
+    def test_multi_select(self):
+        index = _make_index()
+        on_click = mock.MagicMock()
+        panel = OutlinerPanel(_make_gui(), index, on_click, num_rows=4)
+
+        panel.multi_select.value = True
+        panel._on_row_click(0)
+        self.assertEqual(panel.marked, {"/robot"})
+        on_click.assert_not_called()
+
+        panel.selection = "/table"
+        panel.mark_children("/table")
+        self.assertEqual(len(panel.marked), 6)
+
+        index.remove("/table")
+        panel.refresh()
+        self.assertEqual(panel.marked, {"/robot"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+
+from mujoco_scene_editor.utils.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.calls = []
+        self.delivered = threading.Event()
+
+    def _record(self, value):
+        self.calls.append(value)
+        self.delivered.set()
+
+    def test_first_update_is_sent_immediately(self):
+        limiter = RateLimiter(self._record, rate_hz=10.0)
+        limiter.submit(1)
+        self.assertEqual(self.calls, [1])
+        self.assertEqual(limiter.sent, 1)
+
+    def test_coalesces_and_delivers_last(self):
+        limiter = RateLimiter(self._record, rate_hz=10.0)
+        limiter.submit(0)
+        self.delivered.clear()
+        for i in range(1, 20):
+            limiter.submit(i)
+
+        self.assertEqual(self.calls, [0])
+        self.assertTrue(self.delivered.wait(timeout=2.0))
+        self.assertEqual(self.calls, [0, 19])
+        self.assertEqual(limiter.sent, 2)
+        self.assertEqual(limiter.dropped, 18)
+
+    def test_flush(self):
+        limiter = RateLimiter(self._record, rate_hz=1.0)
+        limiter.submit(0)
+        limiter.submit(1)
+        limiter.flush()
+        self.assertEqual(self.calls, [0, 1])
+
+        # nothing pending
+        limiter.flush()
+        self.assertEqual(self.calls, [0, 1])
+
+    def test_slow_callback_is_serialized(self):
+        in_flight = []
+        max_in_flight = []
+        lock = threading.Lock()
+
+        def slow(value):
+            with lock:
+                in_flight.append(value)
+                max_in_flight.append(len(in_flight))
+            time.sleep(0.03)
+            with lock:
+                in_flight.remove(value)
+            self.calls.append(value)
+
+        # the callback is slower than the period, so deliveries from the timer
+        # and from both threads would overlap
+        limiter = RateLimiter(slow, rate_hz=100.0)
+
+        def drag(values):
+            for value in values:
+                limiter.submit(value)
+                time.sleep(0.004)
+
+        threads = [
+            threading.Thread(target=drag, args=(range(i, 60, 2),)) for i in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        limiter.submit(60)
+        limiter.flush()
+
+        self.assertEqual(max(max_in_flight), 1)
+        self.assertEqual(self.calls[-1], 60)
+        for parity in range(2):
+            values = [v for v in self.calls if v % 2 == parity]
+            self.assertEqual(values, sorted(values))
+
+    def test_cancel(self):
+        limiter = RateLimiter(self._record, rate_hz=20.0)
+        limiter.submit(0)
+        limiter.submit(1)
+        limiter.cancel()
+        time.sleep(0.1)
+        self.assertEqual(self.calls, [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import mujoco
+
+from mujoco_scene_editor.scene_analysis import analyze_blueprints
+from mujoco_scene_editor.scene_analysis import analyze_file
+from mujoco_scene_editor.scene_analysis import potential_contact_pairs
+from mujoco_scene_editor.scene_builder import SceneBuilder
+
+XML = """
+<mujoco>
+  <worldbody>
+    <geom name="floor" type="plane" size="1 1 0.1"/>
+    <geom name="wall" type="box" size="0.1 1 1" pos="1 0 1"/>
+    <body name="robot" pos="0 0 1">
+      <freejoint/>
+      <geom name="base" type="box" size="0.1 0.1 0.1"/>
+      <geom name="plate" type="box" size="0.2 0.2 0.01"/>
+      <body name="arm" pos="0 0 0.2">
+        <joint type="hinge"/>
+        <geom name="link" type="capsule" size="0.02 0.1"/>
+      </body>
+    </body>
+    <body name="ghost" pos="0 0 2">
+      <freejoint/>
+      <geom name="ghost" type="sphere" size="0.1" contype="0" conaffinity="0"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+class TestSceneAnalysis(unittest.TestCase):
+    def test_potential_contact_pairs(self):
+        model = mujoco.MjModel.from_xml_string(XML)
+        can_collide = potential_contact_pairs(model)
+        self.assertTrue((can_collide == can_collide.T).all())
+
+        def pair(a, b):
+            return can_collide[model.geom(a).id, model.geom(b).id]
+
+        # static geoms, geoms of the same body and a parent and its child are
+        # filtered
+        self.assertFalse(pair("floor", "wall"))
+        self.assertFalse(pair("base", "plate"))
+        self.assertFalse(pair("base", "link"))
+        self.assertFalse(pair("floor", "ghost"))
+        self.assertTrue(pair("floor", "base"))
+        self.assertTrue(pair("wall", "link"))
+        self.assertEqual(can_collide.sum() // 2, 6)
+
+    def test_analyze_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "scene.xml"
+            path.write_text(XML)
+            report = analyze_file(path, num_steps=0)
+        self.assertEqual((report.nbody, report.ngeom, report.ndof), (4, 6, 13))
+        self.assertEqual(report.contact_pairs, 6)
+        self.assertIsNone(report.steps_per_s)
+        names = {e.name: e for e in report.elements}
+        self.assertEqual(names["robot"].num_geoms, 3)
+        self.assertEqual(names["floor"].contact_pairs, 3)
+
+    def test_analyze_blueprints(self):
+        scene = SceneBuilder()
+        scene.box("table", dims=(1.0, 1.0, 0.1), is_static=True)
+        scene.box("crate", dims=(0.2, 0.2, 0.2), position=(0.0, 0.0, 0.15))
+        report = analyze_blueprints(scene.blueprints, num_steps=200)
+
+        self.assertEqual(report.num_dynamic_bodies, 1)
+        self.assertEqual(report.contact_pairs, 1)
+        self.assertGreater(report.steps_per_s, 0.0)
+        self.assertGreater(report.contacts_per_step, 0.0)
+        crate = next(e for e in report.elements if e.name.endswith("crate"))
+        self.assertTrue(crate.is_dynamic)
+        self.assertTrue(any("static" in s for s in crate.suggestions))
+
+        markdown = report.to_markdown()
+        self.assertIn("| Element |", markdown)
+        self.assertIn(crate.name, markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
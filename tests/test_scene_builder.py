@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from robits.sim.blueprints import BlueprintGroup
+from mujoco_scene_editor.scene_builder import SceneBuilder
+
+
+class TestSceneBuilder(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.scene = SceneBuilder()
+
+    def test_group(self):
+        with self.scene.group("table", position=(0.0, 0.0, 0.5)) as table:
+            table.box("top", dims=(1.0, 0.5, 0.1))
+            table.sphere()
+
+        names = sorted(bp.path for bp in self.scene.blueprints)
+        self.assertEqual(names, ["/table", "/table/sphere_0000", "/table/top"])
+        top = self.scene.controller.state.blueprints["/table/top"]
+        np.testing.assert_allclose(top.size, [0.5, 0.25, 0.05])
+
+    def test_duplicate_name(self):
+        self.scene.box("foo")
+        with self.assertRaises(ValueError):
+            self.scene.sphere("foo")
+
+    def test_auto_names_are_unique(self):
+        for _ in range(10):
+            self.scene.box()
+        self.assertEqual(len({bp.path for bp in self.scene.blueprints}), 10)
+
+    def test_bulk_insert_has_no_history(self):
+        for i in range(100):
+            self.scene.box(position=(i, 0.0, 0.0))
+        self.scene.flush()
+        self.assertEqual(len(self.scene), 100)
+        self.assertListEqual(self.scene.controller.state.history_past, [])
+
+    def test_keep_history(self):
+        scene = SceneBuilder(keep_history=True)
+        scene.box("a").box("b")
+        scene.flush()
+        scene.translate(["/a"], (1.0, 0.0, 0.0))
+
+        state = scene.controller.state
+        self.assertEqual(len(state.history_past), 2)
+        state.undo()
+        np.testing.assert_allclose(
+            state.blueprints["/a"].pose.position, [0.0, 0.0, 0.0]
+        )
+
+    def test_move_and_reparent(self):
+        self.scene.group("g", position=(1.0, 0.0, 0.0))
+        self.scene.sphere("s", position=(1.0, 2.0, 0.0))
+        self.scene.reparent(["/s"], "/g")
+
+        bps = self.scene.controller.state.blueprints
+        np.testing.assert_allclose(bps["/g/s"].pose.position, [0.0, 2.0, 0.0])
+
+        self.scene.move("/g", position=(0.0, 0.0, 1.0))
+        np.testing.assert_allclose(bps["/g"].pose.position, [0.0, 0.0, 1.0])
+
+    def test_save_and_load(self):
+        self.scene.add(BlueprintGroup("/foo")).box("bar")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "scene.json"
+            self.scene.save(path)
+
+            other = SceneBuilder().load(path)
+        self.assertEqual(sorted(bp.path for bp in other.blueprints), ["/bar", "/foo"])
+        other.box()
+        self.assertIn("/box_0002", [bp.path for bp in other.blueprints])
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+from mujoco_scene_editor import scene_prompt
+from mujoco_scene_editor.utils import disk_cache
+from mujoco_scene_editor.utils.disk_cache import DiskCache
+
+SCENE = (
+    '<mujoco><worldbody><geom name="table" type="box" size="1 1 0.1"/>'
+    "</worldbody></mujoco>"
+)
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in for a chat completions endpoint that answers after a delay.
+    """
+
+    requests = []
+    delay_s = 0.2
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        cls = type(self)
+        with cls.lock:
+            self.requests.append(prompt)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(self.delay_s)
+        with cls.lock:
+            cls.in_flight -= 1
+        if "broken" in prompt:
+            content = SCENE.replace("box", "cone")
+        elif "chat" in prompt:
+            content = "Sorry, I can only describe the scene."
+        else:
+            content = f"Here is the scene:\n```xml\n{SCENE}\n```"
+        data = json.dumps(
+            {
+                "id": "chatcmpl-0",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }
+                ],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScenePrompt(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache = DiskCache(str(self.root / "cache"))
+        disk_cache.set_cache(self.cache)
+
+        _ChatHandler.requests = []
+        _ChatHandler.max_in_flight = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        disk_cache.set_cache(None)
+        self.cache.close()
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def _generate(self, prompts):
+        return asyncio.run(
+            scene_prompt.generate_scenes(
+                prompts, self.root / "out", "stand-in", self.base_url, concurrency=4
+            )
+        )
+
+    def test_load_prompts(self):
+        (self.root / "kitchen.txt").write_text("A   small\nkitchen.")
+        (self.root / "logged.txt").write_text(
+            "'json_data': {'messages': [{'role': 'user', 'content': [\n"
+            "{'type': 'text', 'text': \"\\nGenerate a scene\"},\n"
+            "{'type': 'text', 'text': 'A chess\n      game.'\n}]}]}"
+        )
+        prompts = scene_prompt.load_prompts(self.root)
+        self.assertEqual(
+            prompts, {"kitchen": "A small kitchen.", "logged": "A chess game."}
+        )
+
+        (self.root / "list.md").write_text("A gym.\n\nA lab.\n")
+        prompts = scene_prompt.load_prompts(self.root / "list.md")
+        self.assertEqual(prompts, {"list_000": "A gym.", "list_001": "A lab."})
+
+    def test_concurrent_requests_and_cache(self):
+        prompts = {f"scene_{i}": f"Scene number {i}." for i in range(8)}
+        prompts["broken"] = "A broken scene."
+        prompts["chat"] = "A chat."
+
+        results = self._generate(prompts)
+        # requests overlap, but never more than the concurrency limit
+        self.assertGreater(_ChatHandler.max_in_flight, 1)
+        self.assertLessEqual(_ChatHandler.max_in_flight, 4)
+        self.assertEqual([r.name for r in results], list(prompts))
+        self.assertEqual(sum(r.is_valid for r in results), 8)
+        by_name = {r.name: r for r in results}
+        self.assertIn("cone", by_name["broken"].error)
+        self.assertIsNone(by_name["chat"].output_path)
+        self.assertTrue((self.root / "out" / "scene_0.xml").is_file())
+
+        results = self._generate(prompts)
+        self.assertEqual(len(_ChatHandler.requests), len(prompts))
+        self.assertTrue(all(r.is_cached for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 import unittest
 
+import numpy as np
 
 from robits.sim.blueprints import BlueprintGroup
+from robits.sim.blueprints import Pose
 from mujoco_scene_editor.state import State
+from mujoco_scene_editor.state import top_level_paths
 
 
 class TestState(unittest.TestCase):
@@ -95,6 +98,87 @@ class TestState(unittest.TestCase):
 
         self.assertEqual(self.state.element_seq, "0002")
 
+    def test_update_many_is_one_step(self):
+        self.state.add(BlueprintGroup("/a"))
+        self.state.add(BlueprintGroup("/b"))
+        pose = Pose().with_position([1.0, 0.0, 0.0])
+
+        self.state.update_many({"/a": {"pose": pose}, "/b": {"pose": pose}, "/c": {}})
+        self.assertEqual(len(self.state.history_past), 3)
+        self.assertIs(self.state.blueprints["/b"].pose, pose)
+
+        self.state.undo()
+        self.assertIsNone(self.state.blueprints["/a"].pose)
+        self.assertIsNone(self.state.blueprints["/b"].pose)
+
+    def test_remove_many(self):
+        for name in ("/a", "/a/b", "/c", "/d"):
+            self.state.add(BlueprintGroup(name))
+
+        self.state.remove_many(["/a/b", "/a", "/c"])
+        self.assertEqual(list(self.state.blueprints), ["/d"])
+        self.assertEqual(len(self.state.history_past), 5)
+
+    def test_reparent_keeps_world_pose(self):
+        self.state.add(BlueprintGroup("/a", Pose().with_position([1.0, 0.0, 0.0])))
+        self.state.add(BlueprintGroup("/a/x", Pose().with_position([0.0, 1.0, 0.0])))
+        self.state.add(BlueprintGroup("/a/x/y"))
+        self.state.add(BlueprintGroup("/b", Pose().with_position([0.0, 0.0, 2.0])))
+
+        moves = self.state.reparent(["/a/x"], "/b")
+        self.assertEqual(moves, {"/a/x": "/b/x"})
+        self.assertEqual(sorted(self.state.blueprints), ["/a", "/b", "/b/x", "/b/x/y"])
+        np.testing.assert_allclose(
+            self.state.global_matrix("/b/x")[:3, 3], [1.0, 1.0, 0.0]
+        )
+
+        # into itself
+        self.assertEqual(self.state.reparent(["/b"], "/b/x"), {})
+
+    def test_reparent_without_pose(self):
+        self.state.add(BlueprintGroup("/a", Pose().with_position([1.0, 0.0, 0.0])))
+        self.state.add(BlueprintGroup("/a/x"))
+
+        self.assertEqual(self.state.reparent(["/a/x"], ""), {"/a/x": "/x"})
+        self.assertIsNotNone(self.state.blueprints["/x"].pose)
+        np.testing.assert_allclose(
+            self.state.global_matrix("/x")[:3, 3], [1.0, 0.0, 0.0]
+        )
+
+    def test_top_level_paths(self):
+        self.assertEqual(
+            top_level_paths(["/a/c", "/a-b", "/a", "/b/c"]), ["/a", "/a-b", "/b/c"]
+        )
+
+    def test_transaction(self):
+        self.state.add(BlueprintGroup("/a"))
+        with self.state.transaction():
+            self.state.add(BlueprintGroup("/b"))
+            with self.state.transaction():
+                self.state.add(BlueprintGroup("/c"))
+            self.state.remove("/a")
+
+        self.assertEqual(len(self.state.history_past), 2)
+        self.state.undo()
+        self.assertEqual(list(self.state.blueprints), ["/a"])
+
+    def test_transaction_without_changes(self):
+        with self.state.transaction():
+            pass
+        self.assertEqual(len(self.state.history_past), 0)
+
+    def test_abort(self):
+        self.state.add(BlueprintGroup("/a"))
+        with self.state.transaction():
+            self.state.add(BlueprintGroup("/b"))
+            with self.assertRaises(RuntimeError):
+                with self.state.transaction():
+                    self.state.add(BlueprintGroup("/c"))
+                    raise RuntimeError()
+            self.assertEqual(sorted(self.state.blueprints), ["/a", "/b"])
+
+        self.assertEqual(len(self.state.history_past), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
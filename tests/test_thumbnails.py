@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import trimesh
+
+from mujoco_scene_editor.inventory.thumbnails import ThumbnailCache
+from mujoco_scene_editor.inventory.thumbnails import render_thumbnail
+
+
+class TestThumbnails(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.mesh_paths = []
+        for i in range(3):
+            mesh_path = self.root / f"box_{i}.stl"
+            trimesh.creation.box((0.1, 0.2, 0.1 * (i + 1))).export(mesh_path)
+            self.mesh_paths.append(mesh_path)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+        super().tearDown()
+
+    def _cache(self) -> ThumbnailCache:
+        cache = ThumbnailCache(cache_dir=str(self.root / "thumbnails"), size=32)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_render(self):
+        image = render_thumbnail(self.mesh_paths[0], size=32)
+        self.assertEqual(image.shape, (32, 32, 3))
+        self.assertGreater(len(np.unique(image.reshape(-1, 3), axis=0)), 1)
+
+    def test_generate_and_resume(self):
+        cache = self._cache()
+        ready = []
+        cache.on_ready(lambda mesh_path, png_path: ready.append(png_path))
+        cache.submit(self.mesh_paths)
+        self.assertTrue(cache.wait(timeout=60.0))
+        self.assertEqual(cache.completed, 3)
+        self.assertTrue(all(p is not None and p.is_file() for p in ready))
+        cache.close()
+
+        cache = self._cache()
+        self.assertTrue(all(cache.path_for(p) is not None for p in self.mesh_paths))
+        cache.submit(self.mesh_paths)
+        self.assertTrue(cache.wait(timeout=60.0))
+        self.assertEqual(cache.completed, 0)
+
+        trimesh.creation.icosphere().export(self.mesh_paths[0])
+        self.assertIsNone(cache.path_for(self.mesh_paths[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
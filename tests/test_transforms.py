@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from mujoco_scene_editor.utils import transforms
+
+
+class TestTransforms(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rotations = R.random(100, random_state=0)
+        self.wxyz = transforms.xyzw_to_wxyz(self.rotations.as_quat())
+
+    def test_quat_to_matrix(self):
+        np.testing.assert_allclose(
+            transforms.quat_to_matrix(self.wxyz), self.rotations.as_matrix(), atol=1e-12
+        )
+
+    def test_matrix_to_quat(self):
+        expected = np.where(self.wxyz[:, :1] < 0.0, -self.wxyz, self.wxyz)
+        np.testing.assert_allclose(
+            transforms.matrix_to_quat(self.rotations.as_matrix()), expected, atol=1e-12
+        )
+        identity = transforms.matrix_to_quat(np.identity(4))
+        self.assertEqual(tuple(identity), (1.0, 0.0, 0.0, 0.0))
+
+    def test_single_equals_batched(self):
+        matrices = transforms.quat_to_matrix(self.wxyz)
+        quats = transforms.matrix_to_quat(matrices)
+        angles = transforms.matrix_to_euler(matrices)
+        for i in range(len(self.wxyz)):
+            np.testing.assert_allclose(
+                transforms.quat_to_matrix(self.wxyz[i]), matrices[i]
+            )
+            np.testing.assert_allclose(transforms.matrix_to_quat(matrices[i]), quats[i])
+            np.testing.assert_allclose(
+                transforms.matrix_to_euler(matrices[i]), angles[i]
+            )
+
+    def test_euler(self):
+        angles = transforms.quat_to_euler(self.wxyz, degrees=True)
+        np.testing.assert_allclose(
+            angles, self.rotations.as_euler("XYZ", degrees=True), atol=1e-9
+        )
+        np.testing.assert_allclose(
+            transforms.quat_to_matrix(transforms.euler_to_quat(angles, degrees=True)),
+            self.rotations.as_matrix(),
+            atol=1e-12,
+        )
+
+    def test_gimbal_lock(self):
+        wxyz = transforms.euler_to_quat([10.0, 90.0, 0.0], degrees=True)
+        angles = transforms.quat_to_euler(wxyz, degrees=True)
+        np.testing.assert_allclose(angles, [10.0, 90.0, 0.0], atol=1e-6)
+
+    def test_multiply(self):
+        a, b = self.wxyz[:50], self.wxyz[50:]
+        expected = (self.rotations[:50] * self.rotations[50:]).as_matrix()
+        np.testing.assert_allclose(
+            transforms.quat_to_matrix(transforms.quat_multiply(a, b)),
+            expected,
+            atol=1e-12,
+        )
+
+    def test_compose_invert_apply(self):
+        positions = np.random.default_rng(0).normal(size=(100, 3))
+        m = transforms.pose_to_matrix(positions, self.wxyz)
+        self.assertEqual(m.shape, (100, 4, 4))
+        np.testing.assert_allclose(transforms.invert(m), np.linalg.inv(m), atol=1e-12)
+        np.testing.assert_allclose(
+            transforms.compose(m, transforms.invert(m)),
+            np.broadcast_to(np.identity(4), m.shape),
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(transforms.apply(m, np.zeros(3)), positions)
+        np.testing.assert_allclose(transforms.compose_chain(m[:3]), m[0] @ m[1] @ m[2])
+
+        position, wxyz = transforms.transform_pose(m[0], positions[1], self.wxyz[1])
+        expected_position, expected_wxyz = transforms.matrix_to_pose(m[0] @ m[1])
+        np.testing.assert_allclose(position, expected_position)
+        np.testing.assert_allclose(wxyz, expected_wxyz)
+
+
+if __name__ == "__main__":
+    unittest.main()
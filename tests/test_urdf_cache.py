@@ -0,0 +1,94 @@
+import io
+import threading
+import time
+import unittest
+from unittest import mock
+
+from yourdfpy import URDF
+
+from mujoco_scene_editor.utils import urdf_cache
+
+ARM = """
+<robot name="arm">
+  <link name="base">
+    <visual><geometry><box size="0.1 0.1 0.1"/></geometry></visual>
+  </link>
+  <link name="link">
+    <visual><geometry><box size="0.05 0.05 0.3"/></geometry></visual>
+  </link>
+  <joint name="shoulder" type="revolute">
+    <parent link="base"/>
+    <child link="link"/>
+    <axis xyz="0 0 1"/>
+    <limit lower="-1" upper="1" effort="1" velocity="1"/>
+  </joint>
+</robot>
+"""
+
+
+class TestUrdfCache(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        urdf_cache.clear()
+        self.addCleanup(urdf_cache.clear)
+
+    def test_load_once(self):
+        def slow_load(name):
+            time.sleep(0.05)
+            return URDF.load(io.StringIO(ARM))
+
+        with mock.patch.object(
+            urdf_cache, "load_robot_description", side_effect=slow_load
+        ) as loader:
+            results = []
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(urdf_cache.load_urdf("panda"))
+                )
+                for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        loader.assert_called_once_with("panda")
+        self.assertEqual(len(results), 4)
+        self.assertTrue(urdf_cache.is_cached("panda"))
+
+    def test_copies_share_meshes(self):
+        with mock.patch.object(
+            urdf_cache,
+            "load_robot_description",
+            side_effect=lambda name: URDF.load(io.StringIO(ARM)),
+        ) as loader:
+            first = urdf_cache.load_urdf("arm")
+            second = urdf_cache.load_urdf("arm")
+
+        loader.assert_called_once_with("arm")
+        first.update_cfg([0.5])
+        self.assertEqual(list(first.cfg), [0.5])
+        self.assertEqual(list(second.cfg), [0.0])
+        self.assertIsNot(first.scene.graph, second.scene.graph)
+        for name, mesh in first.scene.geometry.items():
+            self.assertIs(mesh, second.scene.geometry[name])
+
+    def test_preload_skips_failures(self):
+        with (
+            mock.patch.object(
+                urdf_cache, "urdf_names_for_config", return_value=["a", "b"]
+            ),
+            mock.patch.object(
+                urdf_cache,
+                "load_robot_description",
+                side_effect=lambda name: object() if name == "b" else 1 / 0,
+            ),
+        ):
+            urdf_cache.preload_async(["robot"]).join()
+
+        self.assertFalse(urdf_cache.is_cached("a"))
+        self.assertTrue(urdf_cache.is_cached("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -77,5 +77,25 @@ class TestQuaternionConversions(unittest.TestCase):
         )
 
 
+class FakeUrdf:
+    def get_actuated_joint_limits(self):
+        return {"j1": (-1.0, 1.0), "j2": (0.2, 1.2), "j3": (None, None)}
+
+
+class TestJointLimits(unittest.TestCase):
+    def test_joint_limits(self):
+        names, lower, upper = viser_utils.joint_limits(FakeUrdf())
+
+        self.assertEqual(names, ["j1", "j2", "j3"])
+        npt.assert_allclose(lower, [-1.0, 0.2, -np.pi])
+        npt.assert_allclose(upper, [1.0, 1.2, np.pi])
+
+    def test_initial_joint_positions(self):
+        _, lower, upper = viser_utils.joint_limits(FakeUrdf())
+        npt.assert_allclose(
+            viser_utils.initial_joint_positions(lower, upper), [0.0, 0.7, 0.0]
+        )
+
+
 if __name__ == "__main__":
     unittest.main()